@@ -1,6 +1,49 @@
 from django.contrib import admin
+from django.utils import timezone
 
 from .forms import Profile
+from .mailer import queue_depth
+from .models import OutgoingEmail, OutboxStatus, ReminderLog, SMSMessage
 
 # Register your models here.
-admin.site.register(Profile)
\ No newline at end of file
+admin.site.register(Profile)
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject', 'to')
+    readonly_fields = ('lock_id', 'locked_at', 'last_error', 'created_at', 'sent_at')
+    actions = ['requeue']
+
+    def changelist_view(self, request, extra_context=None):
+        depth = queue_depth()
+        extra_context = extra_context or {}
+        extra_context['title'] = (
+            f"Outbox — {depth.get(OutboxStatus.PENDING, 0)} queued, "
+            f"{depth.get(OutboxStatus.SENDING, 0)} sending, "
+            f"{depth.get(OutboxStatus.DEAD, 0)} dead"
+        )
+        return super().changelist_view(request, extra_context=extra_context)
+
+    @admin.action(description="Requeue selected emails")
+    def requeue(self, request, queryset):
+        updated = queryset.exclude(status=OutboxStatus.SENT).update(
+            status=OutboxStatus.PENDING, attempts=0, next_attempt_at=timezone.now(), lock_id='', locked_at=None,
+        )
+        self.message_user(request, f"{updated} email(s) requeued.")
+
+
+@admin.register(SMSMessage)
+class SMSMessageAdmin(admin.ModelAdmin):
+    list_display = ('to', 'status', 'attempts', 'transport', 'created_at', 'sent_at')
+    list_filter = ('status', 'transport')
+    search_fields = ('to', 'body')
+
+
+@admin.register(ReminderLog)
+class ReminderLogAdmin(admin.ModelAdmin):
+    list_display = ('domain', 'object_id', 'scheduled_date', 'emails_queued', 'sms_queued', 'sent_at')
+    list_filter = ('domain',)
+    date_hierarchy = 'scheduled_date'
@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
+        from .campaign_index import backfill_campaign_index
+        from .counters import backfill_counters
+        from .search_index import backfill_search_index, create_fts_table
+        post_migrate.connect(create_fts_table, sender=self)
+        post_migrate.connect(backfill_search_index, sender=self)
+        post_migrate.connect(backfill_counters, sender=self)
+        post_migrate.connect(backfill_campaign_index, sender=self)
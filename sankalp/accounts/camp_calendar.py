@@ -0,0 +1,137 @@
+"""
+Upcoming camps feed: scheduled medical, legal and women-support camps in
+date order, read from CampaignIndex with a range scan on scheduled_date.
+
+Women-support campaigns only appear for the roles that see them on their
+own pages (domains_for). Calendar apps poll without a session, so the .ics
+feed is reached through a per-user secret URL (calendar_token) that stops
+working when the user changes their password.
+
+The feed is cached under an ETag made from the domains shown, their fragment
+versions (bumped by accounts.signals on every change) and today's date.
+Working out the ETag and Last-Modified needs no SQL, so a calendar client
+polling with If-None-Match gets its 304 from two cache reads.
+"""
+import hashlib
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from accounts import fragments
+from accounts.models import CampaignDomain, CampaignIndex, Profile
+from sankalp.routers import primary_reads
+
+DOMAINS = [CampaignDomain.MEDICAL, CampaignDomain.LEGAL, CampaignDomain.WOMEN_SUPPORT]
+PUBLIC_DOMAINS = [CampaignDomain.MEDICAL, CampaignDomain.LEGAL]
+UPCOMING_STATUSES = ['Approved', 'Scheduled']
+
+
+def domains_for(user):
+    """Camp domains `user` may see: women-support campaigns only for admins, supporters and beneficiaries."""
+    if user.is_superuser or user.role in ('Admin', 'Supporter', 'Beneficiary'):
+        return DOMAINS
+    return PUBLIC_DOMAINS
+
+
+def calendar_token(user):
+    """The secret in `user`'s .ics URL; signed over the password hash, so a password change revokes it."""
+    digest = salted_hmac('accounts.camp_calendar', f'{user.pk}:{user.password}', algorithm='sha256').hexdigest()
+    return f'{user.pk}-{digest[:32]}'
+
+
+def calendar_user(token):
+    """The profile `token` belongs to, or None."""
+    pk, _, _ = token.partition('-')
+    if not pk.isdigit():
+        return None
+    user = Profile.objects.filter(pk=pk, is_active=True).only('id', 'password', 'role', 'is_superuser').first()
+    if user is None or not constant_time_compare(calendar_token(user), token):
+        return None
+    return user
+
+
+def upcoming_camps(domains=DOMAINS, limit=None):
+    camps = CampaignIndex.objects.filter(
+        domain__in=domains, status__in=UPCOMING_STATUSES, scheduled_date__gte=timezone.localdate(),
+    ).order_by('scheduled_date', 'scheduled_time', 'id')
+    return camps[:limit or settings.UPCOMING_CAMPS_LIMIT]
+
+
+def feed_etag(domains=DOMAINS):
+    stamp = '.'.join(str(v) for v in fragments.versions(domains))
+    return hashlib.md5(f'{timezone.localdate()}:{",".join(domains)}:{stamp}'.encode()).hexdigest()
+
+
+def get_feed(domains=DOMAINS):
+    """{'etag', 'last_modified', 'camps'} for the feed of `domains`, built at most once per version."""
+    etag = feed_etag(domains)
+    key = f'camp_calendar:{etag}'
+    feed = cache.get(key)
+    if feed is None:
+        with primary_reads():
+            camps = list(upcoming_camps(domains))
+        feed = {
+            'etag': etag,
+            'last_modified': max((camp.updated_at for camp in camps), default=None) or timezone.now(),
+            'camps': camps,
+        }
+        cache.set(key, feed, settings.FRAGMENT_CACHE_TTL)
+    return feed
+
+
+# 📅 iCalendar (RFC 5545) rendering — small enough not to need a library.
+def _escape(text):
+    return (text or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+def _fold(line):
+    """Lines longer than 75 octets continue on the next line after a space."""
+    data = line.encode('utf-8')
+    if len(data) <= 75:
+        return line
+    parts, chunk = [], b''
+    for char in line:
+        encoded = char.encode('utf-8')
+        if len(chunk) + len(encoded) > (75 if not parts else 74):
+            parts.append(chunk.decode('utf-8'))
+            chunk = b''
+        chunk += encoded
+    parts.append(chunk.decode('utf-8'))
+    return '\r\n '.join(parts)
+
+
+def _utc(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def to_ics(camps):
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//Sankalp//Upcoming Camps//EN',
+        'CALSCALE:GREGORIAN',
+        'X-WR-CALNAME:Sankalp upcoming camps',
+    ]
+    for camp in camps:
+        lines += [
+            'BEGIN:VEVENT',
+            f'UID:{camp.domain}-{camp.object_id}@sankalp',
+            f'DTSTAMP:{_utc(camp.updated_at)}',
+        ]
+        if camp.scheduled_time:
+            start = timezone.make_aware(datetime.combine(camp.scheduled_date, camp.scheduled_time))
+            lines.append(f'DTSTART:{_utc(start)}')
+        else:
+            lines.append(f'DTSTART;VALUE=DATE:{camp.scheduled_date:%Y%m%d}')
+        lines += [
+            f'SUMMARY:{_escape(camp.title)}',
+            f'LOCATION:{_escape(camp.location)}',
+            f'CATEGORIES:{_escape(camp.get_domain_display())}',
+            f'DESCRIPTION:{_escape(camp.summary)}',
+            'END:VEVENT',
+        ]
+    lines.append('END:VCALENDAR')
+    return '\r\n'.join(_fold(line) for line in lines) + '\r\n'
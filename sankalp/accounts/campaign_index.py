@@ -0,0 +1,121 @@
+"""
+CampaignIndex maintenance.
+
+accounts.signals calls sync()/remove() on every save/delete of the four
+campaign models, so the index is one upsert behind the source row at
+most. `python manage.py rebuild_campaign_index` repopulates it from
+scratch after bulk updates; `migrate` does it once on a database that has
+campaigns but an empty index (backfill_campaign_index).
+"""
+from django.apps import apps
+from django.db import connections, router, transaction
+
+from accounts.models import CampaignDomain, CampaignIndex
+
+UPDATE_FIELDS = ['title', 'status', 'owner_id', 'owner_name', 'location', 'summary', 'scheduled_date',
+                 'scheduled_time', 'created_at', 'updated_at']
+
+
+def _education(req):
+    donor = req.forwarded_to
+    return dict(
+        title=req.full_name, status=req.status, owner=req.beneficiary, location='',
+        summary=f"{req.education_level} · forwarded to {donor.username}" if donor else req.education_level,
+        scheduled_date=None, scheduled_time=None,
+    )
+
+
+def _medical(camp):
+    return dict(
+        title=f"Medical camp – {camp.hospital.name}", status=camp.approval_status, owner=camp.volunteer,
+        location=camp.location, summary=f"Requested for {camp.date:%d %b %Y}",
+        scheduled_date=camp.scheduled_date, scheduled_time=camp.time,
+    )
+
+
+def _legal(camp):
+    return dict(
+        title=camp.title, status=camp.status, owner=camp.requested_by, location=camp.location,
+        summary=camp.get_category_display(), scheduled_date=camp.scheduled_date,
+        scheduled_time=camp.scheduled_time,
+    )
+
+
+def _women_support(camp):
+    return dict(
+        title=camp.title, status=camp.status, owner=camp.volunteer, location=camp.location,
+        summary=f"Supporter: {camp.supporter.username}" if camp.supporter_id else '',
+        scheduled_date=camp.scheduled_date, scheduled_time=camp.scheduled_time,
+    )
+
+
+# model label -> (domain, row builder, relations the builder reads)
+SOURCES = {
+    'education.EducationRequest': (CampaignDomain.EDUCATION, _education, ('beneficiary', 'forwarded_to')),
+    'medical.MedicalCampRequest': (CampaignDomain.MEDICAL, _medical, ('hospital', 'volunteer')),
+    'legal.LegalAwarenessCamp': (CampaignDomain.LEGAL, _legal, ('requested_by',)),
+    'women_support.WomenSupportCampaign': (CampaignDomain.WOMEN_SUPPORT, _women_support, ('volunteer', 'supporter')),
+}
+
+
+def entry_for(instance):
+    domain, build, _ = SOURCES[instance._meta.label]
+    fields = build(instance)
+    owner = fields.pop('owner')
+    return CampaignIndex(
+        domain=domain, object_id=instance.pk, created_at=instance.created_at,
+        owner_id=owner.pk if owner else None, owner_name=owner.username if owner else '',
+        title=fields.pop('title')[:200], summary=fields.pop('summary')[:255], **fields,
+    )
+
+
+def _upsert(entries, using='default'):
+    CampaignIndex.objects.using(using).bulk_create(
+        entries, update_conflicts=True, unique_fields=['domain', 'object_id'], update_fields=UPDATE_FIELDS,
+    )
+
+
+def sync(instance):
+    _upsert([entry_for(instance)])
+
+
+def remove(instance):
+    domain = SOURCES[instance._meta.label][0]
+    CampaignIndex.objects.filter(domain=domain, object_id=instance.pk).delete()
+
+
+def rebuild_campaign_index(chunk_size=2000, using='default'):
+    """Re-index every campaign in chunks and drop entries whose source row is gone. Returns rows indexed."""
+    total = 0
+    with transaction.atomic(using=using):
+        for label, (domain, _, related) in SOURCES.items():
+            model = apps.get_model(label)
+            chunk = []
+            for instance in model.objects.using(using).select_related(*related).iterator(chunk_size=chunk_size):
+                chunk.append(entry_for(instance))
+                if len(chunk) >= chunk_size:
+                    _upsert(chunk, using)
+                    total += len(chunk)
+                    chunk = []
+            if chunk:
+                _upsert(chunk, using)
+                total += len(chunk)
+            CampaignIndex.objects.using(using).filter(domain=domain).exclude(
+                object_id__in=model.objects.using(using).values('pk'),
+            ).delete()
+    return total
+
+
+def backfill_campaign_index(sender=None, using='default', **kwargs):
+    """post_migrate hook: index the existing campaigns the first time CampaignIndex is empty."""
+    if not router.allow_migrate_model(using, CampaignIndex):
+        return
+    models = [apps.get_model(label) for label in SOURCES]
+    tables = set(connections[using].introspection.table_names())
+    if CampaignIndex._meta.db_table not in tables or any(m._meta.db_table not in tables for m in models):
+        return
+    if CampaignIndex.objects.using(using).exists() or not any(m.objects.using(using).exists() for m in models):
+        return
+    total = rebuild_campaign_index(using=using)
+    if kwargs.get('verbosity', 1):
+        print(f"  🗂️ Backfilled {total} campaign index row(s).")
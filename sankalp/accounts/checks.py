@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.core.checks import Info, Tags, Warning, register
+from django.db import connections
+
+
+@register(Tags.database)
+def report_database_settings(app_configs, **kwargs):
+    """Report each database's effective persistence/pool settings, and warn about combinations that do nothing."""
+    messages = []
+    for alias in connections:
+        db = connections[alias].settings_dict
+        vendor = connections[alias].vendor
+        pool = db.get('OPTIONS', {}).get('pool')
+        max_age = db.get('CONN_MAX_AGE', 0)
+
+        if pool:
+            pool = pool if isinstance(pool, dict) else {}
+            mode = (f"pooled (min {pool.get('min_size', 4)}, max {pool.get('max_size', 'min')}, "
+                    f"timeout {pool.get('timeout', 30)}s per worker)")
+        elif max_age is None:
+            mode = "persistent connections (never closed)"
+        elif max_age:
+            mode = f"persistent connections (CONN_MAX_AGE={max_age}s)"
+        else:
+            mode = "new connection per request"
+        if vendor == 'sqlite' and 'journal_mode=WAL' in db.get('OPTIONS', {}).get('init_command', ''):
+            mode += ", high-concurrency profile (WAL, BEGIN IMMEDIATE)"
+        health = 'on' if db.get('CONN_HEALTH_CHECKS') else 'off'
+        messages.append(Info(
+            f"Database '{alias}': {vendor} {db.get('NAME')} — {mode}, health checks {health}.",
+            id='accounts.I001',
+        ))
+
+        if pool and vendor != 'postgresql':
+            messages.append(Warning(
+                f"Database '{alias}': connection pooling is only supported on PostgreSQL.",
+                hint="Remove OPTIONS['pool'] and rely on CONN_MAX_AGE instead.",
+                id='accounts.W001',
+            ))
+        if vendor == 'sqlite' and getattr(settings, 'DB_POOL_MIN_SIZE', 0):
+            messages.append(Warning(
+                f"Database '{alias}': DB_POOL_MIN_SIZE is set but SQLite does not use a pool.",
+                hint="Set DB_ENGINE=postgres to use the pool settings.",
+                id='accounts.W002',
+            ))
+    return messages
+
+
+@register(Tags.caches)
+def report_cache_settings(app_configs, **kwargs):
+    """Warn when the dashboard fragment versions would live in a per-process cache."""
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if backend.endswith('locmem.LocMemCache') and not settings.DEBUG:
+        return [Warning(
+            "The default cache is LocMemCache, so each worker process keeps its own fragment versions: "
+            "a save only retires the dashboard fragments of the worker that handled it, and the others "
+            f"keep serving stale sections for up to FRAGMENT_CACHE_TTL ({settings.FRAGMENT_CACHE_TTL}s).",
+            hint="Set CACHE_BACKEND (and CACHE_LOCATION) to a shared cache such as Redis or Memcached, "
+                 "or run a single worker.",
+            id='accounts.W003',
+        )]
+    return []
@@ -0,0 +1,96 @@
+"""
+Email composition: render a template once and personalise it per recipient.
+
+    rendered = render_for_recipients(
+        'legal/legal_camp_request_email.html',
+        {'camp': camp, 'approval_link': link},
+        advocates, as_name='advocate',
+    )
+
+The template is rendered a single time with `advocate` bound to a
+placeholder, so `{{ advocate.username }}` becomes a marker in the output.
+Each recipient then only costs a string substitution of those markers.
+Per-recipient fields must be printed plainly (`{{ advocate.username }}`);
+filters or `{% if %}` tags on them see the marker, not the real value.
+"""
+import html as html_lib
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+from django.template.loader import get_template
+from django.utils.html import conditional_escape, strip_tags
+
+RenderedEmail = namedtuple('RenderedEmail', 'html text')
+
+_MARK = '\x1f'
+_MARKER_RE = re.compile(f'{_MARK}([A-Za-z0-9_.]+){_MARK}')
+_NON_BODY_RE = re.compile(r'<(head|style|script)\b.*?</\1>', re.IGNORECASE | re.DOTALL)
+
+
+@lru_cache(maxsize=128)
+def _compiled(template_name):
+    return get_template(template_name)
+
+
+def get_email_template(template_name):
+    """Compiled template, kept for the life of the process outside DEBUG."""
+    if settings.DEBUG:
+        return get_template(template_name)
+    return _compiled(template_name)
+
+
+def _to_text(html):
+    body = _NON_BODY_RE.sub('', html)
+    lines = (line.strip() for line in html_lib.unescape(strip_tags(body)).splitlines())
+    return '\n'.join(line for line in lines if line)
+
+
+def compose(template_name, context):
+    """Render an email template into its HTML and plain-text parts."""
+    html = get_email_template(template_name).render(context)
+    return RenderedEmail(html, _to_text(html))
+
+
+class _Placeholder:
+    """Stands in for the recipient while rendering; prints as a marker for its attribute path."""
+
+    def __init__(self, path):
+        self._path = path
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return _Placeholder(f'{self._path}.{name}')
+
+    def __str__(self):
+        return f'{_MARK}{self._path}{_MARK}'
+
+
+def _resolve(recipient, path):
+    value = recipient
+    for attr in path.split('.')[1:]:
+        value = getattr(value, attr, '')
+        if callable(value):
+            value = value()
+    return '' if value is None else str(value)
+
+
+def render_for_recipients(template_name, context, recipients, as_name='recipient'):
+    """
+    Render `template_name` once and return [(recipient, RenderedEmail), ...],
+    with `as_name.<attr>` fields filled in from each recipient.
+    """
+    html = get_email_template(template_name).render({**context, as_name: _Placeholder(as_name)})
+    text = _to_text(html)
+    paths = set(_MARKER_RE.findall(html))
+
+    rendered = []
+    for recipient in recipients:
+        values = {path: _resolve(recipient, path) for path in paths}
+        rendered.append((recipient, RenderedEmail(
+            _MARKER_RE.sub(lambda m: conditional_escape(values[m.group(1)]), html),
+            _MARKER_RE.sub(lambda m: values[m.group(1)], text),
+        )))
+    return rendered
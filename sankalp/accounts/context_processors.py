@@ -0,0 +1,9 @@
+from django.conf import settings
+
+
+def notifications(request):
+    """How base.html keeps the bell badge current: the live stream (ASGI only) or polling the JSON feed."""
+    return {
+        'notification_stream_enabled': settings.NOTIFICATION_STREAM_ENABLED,
+        'notification_poll_seconds': settings.NOTIFICATION_POLL_SECONDS,
+    }
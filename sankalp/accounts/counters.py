@@ -0,0 +1,110 @@
+"""
+Dashboard status totals kept in DashboardCounter instead of recounted per hit.
+
+Each tracked model counts its rows per status, both site-wide (owner 0) and
+per owner. accounts.signals adjusts the rows on every save/delete using the
+state captured when the instance was loaded, so a dashboard reads its totals
+with one lookup on the (domain, owner_id, status) unique index:
+
+    counts('women_support')                  # {'Pending': 12, 'Scheduled': 3, ...}
+    counts('education', owner=request.user)  # this donor's requests
+
+Bulk queryset.update() skips signals; run `python manage.py rebuild_counters`
+after one of those (or whenever the totals are in doubt). On a database
+upgraded from before the counters existed, `migrate` fills them in
+(backfill_counters).
+"""
+from django.apps import apps
+from django.db import connections, router, transaction
+from django.db.models import Count, F
+from django.utils.functional import SimpleLazyObject
+
+from accounts.models import DashboardCounter
+
+# model label -> (domain, owner field)
+TRACKED = {
+    'education.EducationRequest': ('education', 'forwarded_to_id'),
+    'women_support.WomenSupportCampaign': ('women_support', 'volunteer_id'),
+    'legal.LegalAwarenessCamp': ('legal', 'requested_by_id'),
+}
+
+
+def tracked(instance):
+    return TRACKED.get(instance._meta.label)
+
+
+def counter_state(instance):
+    """The counter keys `instance` currently contributes to."""
+    domain, owner_field = TRACKED[instance._meta.label]
+    return domain, instance.status, getattr(instance, owner_field) or 0
+
+
+def _bump(domain, status, owner_id, delta):
+    rows = DashboardCounter.objects.filter(domain=domain, status=status, owner_id=owner_id)
+    if not rows.update(count=F('count') + delta):
+        DashboardCounter.objects.bulk_create(
+            [DashboardCounter(domain=domain, status=status, owner_id=owner_id)], ignore_conflicts=True,
+        )
+        rows.update(count=F('count') + delta)
+
+
+def apply(old, new):
+    """Move one row from counter state `old` to `new`; either may be None (create/delete)."""
+    if old == new:
+        return
+    for state, delta in ((old, -1), (new, 1)):
+        if state is None:
+            continue
+        domain, status, owner_id = state
+        _bump(domain, status, owner_id, delta)
+        if owner_id:
+            _bump(domain, status, 0, delta)
+
+
+def counts(domain, owner=None):
+    """{status: total} for `domain`, site-wide or for one owner profile."""
+    owner_id = getattr(owner, 'pk', owner) or 0
+    return dict(
+        DashboardCounter.objects.filter(domain=domain, owner_id=owner_id).values_list('status', 'count')
+    )
+
+
+def lazy_counts(domain, owner=None):
+    """counts() evaluated on first use, so a cached dashboard fragment never runs the query."""
+    return SimpleLazyObject(lambda: counts(domain, owner))
+
+
+def rebuild_counters(using='default'):
+    """Recount every tracked model from scratch. Returns the number of counter rows written."""
+    rows = []
+    for label, (domain, owner_field) in TRACKED.items():
+        model = apps.get_model(label)
+        for row in model.objects.using(using).values('status').annotate(total=Count('id')).order_by():
+            rows.append(DashboardCounter(domain=domain, status=row['status'], owner_id=0, count=row['total']))
+        per_owner = (
+            model.objects.using(using).filter(**{f'{owner_field}__isnull': False})
+            .values('status', owner_field).annotate(total=Count('id')).order_by()
+        )
+        for row in per_owner:
+            rows.append(DashboardCounter(domain=domain, status=row['status'],
+                                         owner_id=row[owner_field], count=row['total']))
+
+    with transaction.atomic(using=using):
+        DashboardCounter.objects.using(using).all().delete()
+        DashboardCounter.objects.using(using).bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+def backfill_counters(sender=None, using='default', **kwargs):
+    """post_migrate hook: count the existing rows when the counter table is still empty."""
+    if not router.allow_migrate_model(using, DashboardCounter):
+        return
+    models = [apps.get_model(label) for label in TRACKED]
+    tables = set(connections[using].introspection.table_names())
+    if DashboardCounter._meta.db_table not in tables or any(m._meta.db_table not in tables for m in models):
+        return  # a partial `migrate <app>`; the next full migrate gets here
+    if DashboardCounter.objects.using(using).exists() or not any(m.objects.using(using).exists() for m in models):
+        return
+    written = rebuild_counters(using)
+    if kwargs.get('verbosity', 1):
+        print(f"  🧮 Backfilled {written} dashboard counter row(s).")
@@ -0,0 +1,24 @@
+from django.conf import settings
+
+from .digest import send_digests
+from .models import DeliveryMode
+from .sms import dispatcher
+from .utility import prune_read_notifications
+
+
+def prune_notifications_cron():
+    """Daily retention sweep for read notifications (see settings.CRONJOBS)."""
+    prune_read_notifications(settings.NOTIFICATION_RETENTION_DAYS)
+
+
+def send_hourly_digests_cron():
+    send_digests(DeliveryMode.HOURLY)
+
+
+def send_daily_digests_cron():
+    send_digests(DeliveryMode.DAILY)
+
+
+def send_queued_sms_cron():
+    """Sends SMS rows a restarted process left Queued (see accounts.sms)."""
+    dispatcher.drain()
@@ -0,0 +1,100 @@
+"""
+Paged dashboard sections, and the shared context of the dashboards that
+two routes render.
+
+Each section is one keyset-paged list with its related profiles joined in,
+so a page costs a single query however long the history grows. The first
+page is rendered inside the dashboard; "Load more" fetches the next page
+from DashboardSectionView, which renders the same row template.
+"""
+from django.utils.functional import cached_property
+
+from accounts.counters import lazy_counts
+from accounts.pagination import keyset_page
+from education.models import EducationRequest
+from legal.forms import LegalArticleForm
+from legal.models import LegalArticle, LegalAwarenessCamp, LegalQuestion
+from women_support.models import WomenSupportArticle, WomenSupportCampaign, WomenSupportQuestion
+
+PAGE_SIZE = 10
+
+# name -> (role allowed to see it, queryset for the viewing user)
+SECTIONS = {
+    'volunteer_pending': ('Volunteer', lambda user: EducationRequest.objects.filter(status='Pending')),
+    'volunteer_forwarded': ('Volunteer', lambda user: EducationRequest.objects.filter(status='Forwarded')),
+    'volunteer_approved': ('Volunteer', lambda user: EducationRequest.objects.filter(status='Approved')),
+    'donor_forwarded': ('Donor', lambda user: EducationRequest.objects.filter(forwarded_to=user, status='Forwarded')),
+    'donor_approved': ('Donor', lambda user: EducationRequest.objects.filter(forwarded_to=user, status='Approved')),
+    'donor_rejected': ('Donor', lambda user: EducationRequest.objects.filter(forwarded_to=user, status='Rejected')),
+}
+
+
+class Section:
+    """One page of a dashboard section; nothing is queried until the template reads it."""
+
+    def __init__(self, name, user, cursor=None, page_size=PAGE_SIZE):
+        self.name = name
+        self.user = user
+        self.cursor = cursor
+        self.page_size = page_size
+
+    @property
+    def template(self):
+        return f'accounts/dashboard_rows/{self.name}.html'
+
+    def queryset(self):
+        _, build = SECTIONS[self.name]
+        return build(self.user).for_listing()
+
+    @cached_property
+    def _page(self):
+        return keyset_page(self.queryset(), self.cursor, self.page_size)
+
+    @property
+    def rows(self):
+        return self._page[0]
+
+    @property
+    def next_cursor(self):
+        return self._page[1]
+
+
+def sections_for(user, names):
+    return {name.split('_', 1)[1]: Section(name, user) for name in names}
+
+
+def allowed(name, user):
+    return name in SECTIONS and SECTIONS[name][0] == getattr(user, 'role', None)
+
+
+# The advocate and supporter dashboards are served both by /dashboard/ and by their
+# app's own page. Both routes build the same context, since they share fragment cache keys.
+
+def advocate_context(user):
+    # The review queue shows each request in full, description included.
+    camps = LegalAwarenessCamp.objects.for_detail()
+    return {
+        'camps_by_status': {
+            'Pending': camps.filter(status='Pending'),
+            'Approved': camps.filter(status='Approved'),
+            'Rejected': camps.filter(status='Rejected'),
+        },
+        'camp_counts': lazy_counts('legal'),
+        'articles': LegalArticle.objects.for_listing().filter(author=user).order_by('-created_at'),
+        'questions': LegalQuestion.objects.for_listing().order_by('-created_at'),
+        'article_form': LegalArticleForm(),
+    }
+
+
+def supporter_context(user):
+    # The review queue shows each campaign in full, description included.
+    campaigns = WomenSupportCampaign.objects.for_detail()
+    return {
+        'pending_campaigns': campaigns.filter(status='Pending'),
+        'approved_campaigns': campaigns.filter(status='Approved'),
+        'rejected_campaigns': campaigns.filter(status='Rejected'),
+        'scheduled_campaigns': campaigns.filter(status='Scheduled'),
+        'campaign_counts': lazy_counts('women_support'),
+        'articles': WomenSupportArticle.objects.for_listing().filter(author=user),
+        'questions': WomenSupportQuestion.objects.for_listing().order_by('-created_at'),
+    }
@@ -0,0 +1,71 @@
+"""
+Digest delivery: users on hourly or daily delivery get one summary email
+holding their held-back mail (subject and text of each) and unread
+notifications, instead of one email per event. Run by accounts.cron or `python manage.py send_digests`.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from accounts.compose import compose
+from accounts.models import DeliveryMode, Notification, OutboxStatus, OutgoingEmail, Profile
+from accounts.utility import queue_rendered_emails
+
+WINDOWS = {
+    DeliveryMode.HOURLY: timedelta(hours=1),
+    DeliveryMode.DAILY: timedelta(days=1),
+}
+
+
+def send_digests(mode):
+    """Queue one summary per user on `mode` that has something new. Returns how many were queued."""
+    now = timezone.now()
+    window = WINDOWS[mode]
+
+    held = (
+        OutgoingEmail.objects.filter(status=OutboxStatus.HELD, recipient__delivery_mode=mode)
+        .order_by('created_at').only('id', 'recipient_id', 'subject', 'body', 'created_at')
+    )
+    since_last_digest = (
+        Q(recipient__last_digest_at__isnull=True, created_at__gte=now - window)
+        | Q(created_at__gt=F('recipient__last_digest_at'))
+    )
+    notifications = (
+        Notification.objects.filter(since_last_digest, recipient__delivery_mode=mode, is_read=False)
+        .order_by('created_at').only('id', 'recipient_id', 'message', 'created_at')
+    )
+
+    emails_by_user, notes_by_user = defaultdict(list), defaultdict(list)
+    for email in held:
+        emails_by_user[email.recipient_id].append(email)
+    for note in notifications.filter(created_at__lte=now):
+        notes_by_user[note.recipient_id].append(note)
+
+    user_ids = set(emails_by_user) | set(notes_by_user)
+    if not user_ids:
+        return 0
+
+    users = Profile.objects.filter(id__in=user_ids).only('id', 'username', 'email')
+    period = 'hourly' if mode == DeliveryMode.HOURLY else 'daily'
+    rendered = []
+    for user in users:
+        if not user.email:
+            continue
+        rendered.append((user.email, compose('accounts/digest_email.html', {
+            'user': user,
+            'period': period,
+            'emails': emails_by_user.get(user.id, []),
+            'notifications': notes_by_user.get(user.id, []),
+        })))
+
+    held_ids = [email.id for emails in emails_by_user.values() for email in emails]
+    with transaction.atomic():
+        queue_rendered_emails(f"🌿 Your {period} Sankalp summary", rendered)
+        OutgoingEmail.objects.filter(id__in=held_ids, status=OutboxStatus.HELD).update(
+            status=OutboxStatus.DIGESTED, sent_at=now,
+        )
+        Profile.objects.filter(id__in=user_ids).update(last_digest_at=now)
+    return len(rendered)
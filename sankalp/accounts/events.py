@@ -0,0 +1,145 @@
+"""
+Per-profile pub/sub for the live notification stream (NotificationStreamView).
+
+Publishers are ordinary sync views; subscribers are SSE connections waiting
+on an asyncio queue inside the ASGI event loop. settings.NOTIFICATION_BROKER
+picks the implementation:
+
+* InProcessBroker — fans events out inside this process. Right for a single
+  ASGI worker, and for tests.
+* PollingBroker — local stand-in for an external broker when several
+  processes serve traffic. One task per process polls the Notification
+  table for new rows of the profiles it has subscribers for, so the cost is
+  one indexed query per interval however many connections are open.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    def __init__(self, profile_id, maxsize=100):
+        self.profile_id = profile_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def push(self, event):
+        # Runs on the subscriber's loop; a slow client just drops events.
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            pass
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class InProcessBroker:
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, profile_id):
+        subscription = Subscription(profile_id)
+        with self._lock:
+            self._subscribers[profile_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.profile_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.profile_id]
+
+    def subscribed_ids(self):
+        with self._lock:
+            return list(self._subscribers)
+
+    def publish(self, profile_id, event, data):
+        """Thread-safe: may be called from sync views or from the event loop."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(profile_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.push, (event, data))
+            except RuntimeError:
+                # The subscriber's loop has already shut down.
+                self.unsubscribe(subscription)
+
+
+class PollingBroker(InProcessBroker):
+    interval = 2.0
+
+    def __init__(self):
+        super().__init__()
+        self._poller = None
+        self._high_water = None
+
+    def subscribe(self, profile_id):
+        subscription = super().subscribe(profile_id)
+        if self._poller is None or self._poller.done():
+            self._poller = subscription.loop.create_task(self._poll())
+        return subscription
+
+    def publish(self, profile_id, event, data):
+        # New notifications reach every process through the poller;
+        # anything else (status changes, badge counts) is delivered locally.
+        if event != 'notification':
+            super().publish(profile_id, event, data)
+
+    async def _poll(self):
+        from accounts.models import Notification
+
+        def fetch():
+            if self._high_water is None:
+                latest = Notification.objects.order_by('-id').values_list('id', flat=True).first()
+                self._high_water = latest or 0
+                return []
+            ids = self.subscribed_ids()
+            rows = list(
+                Notification.objects.filter(id__gt=self._high_water, recipient_id__in=ids)
+                .order_by('id').values('id', 'recipient_id', 'message', 'created_at')
+            ) if ids else []
+            latest = Notification.objects.order_by('-id').values_list('id', flat=True).first()
+            self._high_water = max(self._high_water, latest or 0)
+            return rows
+
+        while self.subscribed_ids():
+            for row in await sync_to_async(fetch)():
+                super().publish(row['recipient_id'], 'notification', notification_payload(row))
+            await asyncio.sleep(self.interval)
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(settings.NOTIFICATION_BROKER)()
+    return _broker
+
+
+def notification_payload(notification):
+    """Accepts a Notification or a values() dict."""
+    get = notification.get if isinstance(notification, dict) else lambda key: getattr(notification, key)
+    return {'id': get('id'), 'message': get('message'), 'created_at': get('created_at').isoformat()}
+
+
+def publish_on_commit(profile_id, event, data):
+    """Publish once the surrounding transaction commits, so clients never see rolled-back rows."""
+    transaction.on_commit(lambda: get_broker().publish(profile_id, event, data))
+
+
+def publish_status_change(profile_id, domain, obj, status):
+    """Tell `profile_id` that one of their requests (education/legal/medical/women) changed status."""
+    if profile_id is None:
+        return
+    publish_on_commit(profile_id, 'status', {'domain': domain, 'id': obj.pk, 'title': str(obj), 'status': status})
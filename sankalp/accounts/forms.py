@@ -1,6 +1,6 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
-from .models import Profile,RoleChoices
+from .models import CampaignDomain, Profile, RoleChoices
 
 class ProfileRegistrationForm(UserCreationForm):
     class Meta:
@@ -14,3 +14,30 @@ class ProfileRegistrationForm(UserCreationForm):
             choice for choice in RoleChoices.choices if choice[0] != 'Admin'
         ]
 
+
+
+class DeliveryPreferenceForm(forms.ModelForm):
+    class Meta:
+        model = Profile
+        fields = ['delivery_mode']
+        labels = {'delivery_mode': 'Email me about updates'}
+        widgets = {'delivery_mode': forms.Select(attrs={'class': 'form-select'})}
+
+
+
+class CampaignFilterForm(forms.Form):
+    STATUS_CHOICES = [('', 'Any status')] + [
+        (status, status) for status in ('Pending', 'Forwarded', 'Approved', 'Scheduled', 'Completed', 'Rejected')
+    ]
+    SORT_CHOICES = [('created', 'Newest requests'), ('scheduled', 'Scheduled date')]
+
+    domain = forms.ChoiceField(choices=[('', 'All domains')] + CampaignDomain.choices, required=False)
+    status = forms.ChoiceField(choices=STATUS_CHOICES, required=False)
+    date_from = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    date_to = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    sort = forms.ChoiceField(choices=SORT_CHOICES, required=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field in self.fields.values():
+            field.widget.attrs.setdefault('class', 'form-select' if isinstance(field, forms.ChoiceField) else 'form-control')
@@ -0,0 +1,65 @@
+"""
+Versioned fragment cache for the dashboards.
+
+Each group ('education', 'legal', ...) has a version number in the cache.
+Fragments are stored under their group versions, so bumping a group (done
+by accounts.signals on every save/delete of its models) retires all of its
+fragments at once without scanning keys:
+
+    {% load dashboard_cache %}
+    {% cached_fragment "advocate_camps" on="legal" %} ... {% endcached_fragment %}
+    {% cached_fragment "donor_requests" on="education" vary=user.pk %} ... {% endcached_fragment %}
+
+A cache hit costs one get_many for the versions plus one get, and no SQL
+as long as the view passes lazy querysets.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+GROUPS = {
+    'education.EducationRequest': 'education',
+    'women_support.WomenSupportCampaign': 'women_support',
+    'women_support.WomenSupportQuestion': 'women_support',
+    'women_support.WomenSupportArticle': 'women_support',
+    'legal.LegalAwarenessCamp': 'legal',
+    'legal.LegalQuestion': 'legal',
+    'medical.MedicalCampRequest': 'medical',
+}
+
+
+def _version_key(group):
+    return f'fragments:version:{group}'
+
+
+def versions(groups):
+    """Current version of each group; a missing one starts at the clock so it never reuses an old number."""
+    keys = {_version_key(group): group for group in groups}
+    found = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return [found[key] for key in keys]
+
+
+def bump(group):
+    try:
+        cache.incr(_version_key(group))
+    except ValueError:
+        cache.set(_version_key(group), time.time_ns(), None)
+
+
+def fragment_key(name, groups, vary=()):
+    stamp = '.'.join(str(v) for v in versions(groups))
+    suffix = ':'.join(str(v) for v in vary)
+    return f'fragments:{name}:{stamp}:{suffix}'
+
+
+def get(key):
+    return cache.get(key)
+
+
+def store(key, html):
+    cache.set(key, html, settings.FRAGMENT_CACHE_TTL)
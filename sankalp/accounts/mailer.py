@@ -0,0 +1,198 @@
+"""
+Outbox worker: claims queued OutgoingEmail rows and delivers them
+with a bounded pool of threads. Run it with `python manage.py process_outbox`.
+
+Rows are grouped by email backend and each group is sent over as few
+connections as possible (one per OUTBOX_MESSAGES_PER_CONNECTION messages),
+so a fan-out to 200 recipients costs one SMTP/TLS handshake, not 200.
+"""
+import time
+import uuid
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from accounts.models import OutgoingEmail, OutboxStatus
+from accounts.retry import retry_on_lock
+
+
+def backoff_delay(attempts):
+    """Exponential backoff: base, 2×base, 4×base … capped at OUTBOX_MAX_BACKOFF seconds."""
+    delay = settings.OUTBOX_BACKOFF_SECONDS * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(delay, settings.OUTBOX_MAX_BACKOFF))
+
+
+def queue_depth():
+    """Row counts per outbox status, e.g. {'Pending': 12, 'Dead': 1}."""
+    rows = OutgoingEmail.objects.order_by().values('status').annotate(total=Count('id'))
+    return {row['status']: row['total'] for row in rows}
+
+
+@retry_on_lock
+def claim_batch(limit):
+    """
+    Lock up to `limit` due rows for this worker and return them.
+    The UPDATE re-checks the status, so two workers never claim the same row.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.OUTBOX_LOCK_TIMEOUT)
+    due = (
+        Q(status=OutboxStatus.PENDING, next_attempt_at__lte=now)
+        | Q(status=OutboxStatus.SENDING, locked_at__lt=stale)
+    )
+    ids = list(
+        OutgoingEmail.objects.filter(due).order_by('next_attempt_at').values_list('id', flat=True)[:limit]
+    )
+    if not ids:
+        return []
+
+    lock_id = uuid.uuid4().hex
+    OutgoingEmail.objects.filter(due, id__in=ids).update(
+        status=OutboxStatus.SENDING, lock_id=lock_id, locked_at=now,
+    )
+    return list(OutgoingEmail.objects.filter(lock_id=lock_id))
+
+
+def build_message(outgoing, connection=None):
+    msg = EmailMultiAlternatives(
+        outgoing.subject, outgoing.body, outgoing.from_email, [outgoing.to], connection=connection,
+    )
+    if outgoing.html_body:
+        msg.attach_alternative(outgoing.html_body, 'text/html')
+    return msg
+
+
+class DispatchReport(namedtuple('DispatchReport', 'sent failed dead connections elapsed')):
+    """Outcome of one dispatch run; `rate` is messages delivered per second."""
+
+    @property
+    def rate(self):
+        return self.sent / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (
+            f"sent={self.sent} failed={self.failed} dead={self.dead} "
+            f"connections={self.connections} in {self.elapsed:.2f}s ({self.rate:.1f} msg/s)"
+        )
+
+
+def _open(backend):
+    connection = get_connection(backend or None)
+    connection.open()
+    return connection
+
+
+def _close(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+def send_over_connection(backend, messages):
+    """
+    Send `messages` (list of (key, EmailMessage)) over one reused connection.
+    Returns a list of (key, error) where error is None on success. A failed
+    message closes the session so the next one starts on a fresh connection.
+    """
+    results = []
+    connection = None
+    for key, msg in messages:
+        try:
+            if connection is None:
+                connection = _open(backend)
+            connection.send_messages([msg])
+            results.append((key, None))
+        except Exception as e:
+            results.append((key, str(e) or e.__class__.__name__))
+            if connection is not None:
+                _close(connection)
+                connection = None
+    if connection is not None:
+        _close(connection)
+    return results
+
+
+def _chunks(items, workers):
+    """
+    Split `items` into contiguous chunks of at most OUTBOX_MESSAGES_PER_CONNECTION,
+    using more than one chunk only when that keeps all workers busy.
+    """
+    per_connection = max(settings.OUTBOX_MESSAGES_PER_CONNECTION, 1)
+    parts = min(max(workers, 1), -(-len(items) // per_connection))
+    size = max(-(-len(items) // parts), 1)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def dispatch(messages, workers=4):
+    """
+    Group `messages` (list of (key, backend, EmailMessage)) per backend and
+    send each group over as few pooled connections as possible, at most
+    `workers` of them in parallel.
+    Returns (results, connections_used).
+    """
+    by_backend = defaultdict(list)
+    for key, backend, msg in messages:
+        by_backend[backend].append((key, msg))
+
+    jobs = []
+    for backend, group in by_backend.items():
+        for chunk in _chunks(group, workers):
+            jobs.append((backend, chunk))
+
+    results = []
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        for chunk_results in pool.map(lambda job: send_over_connection(*job), jobs):
+            results.extend(chunk_results)
+    return results, len(jobs)
+
+
+@retry_on_lock
+def record_results(batch, results):
+    """Mark delivered rows as sent; reschedule or dead-letter the failures."""
+    now = timezone.now()
+    by_id = {email.id: email for email in batch}
+
+    sent_ids = [pk for pk, error in results if error is None]
+    if sent_ids:
+        OutgoingEmail.objects.filter(id__in=sent_ids).update(
+            status=OutboxStatus.SENT, sent_at=now, attempts=F('attempts') + 1,
+            lock_id='', locked_at=None, last_error='',
+        )
+
+    dead = 0
+    for pk, error in results:
+        if error is None:
+            continue
+        email = by_id[pk]
+        attempts = email.attempts + 1
+        if attempts >= email.max_attempts:
+            status, dead = OutboxStatus.DEAD, dead + 1
+        else:
+            status = OutboxStatus.PENDING
+        OutgoingEmail.objects.filter(id=pk).update(
+            status=status, attempts=attempts, last_error=error,
+            next_attempt_at=now + backoff_delay(attempts), lock_id='', locked_at=None,
+        )
+    return len(sent_ids), len(results) - len(sent_ids), dead
+
+
+def process_outbox(batch_size=100, workers=4):
+    """
+    Deliver one batch and return a DispatchReport.
+    At most `workers` SMTP sessions are open at the same time.
+    """
+    started = time.monotonic()
+    batch = claim_batch(batch_size)
+    if not batch:
+        return DispatchReport(0, 0, 0, 0, 0.0)
+
+    messages = [(email.id, email.backend, build_message(email)) for email in batch]
+    results, connections = dispatch(messages, workers=workers)
+    sent, failed, dead = record_results(batch, results)
+    return DispatchReport(sent, failed, dead, connections, time.monotonic() - started)
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.mailer import process_outbox, queue_depth
+
+
+class Command(BaseCommand):
+    help = "Deliver queued emails from the outbox (runs until stopped unless --once is given)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--workers', type=int, default=4, help="Maximum concurrent SMTP sessions.")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument('--once', action='store_true', help="Drain what is due now and exit.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        workers = options['workers']
+
+        while True:
+            report = process_outbox(batch_size=batch_size, workers=workers)
+            if report.sent or report.failed:
+                self.stdout.write(f"📤 {report} depth={queue_depth()}")
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
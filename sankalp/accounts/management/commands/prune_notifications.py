@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts.utility import prune_read_notifications
+
+
+class Command(BaseCommand):
+    help = "Delete read notifications older than the retention window, in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.NOTIFICATION_RETENTION_DAYS)
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        removed = prune_read_notifications(options['days'], chunk_size=options['chunk_size'])
+        self.stdout.write(f"🧹 Removed {removed} read notification(s) older than {options['days']} days.")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from accounts.campaign_index import rebuild_campaign_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the cross-domain CampaignIndex from the education, medical, legal and women-support tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        total = rebuild_campaign_index(chunk_size=options['chunk_size'])
+        self.stdout.write(f"🗂️ Indexed {total} campaign(s).")
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from accounts.counters import rebuild_counters
+from accounts.stats import invalidate_admin_stats
+
+
+class Command(BaseCommand):
+    help = "Recount the dashboard status counters from the source tables."
+
+    def handle(self, *args, **options):
+        written = rebuild_counters()
+        invalidate_admin_stats()
+        self.stdout.write(f"🧮 Rebuilt {written} dashboard counter row(s).")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from accounts.search_index import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the article and Q&A search index from the legal and women-support tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        total = rebuild_search_index(chunk_size=options['chunk_size'])
+        self.stdout.write(f"🔎 Indexed {total} document(s).")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from accounts.digest import send_digests
+from accounts.models import DeliveryMode
+
+
+class Command(BaseCommand):
+    help = "Queue hourly or daily summary emails for users who chose digest delivery."
+
+    def add_arguments(self, parser):
+        parser.add_argument('mode', choices=['hourly', 'daily'])
+
+    def handle(self, *args, **options):
+        mode = DeliveryMode.HOURLY if options['mode'] == 'hourly' else DeliveryMode.DAILY
+        queued = send_digests(mode)
+        self.stdout.write(f"📬 Queued {queued} {options['mode']} digest(s).")
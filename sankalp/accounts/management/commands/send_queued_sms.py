@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.sms import dispatcher
+
+
+class Command(BaseCommand):
+    help = "Send SMS messages still waiting in the database, e.g. after a restart (runs until stopped unless --once is given)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--interval', type=float, default=30.0, help="Seconds to sleep when nothing is waiting.")
+        parser.add_argument('--once', action='store_true', help="Drain what is waiting now and exit.")
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = dispatcher.drain(limit=options['batch_size'])
+            if sent or failed:
+                self.stdout.write(f"📱 sent={sent} failed={failed}")
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
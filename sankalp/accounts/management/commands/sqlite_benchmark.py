@@ -0,0 +1,116 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts.retry import is_lock_error, lock_backoff
+
+# Django's stock SQLite behaviour vs. the SQLITE_HIGH_CONCURRENCY profile.
+PROFILES = {
+    'default': {
+        'pragmas': [],
+        'begin': 'BEGIN',
+        'timeout': 5.0,
+        'retries': 0,
+    },
+    'high-concurrency': {
+        'pragmas': settings.SQLITE_PRAGMAS,
+        'begin': 'BEGIN IMMEDIATE',
+        'timeout': settings.SQLITE_BUSY_TIMEOUT,
+        'retries': settings.DB_WRITE_RETRIES,
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure concurrent write throughput on a scratch SQLite file with Django's default "
+        "settings and with the high-concurrency profile. The live database is not touched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help="Concurrent writer threads.")
+        parser.add_argument('--writes', type=int, default=200, help="Transactions per thread.")
+        parser.add_argument('--recipients', type=int, default=50, help="Profiles the writes are spread over.")
+
+    def handle(self, *args, **options):
+        for name, profile in PROFILES.items():
+            with tempfile.TemporaryDirectory() as tmp:
+                result = run(os.path.join(tmp, 'bench.sqlite3'), profile, **{
+                    key: options[key] for key in ('threads', 'writes', 'recipients')
+                })
+            self.stdout.write(
+                f"📊 {name:<17} {result['rate']:8.0f} writes/s  committed={result['committed']} "
+                f"failed={result['failed']} retried={result['retried']} in {result['elapsed']:.2f}s"
+            )
+
+
+def _connect(path, profile):
+    conn = sqlite3.connect(path, timeout=profile['timeout'], isolation_level=None, check_same_thread=False)
+    for pragma in profile['pragmas']:
+        conn.execute(f'PRAGMA {pragma}')
+    return conn
+
+
+def run(path, profile, threads=8, writes=200, recipients=50):
+    """
+    Each transaction mirrors accounts.utility.notify_users for one recipient:
+    read the badge count, insert a notification, bump the counter.
+    """
+    setup = _connect(path, profile)
+    setup.executescript(
+        'CREATE TABLE profile (id INTEGER PRIMARY KEY, unread INTEGER NOT NULL DEFAULT 0);'
+        'CREATE TABLE notification (id INTEGER PRIMARY KEY, recipient_id INTEGER, message TEXT, created REAL);'
+    )
+    setup.executemany('INSERT INTO profile (id) VALUES (?)', [(i,) for i in range(recipients)])
+    setup.close()
+
+    totals = {'committed': 0, 'failed': 0, 'retried': 0}
+    lock = threading.Lock()
+    start = threading.Barrier(threads + 1)
+
+    def worker(number):
+        conn = _connect(path, profile)
+        done = {'committed': 0, 'failed': 0, 'retried': 0}
+        start.wait()
+        for i in range(writes):
+            recipient = (number * writes + i) % recipients
+            attempt = 0
+            while True:
+                try:
+                    conn.execute(profile['begin'])
+                    conn.execute('SELECT unread FROM profile WHERE id = ?', (recipient,)).fetchone()
+                    conn.execute('INSERT INTO notification (recipient_id, message, created) VALUES (?, ?, ?)',
+                                 (recipient, f'Benchmark {number}/{i}', time.time()))
+                    conn.execute('UPDATE profile SET unread = unread + 1 WHERE id = ?', (recipient,))
+                    conn.execute('COMMIT')
+                    done['committed'] += 1
+                    break
+                except sqlite3.OperationalError as e:
+                    if conn.in_transaction:
+                        conn.execute('ROLLBACK')
+                    attempt += 1
+                    if not is_lock_error(e) or attempt > profile['retries']:
+                        done['failed'] += 1
+                        break
+                    done['retried'] += 1
+                    time.sleep(lock_backoff(attempt))
+        conn.close()
+        with lock:
+            for key, value in done.items():
+                totals[key] += value
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in pool:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    return {**totals, 'elapsed': elapsed, 'rate': totals['committed'] / elapsed if elapsed else 0.0}
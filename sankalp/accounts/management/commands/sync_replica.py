@@ -0,0 +1,28 @@
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from sankalp.routers import REPLICA, replica_configured
+
+
+class Command(BaseCommand):
+    help = "Copy the primary SQLite database into the replica file (local stand-in for replication)."
+
+    def handle(self, *args, **options):
+        if not replica_configured():
+            raise CommandError("No replica configured; set DB_REPLICA to a second SQLite file.")
+        primary, replica = connections['default'], connections[REPLICA]
+        if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+            raise CommandError("sync_replica only copies SQLite files; real replicas are fed by the database server.")
+
+        replica.close()
+        source = sqlite3.connect(primary.settings_dict['NAME'])
+        target = sqlite3.connect(replica.settings_dict['NAME'])
+        try:
+            # The backup API copies a consistent snapshot even while the primary is in use.
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        self.stdout.write(f"📀 Replica {replica.settings_dict['NAME']} now matches the primary.")
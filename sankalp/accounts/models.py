@@ -12,11 +12,29 @@ class RoleChoices(models.TextChoices):
     ADVOCATE = 'Advocate', 'Advocate'
 
 
+class DeliveryMode(models.TextChoices):
+    IMMEDIATE = 'Immediate', 'Immediately'
+    HOURLY = 'Hourly', 'Hourly digest'
+    DAILY = 'Daily', 'Daily digest'
+
+
 class Profile(AbstractUser):
     role = models.CharField(max_length=50, choices=RoleChoices.choices)
     contact = models.CharField(max_length=15)
     address = models.TextField(blank=True, null=True)
     reset_token = models.CharField(max_length=100, blank=True, null=True)  # ✅ Added for forgot-password
+    # Denormalized badge count, kept in step by accounts.utility and accounts.signals.
+    unread_notifications = models.PositiveIntegerField(default=0)
+    # How non-urgent emails reach this user; digests are sent by accounts.digest.
+    delivery_mode = models.CharField(max_length=20, choices=DeliveryMode.choices, default=DeliveryMode.IMMEDIATE)
+    last_digest_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # role filters, and the user management list paged on (role, username)
+            models.Index(fields=['role', 'username'], name='profile_role_username_idx'),
+            models.Index(fields=['email'], name='profile_email_idx'),  # forgot-password lookup
+        ]
 
     def __str__(self):
         return f"{self.username} ({self.role})"
@@ -34,6 +52,220 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # unread badge / "unread only" inbox filter
+            models.Index(fields=['recipient', 'is_read', 'created_at'], name='notif_recipient_unread_idx'),
+            # keyset-paginated inbox: WHERE recipient = ? ORDER BY created_at DESC, id DESC
+            models.Index(fields=['recipient', 'created_at', 'id'], name='notif_recipient_inbox_idx'),
+        ]
 
     def __str__(self):
         return f"Notification to {self.recipient} — {'read' if self.is_read else 'unread'}"
+
+
+class OutboxStatus(models.TextChoices):
+    PENDING = 'Pending', 'Pending'
+    SENDING = 'Sending', 'Sending'
+    SENT = 'Sent', 'Sent'
+    DEAD = 'Dead', 'Dead'
+    HELD = 'Held', 'Held for digest'
+    DIGESTED = 'Digested', 'Sent in digest'
+
+
+class OutgoingEmail(models.Model):
+    """
+    One queued email for one recipient.
+    Views add rows with accounts.utility.queue_email and the
+    `process_outbox` management command delivers them, so a slow or
+    unreachable SMTP server never holds up a request.
+    """
+    subject = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254)
+    to = models.EmailField()
+    # Set for rows held back for a digest (recipient prefers hourly/daily delivery).
+    recipient = models.ForeignKey('accounts.Profile', on_delete=models.CASCADE, null=True, blank=True,
+                                  related_name='held_emails')
+    # Dotted path of the Django email backend; blank means settings.EMAIL_BACKEND.
+    backend = models.CharField(max_length=255, blank=True)
+
+    status = models.CharField(max_length=20, choices=OutboxStatus.choices, default=OutboxStatus.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    # Set while a worker owns the row; stale locks are reclaimed.
+    lock_id = models.CharField(max_length=32, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+            models.Index(fields=['lock_id']),
+            models.Index(fields=['status', 'recipient']),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} → {self.to} ({self.status})"
+
+
+class SMSStatus(models.TextChoices):
+    QUEUED = 'Queued', 'Queued'
+    SENDING = 'Sending', 'Sending'
+    SENT = 'Sent', 'Sent'
+    FAILED = 'Failed', 'Failed'
+
+
+class SMSMessage(models.Model):
+    """Delivery record for one SMS handed to accounts.sms.dispatcher."""
+    to = models.CharField(max_length=20)
+    body = models.TextField()
+    status = models.CharField(max_length=20, choices=SMSStatus.choices, default=SMSStatus.QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    transport = models.CharField(max_length=50, blank=True)
+    provider_id = models.CharField(max_length=64, blank=True)  # e.g. Twilio message SID
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)  # when a dispatcher took it (status Sending)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['status', 'created_at'], name='sms_status_created_idx')]
+
+    def __str__(self):
+        return f"SMS → {self.to} ({self.status})"
+
+
+class ReminderLog(models.Model):
+    """
+    One row per campaign reminder sent (accounts.reminders). The unique key
+    makes a rerun of the reminder job skip campaigns it already handled;
+    rescheduling to a new date earns a fresh reminder.
+    """
+    domain = models.CharField(max_length=20)  # 'women_support' | 'legal' | 'medical', '<domain>_manual' for nudges
+    object_id = models.PositiveBigIntegerField()
+    scheduled_date = models.DateField()
+    emails_queued = models.PositiveIntegerField(default=0)
+    sms_queued = models.PositiveIntegerField(default=0)
+    sent_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['domain', 'object_id', 'scheduled_date'], name='unique_campaign_reminder'),
+        ]
+
+    def __str__(self):
+        return f"Reminder {self.domain}#{self.object_id} for {self.scheduled_date}"
+
+
+class DashboardCounter(models.Model):
+    """
+    Materialised status totals for the dashboards (accounts.counters).
+    owner_id is the profile the rows belong to (donor, requesting volunteer,
+    requester), or 0 for the site-wide total of that status.
+    """
+    domain = models.CharField(max_length=20)  # 'education' | 'women_support' | 'legal'
+    status = models.CharField(max_length=20)
+    owner_id = models.PositiveBigIntegerField(default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['domain', 'owner_id', 'status'], name='unique_dashboard_counter'),
+        ]
+
+    def __str__(self):
+        return f"{self.domain}/{self.status}/{self.owner_id or 'all'}: {self.count}"
+
+
+class CampaignDomain(models.TextChoices):
+    EDUCATION = 'education', 'Education'
+    MEDICAL = 'medical', 'Medical'
+    LEGAL = 'legal', 'Legal'
+    WOMEN_SUPPORT = 'women_support', 'Women Support'
+
+
+class CampaignIndex(models.Model):
+    """
+    One denormalised row per education request, medical camp, legal camp and
+    women-support campaign (accounts.campaign_index), so the admin campaign
+    page pages, filters and sorts one table instead of four plus joins.
+    """
+    domain = models.CharField(max_length=20, choices=CampaignDomain.choices)
+    object_id = models.PositiveBigIntegerField()
+    title = models.CharField(max_length=200)
+    status = models.CharField(max_length=50)
+    owner_id = models.PositiveBigIntegerField(null=True, blank=True)
+    owner_name = models.CharField(max_length=150, blank=True)
+    location = models.CharField(max_length=200, blank=True)
+    summary = models.CharField(max_length=255, blank=True)
+    scheduled_date = models.DateField(null=True, blank=True)
+    scheduled_time = models.TimeField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['domain', 'object_id'], name='unique_campaign_index_entry'),
+        ]
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='campaign_idx_created'),
+            models.Index(fields=['scheduled_date', 'id'], name='campaign_idx_scheduled'),
+            models.Index(fields=['domain', 'status', 'created_at', 'id'], name='campaign_idx_domain_status'),
+            models.Index(fields=['status', 'created_at', 'id'], name='campaign_idx_status'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_domain_display()}: {self.title} ({self.status})"
+
+
+class SearchKind(models.TextChoices):
+    LEGAL_ARTICLE = 'legal_article', 'Legal article'
+    LEGAL_QUESTION = 'legal_question', 'Legal Q&A'
+    WOMEN_ARTICLE = 'women_article', 'Women support article'
+    WOMEN_QUESTION = 'women_question', 'Women support Q&A'
+
+
+class SearchDocument(models.Model):
+    """
+    One row per legal / women-support article and answered question
+    (accounts.search_index). On SQLite the text is also held in an FTS5
+    table keyed by this id; elsewhere SearchPosting is the inverted index.
+    """
+    kind = models.CharField(max_length=20, choices=SearchKind.choices)
+    object_id = models.PositiveBigIntegerField()
+    title = models.CharField(max_length=255)
+    body = models.TextField()
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_search_document'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.title}"
+
+
+class SearchPosting(models.Model):
+    """A term of a SearchDocument with its weighted frequency (title hits count extra)."""
+    term = models.CharField(max_length=64)
+    kind = models.CharField(max_length=20, choices=SearchKind.choices)  # copied so lookups filter without a join
+    document = models.ForeignKey(SearchDocument, on_delete=models.CASCADE, related_name='postings')
+    weight = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            # a word's documents, best weight first, read from the index alone
+            models.Index(fields=['term', 'kind', '-weight', 'document'], name='search_posting_term_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.term} → {self.document_id} ({self.weight})"
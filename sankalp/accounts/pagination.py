@@ -0,0 +1,121 @@
+"""
+Keyset (seek) pagination helpers.
+
+A page is fetched with a WHERE on the last row's sort key instead of an
+OFFSET, so page 50 costs the same as page 1. Cursors are opaque,
+URL-safe strings holding the sort-key values of the last row shown.
+"""
+import base64
+import datetime
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    # DjangoJSONEncoder rounds datetimes to milliseconds, which would skip rows created in the same millisecond.
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values):
+    raw = json.dumps(list(values), cls=_CursorEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, model, fields):
+    """Turn a cursor back into typed values for `fields`; None if it is malformed."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if len(values) != len(fields):
+            return None
+        return [model._meta.get_field(name).to_python(value) for name, value in zip(fields, values)]
+    except (ValueError, TypeError, ValidationError):
+        return None
+
+
+def _seek_filter(fields, values, descending):
+    """
+    (a, b) after (x, y)  ==  a >= x AND (a > x OR (a = x AND b > y)), with < for descending order.
+    The redundant leading bound lets the database walk the (a, b) index as a range in sort order.
+    """
+    lookup = 'lt' if descending else 'gt'
+    condition = Q()
+    for i, name in enumerate(fields):
+        step = Q(**{f'{name}__{lookup}': values[i]})
+        for prev, value in zip(fields[:i], values[:i]):
+            step &= Q(**{prev: value})
+        condition |= step
+    return Q(**{f'{fields[0]}__{lookup}e': values[0]}) & condition
+
+
+def keyset_page(queryset, cursor=None, page_size=20, fields=('created_at', 'id'), descending=True):
+    """
+    Return (rows, next_cursor) for the page after `cursor`.
+    `fields` must end in a unique column (usually `id`) so the order is total.
+    """
+    fields = list(fields)
+    ordering = [f'-{name}' if descending else name for name in fields]
+    queryset = queryset.order_by(*ordering)
+
+    values = decode_cursor(cursor, queryset.model, fields)
+    if values is not None:
+        queryset = queryset.filter(_seek_filter(fields, values, descending))
+
+    rows = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, name) for name in fields)
+    return rows, next_cursor
+
+
+class Page:
+    """
+    One keyset page, iterable like the rows it holds. Render its navigation
+    with {% include 'accounts/pagination.html' with page=... %}; the links
+    keep the request's other query parameters (filters) and swap the cursor.
+    """
+
+    def __init__(self, rows, next_cursor, params, is_first):
+        self.rows = rows
+        self.next_cursor = next_cursor
+        self.params = params
+        self.is_first = is_first
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def has_other_pages(self):
+        return bool(self.next_cursor) or not self.is_first
+
+    @property
+    def first_query(self):
+        return self.params.urlencode()
+
+    @property
+    def next_query(self):
+        params = self.params.copy()
+        params['cursor'] = self.next_cursor
+        return params.urlencode()
+
+
+def paginate(request, queryset, page_size=25, fields=('created_at', 'id'), descending=True):
+    """keyset_page() driven by the request's ?cursor=, returned as a Page."""
+    cursor = request.GET.get('cursor')
+    rows, next_cursor = keyset_page(queryset, cursor, page_size, fields=fields, descending=descending)
+    params = request.GET.copy()
+    params.pop('cursor', None)
+    return Page(rows, next_cursor, params, is_first=not cursor)
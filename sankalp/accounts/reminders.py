@@ -0,0 +1,146 @@
+"""
+Campaign reminder engine, run daily by women_support.cron.send_campaign_reminders_cron.
+
+Finds women-support campaigns, legal camps and medical camps scheduled in
+the next CAMPAIGN_REMINDER_HOURS with an indexed range query on
+(status, scheduled_date), records each one in ReminderLog and sends the
+reminders as one bulk outbox insert plus queued SMS. The unique
+ReminderLog key means a rerun never sends the same reminder twice.
+"""
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from accounts.compose import render_for_recipients
+from accounts.models import ReminderLog
+from accounts.utility import queue_rendered_emails, send_phone_sms
+from legal.models import LegalAwarenessCamp
+from medical.models import MedicalCampRequest
+from women_support.models import WomenSupportCampaign
+
+
+class Reminder:
+    """A campaign due soon, normalised across the three apps."""
+
+    def __init__(self, domain, obj, title, location, date, at, recipients):
+        self.domain = domain
+        self.obj = obj
+        self.title = title
+        self.location = location
+        self.date = date
+        self.time = at
+        self.recipients = [r for r in recipients if r is not None]
+
+    @property
+    def starts_at(self):
+        return timezone.make_aware(datetime.combine(self.date, self.time or time.min))
+
+
+def women_support_reminder(camp):
+    return Reminder('women_support', camp, camp.title, camp.location, camp.scheduled_date,
+                    camp.scheduled_time, [camp.volunteer, camp.supporter])
+
+
+def legal_reminder(camp):
+    return Reminder('legal', camp, camp.title, camp.location, camp.scheduled_date,
+                    camp.scheduled_time, [camp.requested_by, camp.assigned_advocate])
+
+
+def medical_reminder(camp):
+    return Reminder('medical', camp, f"Medical camp with {camp.hospital.name}", camp.location,
+                    camp.scheduled_date, camp.time, [camp.volunteer])
+
+
+def upcoming_campaigns(hours=None, now=None):
+    """Every scheduled campaign starting within the next `hours`, soonest first."""
+    now = now or timezone.now()
+    hours = settings.CAMPAIGN_REMINDER_HOURS if hours is None else hours
+    until = now + timedelta(hours=hours)
+    date_range = (timezone.localdate(now), timezone.localdate(until))
+
+    women = WomenSupportCampaign.objects.filter(
+        status='Scheduled', scheduled_date__range=date_range,
+    ).select_related('volunteer', 'supporter')
+    legal = LegalAwarenessCamp.objects.filter(
+        status__in=['Approved', 'Scheduled'], scheduled_date__range=date_range,
+    ).select_related('requested_by', 'assigned_advocate')
+    medical = MedicalCampRequest.objects.filter(
+        approval_status='Scheduled', scheduled_date__range=date_range,
+    ).select_related('volunteer', 'hospital')
+
+    reminders = (
+        [women_support_reminder(camp) for camp in women]
+        + [legal_reminder(camp) for camp in legal]
+        + [medical_reminder(camp) for camp in medical]
+    )
+    # Camps without a time are due all day; timed ones must start inside the window.
+    due = [r for r in reminders if r.time is None or now <= r.starts_at <= until]
+    return sorted(due, key=lambda r: r.starts_at)
+
+
+def _queue(reminders):
+    """Queue emails (one bulk insert) and SMS for `reminders`; returns per-reminder counts."""
+    outgoing, counts = [], []
+    for reminder in reminders:
+        with_email = [r for r in reminder.recipients if r.email]
+        rendered = render_for_recipients('accounts/campaign_reminder_email.html', {'reminder': reminder}, with_email)
+        outgoing += [(recipient.email, email) for recipient, email in rendered]
+
+        sms = 0
+        for recipient in reminder.recipients:
+            if recipient.contact:
+                send_phone_sms(recipient.contact, f"🔔 Reminder: '{reminder.title}' at {reminder.location} "
+                                                  f"on {reminder.date:%d %b %Y}. — Sankalp")
+                sms += 1
+        counts.append((len(with_email), sms))
+
+    queue_rendered_emails("🔔 Upcoming campaign reminder", outgoing)
+    return counts
+
+
+def send_campaign_reminders(hours=None, now=None):
+    """Send reminders for campaigns due soon that were not reminded yet. Returns how many were sent."""
+    due = upcoming_campaigns(hours, now)
+    if not due:
+        return 0
+
+    already = set(
+        ReminderLog.objects.filter(
+            scheduled_date__in={r.date for r in due}, object_id__in={r.obj.pk for r in due},
+        ).values_list('domain', 'object_id', 'scheduled_date')
+    )
+    fresh = [r for r in due if (r.domain, r.obj.pk, r.date) not in already]
+    if not fresh:
+        return 0
+
+    try:
+        with transaction.atomic():
+            logs = [ReminderLog(domain=r.domain, object_id=r.obj.pk, scheduled_date=r.date) for r in fresh]
+            for log, (emails, sms) in zip(logs, _queue(fresh)):
+                log.emails_queued, log.sms_queued = emails, sms
+            # A concurrent run that logged the same campaign makes this insert fail and roll back.
+            ReminderLog.objects.bulk_create(logs)
+    except IntegrityError:
+        return 0
+    return len(fresh)
+
+
+def send_reminder_now(reminder):
+    """
+    On-demand reminder (e.g. a volunteer nudging the supporter). Logged under
+    '<domain>_manual', so the daily run still goes out and the unique key
+    allows one nudge per campaign and date. Returns how many messages were
+    queued, or None when this campaign was already nudged.
+    """
+    try:
+        with transaction.atomic():
+            log = ReminderLog.objects.create(
+                domain=f'{reminder.domain}_manual', object_id=reminder.obj.pk, scheduled_date=reminder.date,
+            )
+            log.emails_queued, log.sms_queued = _queue([reminder])[0]
+            log.save(update_fields=['emails_queued', 'sms_queued'])
+    except IntegrityError:
+        return None
+    return log.emails_queued + log.sms_queued
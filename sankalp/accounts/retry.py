@@ -0,0 +1,54 @@
+"""
+Retry short write transactions that lose a lock race.
+
+SQLite allows one writer at a time; a writer that cannot get the lock
+within the busy timeout fails with "database is locked". Wrapping a short,
+self-contained write in @retry_on_lock re-runs it with jittered exponential
+backoff, up to DB_WRITE_RETRIES extra attempts.
+
+Only the outermost transaction can be retried: inside someone else's
+atomic block the error is re-raised so that block rolls back as a whole.
+Wrapped functions must therefore be safe to run again from the start.
+"""
+import functools
+import random
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connections
+
+LOCK_MESSAGES = ('database is locked', 'database table is locked', 'database schema is locked')
+
+
+def is_lock_error(exc):
+    return any(message in str(exc) for message in LOCK_MESSAGES)
+
+
+def lock_backoff(attempt):
+    """Seconds to wait before retry `attempt` (1, 2, …): base, 2×base, 4×base … with jitter."""
+    delay = settings.DB_WRITE_RETRY_BACKOFF * (2 ** (attempt - 1))
+    return delay * random.uniform(0.5, 1.5)
+
+
+def retry_on_lock(func=None, *, using='default'):
+    """Decorator: re-run `func` when its write hits lock contention."""
+    if func is None:
+        return functools.partial(retry_on_lock, using=using)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        attempt = 0
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as e:
+                attempt += 1
+                if (
+                    not is_lock_error(e)
+                    or attempt > settings.DB_WRITE_RETRIES
+                    or connections[using].in_atomic_block
+                ):
+                    raise
+                time.sleep(lock_backoff(attempt))
+
+    return wrapper
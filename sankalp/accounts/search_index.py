@@ -0,0 +1,370 @@
+"""
+Full-text search over legal / women-support articles and answered questions.
+
+accounts.signals calls sync()/remove() on every save/delete of the four
+source models, so SearchDocument follows the source rows one upsert
+behind at most. Questions are indexed once they have an answer.
+
+Two backends, picked by settings.SEARCH_BACKEND ('auto' chooses the first
+that works):
+
+* 'fts5'   — an SQLite FTS5 table (FTS_TABLE, created on migrate) ranked by
+             bm25() with snippet()/highlight() doing the excerpts
+* 'python' — SearchPosting, an inverted index (term → documents) built
+             here in Python and ranked with BM25 term saturation
+
+Both answer from an index lookup; neither scans with LIKE '%…%'. After
+switching backends run `python manage.py rebuild_search_index`; `migrate`
+builds the index itself on a database that has content but no documents yet
+(backfill_search_index).
+"""
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router, transaction
+from django.db.models import Count
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+from django.utils.text import Truncator
+
+from accounts.models import SearchDocument, SearchKind, SearchPosting
+
+FTS_TABLE = 'accounts_search_fts'
+TITLE_WEIGHT = 10  # a title hit counts as much as ten in the body
+BM25_K1 = 1.2
+CANDIDATE_LIMIT = 1000  # python backend: documents scored per query at most
+SNIPPET_WORDS = 24
+START, END = '\x02', '\x03'  # match markers, turned into <mark> after escaping
+
+WORD_RE = re.compile(r'[^\W_]+')  # letters and digits; FTS5 splits on '_' too
+
+# Dropped from queries (not from the index): they match nearly every document,
+# so they cost the most to rank while changing the order the least.
+STOPWORDS = frozenset(
+    'a about an and are as at be but by can could did do does for from has have how i if in is it me my of on or so '
+    'should that the their there this to was what when where which who why will with would you your'.split()
+)
+
+
+def _article(article):
+    return article.title, article.content
+
+
+def _question(question):
+    if not question.answer:
+        return None
+    return Truncator(question.question).chars(255), f"{question.question}\n\n{question.answer}"
+
+
+def _url(name, with_pk=True):
+    return lambda document: reverse(name, args=[document.object_id] if with_pk else None)
+
+
+# model label -> (kind, builder returning (title, body) or None when not searchable, link)
+SOURCES = {
+    'legal.LegalArticle': (SearchKind.LEGAL_ARTICLE, _article, _url('legal_article_detail')),
+    'legal.LegalQuestion': (SearchKind.LEGAL_QUESTION, _question, _url('legal_questions', with_pk=False)),
+    'women_support.WomenSupportArticle': (SearchKind.WOMEN_ARTICLE, _article, _url('view_article')),
+    'women_support.WomenSupportQuestion': (SearchKind.WOMEN_QUESTION, _question, _url('women_support_questions', with_pk=False)),
+}
+SOURCES_BY_KIND = {kind: link for kind, _, link in SOURCES.values()}
+
+LEGAL_KINDS = [SearchKind.LEGAL_ARTICLE, SearchKind.LEGAL_QUESTION]
+WOMEN_KINDS = [SearchKind.WOMEN_ARTICLE, SearchKind.WOMEN_QUESTION]
+
+
+def kinds_for(user):
+    """Kinds `user` may read: legal content for everyone, women-support content as on its own pages."""
+    if user.role in ('Supporter', 'Beneficiary'):
+        return LEGAL_KINDS + WOMEN_KINDS
+    return list(LEGAL_KINDS)
+
+
+def tokenize(text):
+    """Lower-cased words with accents stripped, matching FTS5's unicode61 remove_diacritics tokenizer."""
+    return [word[:64] for word in WORD_RE.findall(_fold(text))]
+
+
+def query_terms(query):
+    terms = list(dict.fromkeys(tokenize(query)))
+    return [term for term in terms if term not in STOPWORDS] or terms
+
+
+def _fold(text):
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+# ---------------------------------------------------------------- backends
+
+@lru_cache(maxsize=None)
+def _sqlite_has_fts5():
+    import sqlite3
+    try:
+        sqlite3.connect(':memory:').execute('CREATE VIRTUAL TABLE probe USING fts5(body)')
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+def backend(using):
+    choice = settings.SEARCH_BACKEND
+    if choice == 'auto':
+        return 'fts5' if connections[using].vendor == 'sqlite' and _sqlite_has_fts5() else 'python'
+    return choice
+
+
+def create_fts_table(sender=None, using='default', **kwargs):
+    """post_migrate hook: make sure the FTS5 table exists wherever SearchDocument is migrated."""
+    if backend(using) != 'fts5' or not router.allow_migrate_model(using, SearchDocument):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            f"USING fts5(title, body, kind UNINDEXED, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+
+def backfill_search_index(sender=None, using='default', **kwargs):
+    """post_migrate hook: index the existing articles and answers while SearchDocument is still empty."""
+    if not router.allow_migrate_model(using, SearchDocument):
+        return
+    models = [apps.get_model(label) for label in SOURCES]
+    tables = set(connections[using].introspection.table_names())
+    if SearchDocument._meta.db_table not in tables or any(m._meta.db_table not in tables for m in models):
+        return
+    if SearchDocument.objects.using(using).exists() or not any(m.objects.using(using).exists() for m in models):
+        return
+    total = rebuild_search_index(using=using)
+    if kwargs.get('verbosity', 1):
+        print(f"  🔎 Backfilled {total} search document(s).")
+
+
+def _postings(document):
+    weights = Counter(tokenize(document.body))
+    for term in tokenize(document.title):
+        weights[term] += TITLE_WEIGHT
+    return [SearchPosting(term=term, kind=document.kind, document=document, weight=weight)
+            for term, weight in weights.items()]
+
+
+def _index(documents, using):
+    if backend(using) == 'fts5':
+        with connections[using].cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, body, kind) VALUES (%s, %s, %s, %s)",
+                [(d.pk, d.title, d.body, d.kind) for d in documents],
+            )
+    else:
+        SearchPosting.objects.using(using).bulk_create(
+            [posting for document in documents for posting in _postings(document)], batch_size=2000,
+        )
+
+
+def _unindex(document_ids, using):
+    if backend(using) == 'fts5':
+        with connections[using].cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(pk,) for pk in document_ids])
+    else:
+        SearchPosting.objects.using(using).filter(document_id__in=document_ids).delete()
+
+
+# ---------------------------------------------------------------- upkeep
+
+def sync(instance):
+    kind, build, _ = SOURCES[instance._meta.label]
+    fields = build(instance)
+    if fields is None:
+        return remove(instance)
+    title, body = fields
+    using = router.db_for_write(SearchDocument)
+    with transaction.atomic(using=using):
+        document = SearchDocument.objects.using(using).filter(kind=kind, object_id=instance.pk).first()
+        if document and (document.title, document.body) == (title, body):
+            return  # e.g. a status-only save
+        if document:
+            _unindex([document.pk], using)
+            document.title, document.body = title, body
+            document.save(update_fields=['title', 'body'])
+        else:
+            document = SearchDocument.objects.using(using).create(
+                kind=kind, object_id=instance.pk, title=title, body=body, created_at=instance.created_at,
+            )
+        _index([document], using)
+
+
+def remove(instance):
+    kind = SOURCES[instance._meta.label][0]
+    using = router.db_for_write(SearchDocument)
+    with transaction.atomic(using=using):
+        ids = list(SearchDocument.objects.using(using).filter(kind=kind, object_id=instance.pk).values_list('pk', flat=True))
+        if ids:
+            _unindex(ids, using)
+            SearchDocument.objects.using(using).filter(pk__in=ids).delete()
+
+
+def rebuild_search_index(chunk_size=2000, using='default'):
+    """Re-index every article and answered question from scratch. Returns documents indexed."""
+    total = 0
+    with transaction.atomic(using=using):
+        create_fts_table(using=using)
+        if backend(using) == 'fts5':
+            with connections[using].cursor() as cursor:
+                cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        SearchPosting.objects.using(using).all().delete()
+        SearchDocument.objects.using(using).all().delete()
+
+        for label, (kind, build, _) in SOURCES.items():
+            chunk = []
+            for instance in apps.get_model(label).objects.using(using).iterator(chunk_size=chunk_size):
+                fields = build(instance)
+                if fields is not None:
+                    chunk.append(SearchDocument(kind=kind, object_id=instance.pk, title=fields[0], body=fields[1],
+                                                created_at=instance.created_at))
+                if len(chunk) >= chunk_size:
+                    total += _store(chunk, using)
+                    chunk = []
+            if chunk:
+                total += _store(chunk, using)
+    return total
+
+
+def _store(documents, using):
+    documents = SearchDocument.objects.using(using).bulk_create(documents)
+    if documents[0].pk is None:  # backends that cannot return ids from a bulk insert (MySQL)
+        documents = SearchDocument.objects.using(using).filter(
+            kind=documents[0].kind, object_id__in=[d.object_id for d in documents],
+        )
+    _index(documents, using)
+    return len(documents)
+
+
+# ---------------------------------------------------------------- queries
+
+class Hit:
+    def __init__(self, document, title, snippet, score):
+        self.document = document
+        self.title = title  # safe HTML, matches in <mark>
+        self.snippet = snippet
+        self.score = score
+
+    @property
+    def url(self):
+        return SOURCES_BY_KIND[self.document.kind](self.document)
+
+    @property
+    def kind_label(self):
+        return self.document.get_kind_display()
+
+
+def _mark(text):
+    return mark_safe(escape(text).replace(START, '<mark>').replace(END, '</mark>'))
+
+
+def search(query, kinds, limit=20):
+    """The best `limit` documents of `kinds` containing every word of `query`, best first."""
+    terms = query_terms(query)
+    if not terms or not kinds:
+        return []
+    using = router.db_for_read(SearchDocument)
+    if backend(using) == 'fts5':
+        return _search_fts5(terms, kinds, limit, using)
+    return _search_python(terms, kinds, limit, using)
+
+
+def _search_fts5(terms, kinds, limit, using):
+    match = ' '.join(f'"{term}"' for term in terms)
+    placeholders = ', '.join(['%s'] * len(kinds))
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid, highlight({FTS_TABLE}, 0, %s, %s), "
+            f"snippet({FTS_TABLE}, 1, %s, %s, '…', {SNIPPET_WORDS}), bm25({FTS_TABLE}, {TITLE_WEIGHT}.0, 1.0, 0.0) AS score "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND kind IN ({placeholders}) "
+            f"ORDER BY score LIMIT %s",
+            [START, END, START, END, match, *kinds, limit],
+        )
+        rows = cursor.fetchall()
+    documents = SearchDocument.objects.using(using).in_bulk([row[0] for row in rows])
+    return [Hit(documents[pk], _mark(title), _mark(snippet), -score)
+            for pk, title, snippet, score in rows if pk in documents]
+
+
+def _search_python(terms, kinds, limit, using):
+    """
+    BM25 over SearchPosting, starting from the rarest word: its postings are
+    read best-weight-first from the (term, kind, -weight) index and capped at
+    CANDIDATE_LIMIT, and the other words are only looked up for those
+    documents. A query whose every word is that common ranks its top
+    CANDIDATE_LIMIT documents by the rarest word instead of scoring them all.
+    """
+    postings = SearchPosting.objects.using(using).filter(kind__in=kinds)
+    frequency = dict(postings.filter(term__in=terms).values_list('term').annotate(n=Count('pk')))
+    if len(frequency) < len(terms):
+        return []  # some word occurs nowhere
+
+    rarest, *others = sorted(terms, key=frequency.get)
+    matches = defaultdict(dict)  # document id -> {term: weight}
+    for document_id, weight in postings.filter(term=rarest).order_by('-weight').values_list(
+            'document_id', 'weight')[:CANDIDATE_LIMIT]:
+        matches[document_id][rarest] = weight
+    if others:
+        for term, document_id, weight in postings.filter(term__in=others, document_id__in=list(matches)).values_list(
+                'term', 'document_id', 'weight'):
+            matches[document_id][term] = weight
+
+    total = max(document_count(using), *frequency.values())
+    idf = {term: math.log(1 + (total - n + 0.5) / (n + 0.5)) for term, n in frequency.items()}
+    scored = (
+        (sum(idf[t] * w * (BM25_K1 + 1) / (w + BM25_K1) for t, w in found.items()), document_id)
+        for document_id, found in matches.items() if len(found) == len(terms)
+    )
+    best = heapq.nlargest(limit, scored)
+    documents = SearchDocument.objects.using(using).in_bulk([document_id for _, document_id in best])
+    return [Hit(documents[pk], _mark(_highlight(documents[pk].title, terms)),
+                _mark(_snippet(documents[pk].body, terms)), score)
+            for score, pk in best if pk in documents]
+
+
+def document_count(using):
+    """Indexed documents, for idf; cached briefly since a few more or less barely move the ranking."""
+    return cache.get_or_set(f'search:documents:{using}', lambda: SearchDocument.objects.using(using).count(), 300)
+
+
+def _words(text, terms):
+    """(start, end, is_match) for every word of `text`."""
+    wanted = set(terms)
+    return [(m.start(), m.end(), _fold_word(m.group()) in wanted) for m in WORD_RE.finditer(text)]
+
+
+def _fold_word(word):
+    return (word.lower() if word.isascii() else _fold(word))[:64]
+
+
+def _highlight(text, terms):
+    out, last = [], 0
+    for start, end, hit in _words(text, terms):
+        if hit:
+            out += [text[last:start], START, text[start:end], END]
+            last = end
+    return ''.join(out) + text[last:]
+
+
+def _snippet(text, terms):
+    """About SNIPPET_WORDS words of `text` around the first match, like FTS5's snippet()."""
+    words = _words(text, terms)
+    if not words:
+        return ''
+    first = next((i for i, (_, _, hit) in enumerate(words) if hit), 0)
+    begin = max(0, min(first - SNIPPET_WORDS // 4, len(words) - SNIPPET_WORDS))
+    window = words[begin:begin + SNIPPET_WORDS]
+    more = begin + SNIPPET_WORDS < len(words)
+    excerpt = text[window[0][0] if begin else 0:window[-1][1] if more else len(text)]
+    return ('…' if begin else '') + _highlight(excerpt, terms) + ('…' if more else '')
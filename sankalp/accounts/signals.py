@@ -0,0 +1,155 @@
+from django.apps import apps
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from education.models import EducationRequest
+from legal.models import LegalAwarenessCamp
+from women_support.models import WomenSupportCampaign
+
+from . import campaign_index, counters, fragments, search_index, similar_questions
+from .models import Notification, Profile
+from .stats import invalidate_admin_stats
+
+
+# 🔔 Keep Profile.unread_notifications in step with single-row saves/deletes.
+# Bulk paths (notify_users, mark_notifications_read) update the counter themselves.
+@receiver(post_save, sender=Notification)
+def count_new_notification(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and not instance.is_read:
+        Profile.objects.filter(pk=instance.recipient_id).update(
+            unread_notifications=F('unread_notifications') + 1
+        )
+
+
+@receiver(post_delete, sender=Notification)
+def uncount_deleted_notification(sender, instance, **kwargs):
+    if not instance.is_read:
+        Profile.objects.filter(pk=instance.recipient_id).update(
+            unread_notifications=Greatest(F('unread_notifications') - 1, 0)
+        )
+
+
+# 📊 Drop the cached admin dashboard stats when a counted field may have changed.
+# Saves limited to other fields (e.g. login's update_fields=['last_login']) keep the snapshot.
+# Dropped on commit: dropped earlier, a concurrent request could cache the pre-commit numbers again.
+def _stats_field_changed(field, update_fields):
+    return update_fields is None or field in update_fields
+
+
+@receiver(post_save, sender=EducationRequest)
+def education_request_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created or _stats_field_changed('status', update_fields):
+        transaction.on_commit(invalidate_admin_stats)
+
+
+@receiver(post_save, sender=Profile)
+def profile_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created or _stats_field_changed('role', update_fields):
+        transaction.on_commit(invalidate_admin_stats)
+
+
+@receiver(post_delete, sender=EducationRequest)
+@receiver(post_delete, sender=Profile)
+def stats_row_deleted(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_admin_stats)
+
+
+# 🧮 Keep DashboardCounter in step: remember the loaded state, then move the
+# row between counters when a save changes its status or owner.
+COUNTED_MODELS = (EducationRequest, WomenSupportCampaign, LegalAwarenessCamp)
+
+
+def remember_counter_state(sender, instance, **kwargs):
+    _, owner_field = counters.tracked(instance)
+    if not ({'status', owner_field} & instance.get_deferred_fields()):
+        instance._counter_state = counters.counter_state(instance) if instance.pk else None
+
+
+def load_counter_state(sender, instance, raw=False, **kwargs):
+    # Instances loaded with .only()/.defer() skipped post_init; read the stored state instead.
+    if not hasattr(instance, '_counter_state') and instance.pk:
+        stored = sender.objects.filter(pk=instance.pk).first()
+        instance._counter_state = counters.counter_state(stored) if stored else None
+
+
+def move_counter(sender, instance, created, **kwargs):
+    new = counters.counter_state(instance)
+    counters.apply(None if created else getattr(instance, '_counter_state', None), new)
+    instance._counter_state = new
+
+
+def drop_counter(sender, instance, **kwargs):
+    state = getattr(instance, '_counter_state', None) or counters.counter_state(instance)
+    counters.apply(state, None)
+
+
+for model in COUNTED_MODELS:
+    post_init.connect(remember_counter_state, sender=model)
+    pre_save.connect(load_counter_state, sender=model)
+    post_save.connect(move_counter, sender=model)
+    post_delete.connect(drop_counter, sender=model)
+
+
+# 🧩 Retire cached dashboard fragments of a group whenever one of its models changes
+# (on commit, for the same reason as the admin stats above).
+def bump_fragment_group(sender, **kwargs):
+    group = fragments.GROUPS[sender._meta.label]
+    transaction.on_commit(lambda: fragments.bump(group))
+
+
+for label in fragments.GROUPS:
+    model = apps.get_model(label)
+    post_save.connect(bump_fragment_group, sender=model)
+    post_delete.connect(bump_fragment_group, sender=model)
+
+
+# 🗂️ Mirror every campaign into CampaignIndex for the admin campaign page.
+def index_campaign(sender, instance, raw=False, **kwargs):
+    if not raw:
+        campaign_index.sync(instance)
+
+
+def unindex_campaign(sender, instance, **kwargs):
+    campaign_index.remove(instance)
+
+
+for label in campaign_index.SOURCES:
+    model = apps.get_model(label)
+    post_save.connect(index_campaign, sender=model)
+    post_delete.connect(unindex_campaign, sender=model)
+
+
+# 🔎 Keep the search index in step with articles and answered questions.
+def index_for_search(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search_index.sync(instance)
+
+
+def unindex_for_search(sender, instance, **kwargs):
+    search_index.remove(instance)
+
+
+for label in search_index.SOURCES:
+    model = apps.get_model(label)
+    post_save.connect(index_for_search, sender=model)
+    post_delete.connect(unindex_for_search, sender=model)
+
+
+# 💡 Drop un-answered or deleted questions from this process's similar-question index
+# (new answers are picked up by every process from MAX(answered_at)).
+def question_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        similar_questions.question_changed(instance)
+
+
+def question_deleted(sender, instance, **kwargs):
+    similar_questions.question_deleted(instance)
+
+
+for label in similar_questions.KINDS_BY_LABEL:
+    model = apps.get_model(label)
+    post_save.connect(question_changed, sender=model)
+    post_delete.connect(question_deleted, sender=model)
@@ -0,0 +1,289 @@
+"""
+"Has this been asked before?" suggestions for the legal and women-support
+question forms.
+
+Every answered LegalQuestion / WomenSupportQuestion is turned into a
+TF-IDF vector over hashed word unigrams and bigrams (DIMENSIONS buckets,
+crc32 so every process hashes alike) and L2-normalised, so a dot product
+is the cosine similarity. The vectors live in this process as a
+feature-major sparse matrix — one array slice of (row, weight) postings
+per feature — and a query batch only touches the postings of its own
+features, skipping any feature so common (MAX_DF_RATIO) that it would
+cost the most to score while telling questions apart the least.
+
+The full build takes seconds on a large table, so it never runs inside a
+request: warm_up() starts it on a background thread when the server starts
+(sankalp.wsgi / sankalp.asgi, or on the first lookup otherwise), and until
+it is done suggest() answers with no suggestions. After that, updates are
+incremental and shared through the database: each lookup compares
+MAX(answered_at) with the newest answer it has loaded and pulls in only the
+questions answered since, into a small delta segment merged into the main
+matrix every DELTA_LIMIT rows. Deleted or un-answered questions are dropped
+when the suggestions are read back from the database.
+"""
+import logging
+import threading
+import zlib
+from collections import Counter
+
+import numpy as np
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Max, Q
+
+from accounts.models import SearchKind
+from accounts.search_index import STOPWORDS, tokenize
+from sankalp.routers import primary_reads
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = 2 ** 20
+MAX_DF_RATIO = 0.2  # query features in more of the questions than this (and 1000+ of them) are skipped
+DELTA_LIMIT = 500
+
+# kind -> source model; a kind's position here is its code in QuestionIndex.kinds
+SOURCES = {
+    SearchKind.LEGAL_QUESTION: 'legal.LegalQuestion',
+    SearchKind.WOMEN_QUESTION: 'women_support.WomenSupportQuestion',
+}
+KIND_CODES = {kind: code for code, kind in enumerate(SOURCES)}
+KINDS_BY_LABEL = {label: kind for kind, label in SOURCES.items()}
+
+
+def features(text):
+    """Hashed word unigrams and bigrams of `text` with their counts."""
+    words = [word for word in tokenize(text) if word not in STOPWORDS]
+    grams = words + [f'{a} {b}' for a, b in zip(words, words[1:])]
+    return Counter(zlib.crc32(gram.encode()) & (DIMENSIONS - 1) for gram in grams)
+
+
+def question_changed(instance):
+    if not instance.answer:
+        question_deleted(instance)
+
+
+def question_deleted(instance):
+    # Other processes keep the row until their next rebuild; suggest() never returns it.
+    if index is not None:
+        index.discard(KINDS_BY_LABEL[instance._meta.label], instance.pk)
+
+
+def _answered(model):
+    return model.objects.exclude(Q(answer__isnull=True) | Q(answer=''))
+
+
+class QuestionIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self.synced_at = None  # latest answered_at loaded
+        self.rows = {}  # (kind code, question id) -> row
+        self.kinds = np.zeros(0, np.int8)
+        self.ids = np.zeros(0, np.int64)
+        self.alive = np.zeros(0, bool)
+        self.df = np.zeros(DIMENSIONS, np.int32)
+        # main segment: postings of feature f are docs/weights[indptr[f]:indptr[f + 1]]
+        self.indptr = np.zeros(DIMENSIONS + 1, np.int64)
+        self.docs = np.zeros(0, np.int32)
+        self.weights = np.zeros(0, np.float32)
+        # delta segment: unsorted (feature, row, weight) triples added since the last merge
+        self.delta = (np.zeros(0, np.int32), np.zeros(0, np.int32), np.zeros(0, np.float32))
+
+    # ------------------------------------------------------------ upkeep
+
+    def refresh(self):
+        """Load what was answered since the last call, in any process; one MAX() per source when nothing was."""
+        with primary_reads():  # a lagging replica would make the index skip rows for good
+            newest = [apps.get_model(label).objects.aggregate(newest=Max('answered_at'))['newest']
+                      for label in SOURCES.values()]
+            newest = max((at for at in newest if at), default=None)
+            if newest is None or (self.synced_at is not None and newest <= self.synced_at):
+                return
+            with self._lock:
+                if self.synced_at is None or newest > self.synced_at:
+                    self._load()
+
+    def _load(self):
+        """Add every question answered since the last sync (all of them on the first call)."""
+        entries = []
+        synced_at = self.synced_at
+        for kind, label in SOURCES.items():
+            questions = _answered(apps.get_model(label))
+            if synced_at is not None:
+                # >= picks up answers committed with the same timestamp; add() replaces any already indexed.
+                questions = questions.filter(answered_at__gte=synced_at)
+            for pk, text, answered_at in questions.values_list('pk', 'question', 'answered_at').iterator(chunk_size=5000):
+                entries.append((KIND_CODES[kind], pk, text))
+                if answered_at and (self.synced_at is None or answered_at > self.synced_at):
+                    self.synced_at = answered_at
+        if entries:
+            self.add(entries)
+
+    def add(self, entries):
+        """Index (kind code, question id, text) entries; a question already indexed is replaced."""
+        first = len(self.ids)
+        feats, docs, tfs = [], [], []
+        for offset, (kind, pk, text) in enumerate(entries):
+            old = self.rows.get((kind, pk))
+            if old is not None:
+                self.alive[old] = False
+            self.rows[(kind, pk)] = first + offset
+            counts = features(text)
+            feats.extend(counts)
+            docs.extend([first + offset] * len(counts))
+            tfs.extend(counts.values())
+
+        self.kinds = np.concatenate([self.kinds, np.array([e[0] for e in entries], np.int8)])
+        self.ids = np.concatenate([self.ids, np.array([e[1] for e in entries], np.int64)])
+        self.alive = np.concatenate([self.alive, np.ones(len(entries), bool)])
+
+        feats = np.array(feats, np.int32)
+        docs = np.array(docs, np.int32)
+        self.df += np.bincount(feats, minlength=DIMENSIONS).astype(np.int32)
+        weights = (1 + np.log(np.array(tfs, np.float32))) * self._idf(feats)
+        norms = np.sqrt(np.bincount(docs - first, weights=weights ** 2, minlength=len(entries)))
+        weights = (weights / np.maximum(norms[docs - first], 1e-12)).astype(np.float32)
+
+        self.delta = tuple(np.concatenate(pair) for pair in zip(self.delta, (feats, docs, weights)))
+        if len(self.ids) == len(entries) or len(np.unique(self.delta[1])) > DELTA_LIMIT:
+            self._merge()
+
+    def discard(self, kind, pk):
+        row = self.rows.pop((KIND_CODES[kind], pk), None)
+        if row is not None:
+            self.alive[row] = False
+
+    def _idf(self, feats):
+        return (np.log((1 + len(self.ids)) / (1 + self.df[feats])) + 1).astype(np.float32)
+
+    def _merge(self):
+        """Fold the delta segment into the feature-sorted main one."""
+        main_feats = np.repeat(np.arange(DIMENSIONS, dtype=np.int32), np.diff(self.indptr))
+        feats = np.concatenate([main_feats, self.delta[0]])
+        order = np.argsort(feats, kind='stable')
+        self.docs = np.concatenate([self.docs, self.delta[1]])[order]
+        self.weights = np.concatenate([self.weights, self.delta[2]])[order]
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(feats, minlength=DIMENSIONS))])
+        self.delta = (np.zeros(0, np.int32), np.zeros(0, np.int32), np.zeros(0, np.float32))
+
+    # ------------------------------------------------------------ lookups
+
+    def query(self, texts, kinds, limit):
+        """For each text, up to `limit` (kind, question id, similarity) of `kinds`, most similar first."""
+        with self._lock:  # a merge swaps several arrays
+            return self._query(texts, kinds, limit)
+
+    def _query(self, texts, kinds, limit):
+        rows = len(self.ids)
+        if not rows or not texts:
+            return [[] for _ in texts]
+
+        # Query matrix over the features the batch uses, too-common ones left out.
+        vectors = [features(text) for text in texts]
+        cutoff = max(MAX_DF_RATIO * rows, 1000)
+        used = np.array(sorted({f for v in vectors for f in v if self.df[f] <= cutoff}), np.int32)
+        matrix = np.zeros((len(texts), len(used)), np.float32)
+        column = {f: i for i, f in enumerate(used.tolist())}
+        for b, vector in enumerate(vectors):
+            for f, tf in vector.items():
+                if f in column:
+                    matrix[b, column[f]] = 1 + np.log(tf)
+        matrix *= self._idf(used)
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+        # Gather every (text, row) contribution, then sum them in one bincount over text * rows + row.
+        cells, values = [], []
+        for i, f in enumerate(used.tolist()):
+            start, end = self.indptr[f], self.indptr[f + 1]
+            for b in np.flatnonzero(matrix[:, i]) if start < end else ():
+                cells.append(self.docs[start:end] + b * rows)
+                values.append(self.weights[start:end] * matrix[b, i])
+        delta_feats, delta_docs, delta_weights = self.delta
+        if len(delta_feats) and len(used):
+            position = np.minimum(np.searchsorted(used, delta_feats), len(used) - 1)
+            hit = used[position] == delta_feats
+            for b in range(len(texts)):
+                cells.append(delta_docs[hit] + b * rows)
+                values.append(delta_weights[hit] * matrix[b, position[hit]])
+        if not cells:
+            return [[] for _ in texts]
+        scores = np.bincount(np.concatenate(cells), weights=np.concatenate(values),
+                             minlength=len(texts) * rows).reshape(len(texts), rows)
+
+        scores *= self.alive & np.isin(self.kinds, [KIND_CODES[k] for k in kinds])
+        k = min(limit, rows)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for b in range(len(texts)):
+            best = top[b][np.argsort(-scores[b, top[b]])]
+            results.append([(list(SOURCES)[self.kinds[row]], int(self.ids[row]), float(scores[b, row]))
+                            for row in best if scores[b, row] > 0])
+        return results
+
+
+index = None  # the live QuestionIndex once built
+_builder = None
+_builder_lock = threading.Lock()
+
+
+def build_index():
+    """Build a complete index from the database and make it the live one (blocking)."""
+    global index
+    fresh = QuestionIndex()
+    fresh.refresh()
+    index = fresh
+    return fresh
+
+
+def _build_in_background():
+    try:
+        build_index()
+        logger.info("Similar-question index built: %s questions", len(index.ids))
+    except Exception:
+        logger.exception("Building the similar-question index failed")
+    finally:
+        close_old_connections()
+
+
+def warm_up():
+    """Start building the index on a background thread unless it is built or being built. Never blocks."""
+    global _builder
+    with _builder_lock:
+        if index is None and (_builder is None or not _builder.is_alive()):
+            _builder = threading.Thread(target=_build_in_background, name='similar-questions-index', daemon=True)
+            _builder.start()
+
+
+def suggest(texts, kinds, limit=None, min_score=None):
+    """
+    For each text, the most similar answered questions of `kinds` as dicts
+    (kind, id, score, question, answer), read back from the database. Empty
+    lists while the index is still being built.
+    """
+    limit = limit or settings.SIMILAR_QUESTIONS_LIMIT
+    min_score = settings.SIMILAR_QUESTIONS_MIN_SCORE if min_score is None else min_score
+    live = index
+    if live is None:
+        warm_up()
+        return [[] for _ in texts]
+    live.refresh()
+    matches = [[m for m in found if m[2] >= min_score] for found in live.query(texts, kinds, limit)]
+
+    wanted = {}
+    for kind, pk, _ in (m for found in matches for m in found):
+        wanted.setdefault(kind, set()).add(pk)
+    questions = {
+        (kind, question.pk): question
+        for kind, pks in wanted.items()
+        for question in _answered(apps.get_model(SOURCES[kind])).filter(pk__in=pks).only('question', 'answer')
+    }
+    return [
+        [{
+            'kind': kind, 'id': pk, 'score': round(score, 3),
+            'question': questions[kind, pk].question, 'answer': questions[kind, pk].answer,
+        } for kind, pk, score in found if (kind, pk) in questions]
+        for found in matches
+    ]
@@ -0,0 +1,206 @@
+"""
+SMS dispatch: one long-lived transport, a bounded in-memory queue and a
+single sender thread that respects SMS_RATE_LIMIT messages per second.
+Every message gets an SMSMessage row recording its outcome.
+
+The in-memory queue is only a fast path: the row stays Queued until a
+dispatcher claims it (Queued -> Sending in one UPDATE), so a restart loses
+nothing. The sender thread picks up leftover rows when it starts, and
+`python manage.py send_queued_sms` (also run from CRONJOBS) drains them
+in processes that never send on their own. A row left in Sending for
+SMS_CLAIM_TIMEOUT seconds belonged to a process that died mid-send and
+is tried again.
+
+settings.SMS_TRANSPORT picks where messages go:
+* accounts.sms.TwilioTransport  — real delivery (one twilio Client per process)
+* accounts.sms.InMemoryTransport — collects messages in InMemoryTransport.outbox
+* accounts.sms.FileTransport     — appends JSON lines to SMS_FILE_PATH
+The last two need no network, which makes load tests of the education flow possible.
+"""
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from decouple import config
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from accounts.models import SMSMessage, SMSStatus
+from accounts.retry import retry_on_lock
+
+logger = logging.getLogger(__name__)
+
+
+class TwilioTransport:
+    name = 'twilio'
+
+    def __init__(self):
+        from twilio.rest import Client
+
+        self.client = Client(config('ACCOUNT_SID'), config('AUTH_TOKEN'))
+        self.from_num = config('FROM_NUM')
+
+    def send(self, to, body):
+        return self.client.messages.create(from_=self.from_num, body=body, to=to).sid
+
+
+class InMemoryTransport:
+    name = 'memory'
+    outbox = []
+
+    def send(self, to, body):
+        InMemoryTransport.outbox.append({'to': to, 'body': body})
+        return uuid.uuid4().hex
+
+
+class FileTransport:
+    name = 'file'
+
+    def __init__(self):
+        self.path = settings.SMS_FILE_PATH
+        self._lock = threading.Lock()
+
+    def send(self, to, body):
+        message_id = uuid.uuid4().hex
+        line = json.dumps({'id': message_id, 'to': to, 'body': body, 'at': timezone.now().isoformat()})
+        with self._lock, open(self.path, 'a', encoding='utf-8') as fh:
+            fh.write(line + '\n')
+        return message_id
+
+
+class SMSDispatcher:
+    def __init__(self):
+        self._queue = queue.Queue(maxsize=settings.SMS_QUEUE_SIZE)
+        self._transport = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    @property
+    def transport(self):
+        if self._transport is None:
+            self._transport = import_string(settings.SMS_TRANSPORT)()
+        return self._transport
+
+    @retry_on_lock
+    def submit(self, to, body):
+        """Record the message and hand it to the sender thread once committed. Never blocks the caller."""
+        sms = SMSMessage.objects.create(to=to, body=body)
+        transaction.on_commit(lambda: self._enqueue(sms.id))
+        return sms
+
+    def _enqueue(self, sms_id):
+        try:
+            self._queue.put_nowait(sms_id)
+        except queue.Full:
+            # Stays Queued: the next send_queued_sms run (or worker start) picks it up.
+            logger.warning("SMS queue full, message %s left for send_queued_sms", sms_id)
+            return
+        self._ensure_worker()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='sms-dispatcher', daemon=True)
+                self._thread.start()
+
+    def _wait_for_slot(self):
+        rate = settings.SMS_RATE_LIMIT
+        if rate <= 0:
+            return
+        now = time.monotonic()
+        if self._next_slot > now:
+            time.sleep(self._next_slot - now)
+        self._next_slot = max(now, self._next_slot) + 1.0 / rate
+
+    def _run(self):
+        self._requeue_leftovers()
+        while True:
+            sms_id = self._queue.get()
+            try:
+                close_old_connections()
+                self.deliver(sms_id)
+            except Exception:
+                logger.exception("SMS dispatcher error for message %s", sms_id)
+            finally:
+                self._queue.task_done()
+
+    def _requeue_leftovers(self):
+        """Queue rows an earlier process accepted but never sent (the thread starts once per process)."""
+        try:
+            close_old_connections()
+            for sms_id in pending_ids():
+                self._queue.put_nowait(sms_id)
+        except queue.Full:
+            pass
+        except Exception:
+            logger.exception("Could not requeue leftover SMS messages")
+
+    def _claim(self, sms_id):
+        """Take the message for this process; False when someone else has it or it is done."""
+        now = timezone.now()
+        stale = now - timedelta(seconds=settings.SMS_CLAIM_TIMEOUT)
+        return bool(SMSMessage.objects.filter(
+            Q(status=SMSStatus.QUEUED) | Q(status=SMSStatus.SENDING, claimed_at__lt=stale), id=sms_id,
+        ).update(status=SMSStatus.SENDING, claimed_at=now))
+
+    def deliver(self, sms_id):
+        """Send one message now. None when it was not ours to send, else whether it went out."""
+        if not self._claim(sms_id):
+            return None
+        sms = SMSMessage.objects.get(id=sms_id)
+        error = ''
+        for attempt in range(1, settings.SMS_MAX_ATTEMPTS + 1):
+            self._wait_for_slot()
+            try:
+                provider_id = self.transport.send(sms.to, sms.body)
+            except Exception as e:
+                error = str(e) or e.__class__.__name__
+                logger.warning("SMS %s attempt %s/%s failed: %s", sms_id, attempt, settings.SMS_MAX_ATTEMPTS, error)
+                if attempt < settings.SMS_MAX_ATTEMPTS:
+                    time.sleep(settings.SMS_RETRY_BACKOFF * (2 ** (attempt - 1)))
+                continue
+            SMSMessage.objects.filter(id=sms_id).update(
+                status=SMSStatus.SENT, attempts=attempt, transport=self.transport.name,
+                provider_id=provider_id or '', last_error='', sent_at=timezone.now(),
+            )
+            return True
+
+        SMSMessage.objects.filter(id=sms_id).update(
+            status=SMSStatus.FAILED, attempts=settings.SMS_MAX_ATTEMPTS,
+            transport=getattr(self._transport, 'name', ''), last_error=error,
+        )
+        logger.error("SMS %s to %s failed after %s attempts: %s", sms_id, sms.to, settings.SMS_MAX_ATTEMPTS, error)
+        return False
+
+    def drain(self, limit=None):
+        """Deliver leftover messages in this thread; returns (sent, failed)."""
+        sent = failed = 0
+        for sms_id in pending_ids(limit):
+            outcome = self.deliver(sms_id)
+            sent += outcome is True
+            failed += outcome is False
+        return sent, failed
+
+    def join(self):
+        """Block until everything queued so far is delivered (tests and load scripts)."""
+        self._queue.join()
+
+
+def pending_ids(limit=None):
+    """Messages waiting for a dispatcher: still Queued, or claimed by a process that died, oldest first."""
+    stale = timezone.now() - timedelta(seconds=settings.SMS_CLAIM_TIMEOUT)
+    ids = SMSMessage.objects.filter(
+        Q(status=SMSStatus.QUEUED) | Q(status=SMSStatus.SENDING, claimed_at__lt=stale),
+    ).order_by('created_at').values_list('id', flat=True)
+    return list(ids[:limit] if limit else ids)
+
+
+dispatcher = SMSDispatcher()
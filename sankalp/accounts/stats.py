@@ -0,0 +1,55 @@
+"""
+Admin dashboard counters.
+
+Education totals come from the DashboardCounter rows (accounts.counters)
+and profiles are counted with one conditionally aggregated query, so a
+refresh is two queries whatever the table sizes. The result is cached for
+DASHBOARD_STATS_TTL seconds; accounts.signals drops the snapshot whenever
+an education request's status or a profile's role changes, so the TTL
+only bounds staleness from bulk updates.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from accounts.counters import counts
+from accounts.models import Profile, RoleChoices
+from sankalp.routers import primary_reads
+
+CACHE_KEY = 'accounts:admin_dashboard_stats'
+
+REQUEST_STATUSES = {
+    'pending_requests': 'Pending',
+    'forwarded_requests': 'Forwarded',
+    'approved_requests': 'Approved',
+    'rejected_requests': 'Rejected',
+}
+ROLE_TOTALS = {
+    'total_volunteers': RoleChoices.VOLUNTEER,
+    'total_donors': RoleChoices.DONOR,
+    'total_beneficiaries': RoleChoices.BENEFICIARY,
+}
+
+
+def compute_admin_stats():
+    """Two queries, whatever the table sizes."""
+    by_status = counts('education')
+    stats = {key: by_status.get(status, 0) for key, status in REQUEST_STATUSES.items()}
+    stats['total_requests'] = sum(by_status.values())
+    stats.update(Profile.objects.aggregate(
+        **{key: Count('id', filter=Q(role=role)) for key, role in ROLE_TOTALS.items()},
+    ))
+    return stats
+
+
+def get_admin_stats():
+    stats = cache.get(CACHE_KEY)
+    if stats is None:
+        with primary_reads():
+            stats = compute_admin_stats()
+        cache.set(CACHE_KEY, stats, settings.DASHBOARD_STATS_TTL)
+    return stats
+
+
+def invalidate_admin_stats():
+    cache.delete(CACHE_KEY)
@@ -0,0 +1,48 @@
+from django import template
+from django.template.base import token_kwargs
+
+from accounts import fragments
+from sankalp.routers import primary_reads
+
+register = template.Library()
+
+# Cached HTML is shared between users, so each user's CSRF token is put back in on the way out.
+CSRF_SLOT = 'csrfslot0fragment0cache'
+
+
+class CachedFragmentNode(template.Node):
+    def __init__(self, nodelist, name, on, vary):
+        self.nodelist = nodelist
+        self.name = name
+        self.on = on
+        self.vary = vary
+
+    def render(self, context):
+        groups = [g.strip() for g in self.on.resolve(context).split(',') if g.strip()]
+        key = fragments.fragment_key(
+            self.name.resolve(context), groups, [v.resolve(context) for v in self.vary],
+        )
+        html = fragments.get(key)
+        if html is None:
+            # Cached for everyone until the group changes, so built from the primary, never a lagging replica.
+            with context.push(csrf_token=CSRF_SLOT), primary_reads():
+                html = self.nodelist.render(context)
+            fragments.store(key, html)
+        return html.replace(CSRF_SLOT, str(context.get('csrf_token', '')))
+
+
+@register.tag
+def cached_fragment(parser, token):
+    """{% cached_fragment "name" on="group[,group]" [vary=expr ...] %} ... {% endcached_fragment %}"""
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' needs a fragment name and on=\"group\".")
+    name = parser.compile_filter(bits[1])
+    kwargs = token_kwargs(bits[2:], parser)
+    if 'on' not in kwargs:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' needs on=\"group\".")
+    on = kwargs.pop('on')
+    vary = [kwargs.pop(k) for k in sorted(kwargs)]
+    nodelist = parser.parse(('endcached_fragment',))
+    parser.delete_first_token()
+    return CachedFragmentNode(nodelist, name, on, vary)
@@ -1,3 +1,1111 @@
-from django.test import TestCase
+import json
+import re
+import tempfile
+import time
+import uuid
+import warnings
+from datetime import timedelta
+from pathlib import Path
+from smtplib import SMTPRecipientsRefused
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends import locmem
+from django.db import OperationalError, connection, connections, router, transaction
+from django.template import Context, Template
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, reverse
+from django.utils import timezone
+
+from accounts import fragments
+from accounts.camp_calendar import calendar_token
+from accounts.checks import report_cache_settings
+from accounts.campaign_index import backfill_campaign_index
+from accounts.compose import get_email_template, render_for_recipients
+from accounts.counters import backfill_counters, counts
+from accounts.digest import send_digests
+from accounts.mailer import backoff_delay, claim_batch, process_outbox
+from accounts.models import (
+    CampaignIndex, Notification, DashboardCounter, DeliveryMode, OutboxStatus, OutgoingEmail, Profile, ReminderLog, SearchDocument,
+    SearchKind, SMSMessage, SMSStatus,
+)
+from accounts.pagination import encode_cursor, paginate
+from accounts.reminders import send_campaign_reminders
+from accounts.retry import retry_on_lock
+from accounts.search_index import LEGAL_KINDS, WOMEN_KINDS, backfill_search_index, rebuild_search_index, search
+from accounts.similar_questions import SOURCES as QUESTION_SOURCES, QuestionIndex, build_index, suggest
+from accounts.sms import FileTransport, InMemoryTransport, SMSDispatcher
+from accounts.stats import get_admin_stats
+from accounts.utility import mark_notifications_read, notify_users, queue_email
+from education.models import EducationRequest
+from legal.models import LegalArticle, LegalAwarenessCamp, LegalQuestion
+from medical.models import Hospital, MedicalCampRequest
+from sankalp.query_budgets import budget_for
+from sankalp.querycount import QueryBudgetExceeded, query_budget
+from sankalp.routers import PIN_COOKIE, REPLICA, _Route, _route, replica_configured
+from women_support.models import WomenSupportArticle, WomenSupportCampaign, WomenSupportQuestion
+
+# Tables whose filtered reads must always go through an index.
+HOT_TABLES = {
+    'accounts_profile',
+    'education_educationrequest',
+    'legal_legalawarenesscamp',
+    'women_support_womensupportcampaign',
+    'women_support_womensupportquestion',
+}
+FULL_SCAN_RE = re.compile(r'^SCAN (\w+)$')
+
+
+class SharedReplicaTestCase(TestCase):
+    """
+    TestCase keeps its rows in an open transaction on 'default', which a
+    separate replica connection cannot see, so the replica alias borrows the
+    default connection instead. Without DB_REPLICA the alias is added here as
+    a TEST MIRROR of default, so the routing runs under any test runner.
+    """
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        # Registered before super() so they run after the subclasses' own overrides are undone.
+        if not replica_configured():
+            added = override_settings(DATABASES={
+                **settings.DATABASES,
+                REPLICA: {**settings.DATABASES['default'], 'TEST': {'MIRROR': 'default'}},
+            })
+            with warnings.catch_warnings():
+                # Only the alias is added; the connections already open are left as they are.
+                warnings.filterwarnings('ignore', 'Overriding setting DATABASES')
+                added.enable()
+            cls.addClassCleanup(added.disable)
+            cls.addClassCleanup(connections.__delitem__, REPLICA)
+        else:
+            cls.addClassCleanup(connections.__setitem__, REPLICA, connections[REPLICA])
+        connections[REPLICA] = connections['default']
+        super().setUpClass()
+
+
+@skipUnless(connection.vendor == 'sqlite', "query plans are read from SQLite's EXPLAIN QUERY PLAN")
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class QueryPlanTests(SharedReplicaTestCase):
+    """
+    Runs the hot views against a seeded database and EXPLAINs every query
+    they issue. A filtered read on a hot table that falls back to a full
+    table scan means an index went missing or a filter stopped matching it.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        roles = ['Admin', 'Volunteer', 'Donor', 'Beneficiary', 'Advocate', 'Supporter']
+        Profile.objects.bulk_create([
+            Profile(username=f'{role.lower()}{i}', email=f'{role.lower()}{i}@example.com', role=role, password='!')
+            for role in roles for i in range(30)
+        ])
+        cls.users = {role: Profile.objects.filter(role=role).first() for role in roles}
+        beneficiaries = list(Profile.objects.filter(role='Beneficiary'))
+        donors = list(Profile.objects.filter(role='Donor'))
+        volunteers = list(Profile.objects.filter(role='Volunteer'))
+
+        statuses = ['Pending', 'Forwarded', 'Approved', 'Rejected']
+        EducationRequest.objects.bulk_create([
+            EducationRequest(
+                beneficiary=beneficiaries[i % len(beneficiaries)], full_name=f'Student {i}', education_level='School',
+                reason='Fees', status=statuses[i % 4], forwarded_to=donors[i % len(donors)] if i % 4 else None,
+                volunteer=volunteers[i % len(volunteers)],
+            )
+            for i in range(400)
+        ])
+        today = timezone.localdate()
+        WomenSupportCampaign.objects.bulk_create([
+            WomenSupportCampaign(
+                title=f'Campaign {i}', description='Awareness', location='Hall', volunteer=volunteers[i % len(volunteers)],
+                status=['Pending', 'Approved', 'Scheduled', 'Rejected'][i % 4], scheduled_date=today + timedelta(days=i % 30),
+            )
+            for i in range(200)
+        ])
+        LegalAwarenessCamp.objects.bulk_create([
+            LegalAwarenessCamp(
+                title=f'Legal camp {i}', description='Rights', location='Hall', proposed_date=today,
+                requested_by=volunteers[i % len(volunteers)], status=['Pending', 'Approved', 'Rejected'][i % 3],
+            )
+            for i in range(200)
+        ])
+        WomenSupportQuestion.objects.bulk_create([
+            WomenSupportQuestion(
+                asked_by=beneficiaries[i % len(beneficiaries)], question=f'Question {i}',
+                answer='Answer' if i % 2 else None,
+            )
+            for i in range(200)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def setUp(self):
+        cache.clear()
+
+    def assertIndexedQueries(self, role, method, url, data=None):
+        self.client.force_login(self.users[role])
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url, data or {})
+        self.assertLess(response.status_code, 400, url)
+
+        with connection.cursor() as cursor:
+            for query in ctx.captured_queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT') or ' WHERE ' not in sql:
+                    continue
+                # captured SQL has its parameters inlined; EXPLAIN it as-is
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                details = [row[-1] for row in cursor.fetchall()]
+                scans = [m.group(1) for m in map(FULL_SCAN_RE.match, details) if m and m.group(1) in HOT_TABLES]
+                self.assertFalse(scans, f"{role} {url}: full scan of {scans} in\n{sql}\nplan: {details}")
+
+    def test_dashboards(self):
+        for role in self.users:
+            with self.subTest(role=role):
+                self.assertIndexedQueries(role, 'get', '/dashboard/')
+
+    def test_dashboard_sections(self):
+        for role, section in [('Volunteer', 'volunteer_approved'), ('Donor', 'donor_forwarded')]:
+            with self.subTest(section=section):
+                self.assertIndexedQueries(role, 'get', f'/dashboard/section/{section}/')
+
+    def test_education_pages(self):
+        self.assertIndexedQueries('Volunteer', 'get', '/education/volunteer/requests/')
+        self.assertIndexedQueries('Beneficiary', 'get', '/education/info/')
+        self.assertIndexedQueries('Beneficiary', 'get', '/education/details/')
+
+    def test_women_support_pages(self):
+        self.assertIndexedQueries('Beneficiary', 'get', '/women-support/info/')
+        self.assertIndexedQueries('Supporter', 'get', '/women-support/supporter/dashboard/')
+        self.assertIndexedQueries('Supporter', 'get', '/women-support/questions/')
+
+    def test_legal_pages(self):
+        self.assertIndexedQueries('Beneficiary', 'get', '/legal/info/')
+        self.assertIndexedQueries('Advocate', 'get', '/legal/info/')
+
+    def test_forgot_password_lookup(self):
+        self.client.logout()
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post('/login/', {'action': 'forgot', 'email': 'donor3@example.com'})
+        lookup = next(q['sql'] for q in ctx.captured_queries if 'accounts_profile' in q['sql'] and '"email" =' in q['sql'])
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {lookup}')
+            details = ' '.join(row[-1] for row in cursor.fetchall())
+        self.assertIn('profile_email_idx', details)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class ReplicaRoutingTests(SharedReplicaTestCase):
+    """Runs against the replica alias SharedReplicaTestCase mirrors onto the test database."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.donor = Profile.objects.create(username='donor', email='donor@example.com', role='Donor', password='!')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_write_pins_client_to_primary(self):
+        response = self.client.post('/login/', {'action': 'forgot', 'email': 'donor@example.com'})
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], 10)
+        response = self.client.get('/about/')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_listed_views_read_from_replica(self):
+        self.client.force_login(self.donor)
+        response = self.client.get('/dashboard/')
+        self.assertEqual(response.wsgi_request.user._state.db, REPLICA)
+        response = self.client.get('/notifications/')
+        self.assertEqual(response.wsgi_request.user._state.db, 'default')
+
+    def test_pinned_client_reads_from_primary(self):
+        self.client.force_login(self.donor)
+        self.client.cookies[PIN_COOKIE] = '1'
+        response = self.client.get('/dashboard/')
+        self.assertEqual(response.wsgi_request.user._state.db, 'default')
+
+    def test_cached_fragments_are_built_from_the_primary(self):
+        reads_from = type('ReadsFrom', (), {'__str__': lambda self: router.db_for_read(Profile)})()
+        template = Template(
+            '{% load dashboard_cache %}{{ db }}|'
+            '{% cached_fragment "routing_probe" on="education" %}{{ db }}{% endcached_fragment %}'
+        )
+        token = _route.set(_Route())
+        try:
+            _route.get().replica = True
+            html = template.render(Context({'db': reads_from}))
+        finally:
+            _route.reset(token)
+        self.assertEqual(html, f'{REPLICA}|default')
+
+
+# Every named route, the role that normally opens it and how to build its URL arguments.
+ROUTE_VISITS = {
+    'home': (None, None), 'about': (None, None), 'contact': (None, None), 'register': (None, None),
+    'login': (None, None), 'logout': ('Beneficiary', None),
+    'reset_password': (None, lambda t: {'token': 'not-a-token'}),
+    'dashboard': ('Admin', None), 'admin_dashboard': ('Admin', None), 'volunteer_dashboard': ('Volunteer', None),
+    'donor_dashboard': ('Donor', None), 'beneficiary_dashboard': ('Beneficiary', None),
+    'advocate_dashboard': ('Advocate', None), 'supporter_dashboard': ('Supporter', None),
+    'upcoming_camps': ('Beneficiary', None), 'upcoming_camps_ics': (None, lambda t: {'token': calendar_token(t.users['Beneficiary'])}), 'search': ('Beneficiary', None),
+    'similar_questions': ('Beneficiary', None),
+    'dashboard_section': ('Volunteer', lambda t: {'section': 'volunteer_approved'}),
+    'notification_inbox': ('Volunteer', None), 'notification_feed': ('Volunteer', None),
+    'notification_stream': ('Volunteer', None), 'notification_preferences': ('Volunteer', None), 'mark_notifications_read': ('Volunteer', None),
+    'mark_all_notifications_read': ('Volunteer', None),
+    'admin_user_management': ('Admin', None), 'admin_user_edit': ('Admin', lambda t: {'pk': t.users['Donor'].pk}),
+    'admin_user_delete': ('Admin', lambda t: {'pk': t.users['Donor'].pk}),
+    'admin_campaign_management': ('Admin', None),
+    'education_request': ('Beneficiary', None), 'education_info': ('Beneficiary', None),
+    'volunteer_education_requests': ('Volunteer', None), 'admin_education_requests': ('Admin', None),
+    'volunteer_forward_request': ('Volunteer', lambda t: {'pk': t.education.pk}),
+    'approve_student_request': ('Donor', lambda t: {'request_id': t.education.pk}),
+    'reject_student_request': ('Donor', lambda t: {'request_id': t.education.pk}),
+    'education_details': ('Beneficiary', None),
+    'medical_camp_request': ('Volunteer', None), 'volunteer_medical_list': ('Volunteer', None),
+    'medical_info': ('Admin', None), 'medical_camp_detail': ('Volunteer', lambda t: {'pk': t.medical.pk}),
+    'hospital_approve_request': (None, lambda t: {'token': t.medical.approval_token}),
+    'request_legal_camp': ('Volunteer', None), 'legal_info': ('Advocate', None), 'advocate_list': ('Volunteer', None),
+    'update_camp_status': ('Advocate', lambda t: {'camp_id': t.legal.pk}),
+    'approve_legal_camp': ('Advocate', lambda t: {'camp_id': t.legal.pk}),
+    'legal_articles': ('Beneficiary', None), 'legal_questions': ('Advocate', None),
+    'answer_legal_question': ('Advocate', lambda t: {'question_id': t.legal_question.pk}),
+    'edit_legal_article': ('Advocate', lambda t: {'pk': t.legal_article.pk}),
+    'delete_legal_article': ('Advocate', lambda t: {'pk': t.legal_article.pk}),
+    'legal_article_detail': ('Beneficiary', lambda t: {'pk': t.legal_article.pk}),
+    'women_support_info': ('Volunteer', None), 'request_campaign': ('Volunteer', None),
+    'approve_campaign': ('Supporter', lambda t: {'pk': t.campaign.pk}),
+    'schedule_women_campaign': ('Volunteer', lambda t: {'campaign_id': t.campaign.pk}),
+    'women_support_articles': ('Beneficiary', None), 'create_article': ('Supporter', None),
+    'edit_article': ('Supporter', lambda t: {'pk': t.article.pk}),
+    'delete_article': ('Supporter', lambda t: {'pk': t.article.pk}),
+    'view_article': ('Beneficiary', lambda t: {'pk': t.article.pk}),
+    'women_support_questions': ('Supporter', None), 'women_ask_question': ('Beneficiary', None),
+    'reply_question': ('Supporter', lambda t: {'pk': t.question.pk}),
+    'approve_women_campaign': ('Supporter', lambda t: {'pk': t.campaign.pk}),
+    'reject_women_campaign': ('Supporter', lambda t: {'pk': t.campaign.pk}),
+    'campaign_handled': ('Supporter', lambda t: {'pk': t.campaign.pk}),
+    'send_supporter_reminder': ('Volunteer', lambda t: {'pk': t.campaign.pk}),
+    'view_campaign': ('Supporter', lambda t: {'pk': t.campaign.pk}),
+}
+
+
+def named_routes(resolver=None, namespace=''):
+    """view names of every named route under `resolver`, e.g. 'dashboard' or 'admin:index'."""
+    resolver = resolver or get_resolver()
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            inner = f'{namespace}{pattern.namespace}:' if pattern.namespace else namespace
+            yield from named_routes(pattern, inner)
+        elif pattern.name:
+            yield f'{namespace}{pattern.name}'
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], QUERY_BUDGET_MODE='raise')
+class QueryBudgetTests(SharedReplicaTestCase):
+    """
+    Opens every route with a dozen rows per table; the middleware raises
+    QueryBudgetExceeded when a view goes over its budget in
+    sankalp.query_budgets or repeats a statement (an N+1 loop).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        roles = ['Admin', 'Volunteer', 'Donor', 'Beneficiary', 'Advocate', 'Supporter']
+        Profile.objects.bulk_create([
+            Profile(username=f'{role.lower()}{i}', email=f'{role.lower()}{i}@example.com', role=role, password='!')
+            for role in roles for i in range(12)
+        ])
+        people = {role: list(Profile.objects.filter(role=role)) for role in roles}
+        cls.users = {role: people[role][0] for role in roles}
+        today = timezone.localdate()
+
+        for i in range(12):
+            EducationRequest.objects.create(
+                beneficiary=people['Beneficiary'][i], full_name=f'Student {i}', education_level='School',
+                reason='Fees', status=['Pending', 'Forwarded', 'Approved'][i % 3],
+                volunteer=people['Volunteer'][i], forwarded_to=people['Donor'][i] if i % 3 else None,
+            )
+            hospital = Hospital.objects.create(name=f'Hospital {i}', email=f'hospital{i}@example.com')
+            MedicalCampRequest.objects.create(
+                volunteer=people['Volunteer'][i], hospital=hospital, contact_person='Nurse', phone='999',
+                location='Hall', date=today, description='Checkup',
+            )
+            LegalAwarenessCamp.objects.create(
+                title=f'Legal camp {i}', description='Rights', location='Hall', proposed_date=today,
+                requested_by=people['Volunteer'][i], assigned_advocate=people['Advocate'][i],
+                status=['Pending', 'Approved'][i % 2],
+            )
+            LegalArticle.objects.create(title=f'Article {i}', content='Law', author=people['Advocate'][i])
+            LegalQuestion.objects.create(asked_by=people['Beneficiary'][i], question=f'Question {i}')
+            WomenSupportCampaign.objects.create(
+                title=f'Campaign {i}', description='Awareness', location='Hall', volunteer=people['Volunteer'][i],
+                supporter=people['Supporter'][i], status=['Pending', 'Approved', 'Scheduled'][i % 3],
+                scheduled_date=today + timedelta(days=i),
+            )
+            WomenSupportArticle.objects.create(title=f'Article {i}', content='Support', author=people['Supporter'][i])
+            WomenSupportQuestion.objects.create(asked_by=people['Beneficiary'][i], question=f'Question {i}')
+
+        cls.education = EducationRequest.objects.filter(volunteer=cls.users['Volunteer']).first()
+        cls.medical = MedicalCampRequest.objects.filter(volunteer=cls.users['Volunteer']).first()
+        cls.legal = LegalAwarenessCamp.objects.filter(assigned_advocate=cls.users['Advocate']).first()
+        cls.legal_article = LegalArticle.objects.filter(author=cls.users['Advocate']).first()
+        cls.legal_question = LegalQuestion.objects.first()
+        cls.campaign = WomenSupportCampaign.objects.filter(volunteer=cls.users['Volunteer']).first()
+        cls.article = WomenSupportArticle.objects.filter(author=cls.users['Supporter']).first()
+        cls.question = WomenSupportQuestion.objects.first()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_every_named_route_has_a_budget(self):
+        missing = [name for name in named_routes() if budget_for(name) is None]
+        self.assertEqual(missing, [])
+
+    def test_every_route_stays_within_budget(self):
+        local = [name for name in dict.fromkeys(named_routes()) if ':' not in name]
+        self.assertEqual(sorted(set(local) - set(ROUTE_VISITS)), [], "add the new route to ROUTE_VISITS")
+
+        for name, (role, kwargs) in ROUTE_VISITS.items():
+            with self.subTest(route=name):
+                self.client.logout()
+                if role:
+                    self.client.force_login(self.users[role])
+                url = reverse(name, kwargs=kwargs(self) if kwargs else None)
+                response = self.client.get(url)
+                self.assertLess(response.status_code, 500, url)
+
+    def test_dashboard_stays_within_budget_for_every_role(self):
+        for role, user in self.users.items():
+            with self.subTest(role=role):
+                self.client.force_login(user)
+                self.client.get(reverse('dashboard'))
+
+    def test_admin_changelists_stay_within_budget(self):
+        self.client.force_login(Profile.objects.create_superuser('root', 'root@example.com', 'x'))
+        for name in named_routes():
+            if name.startswith('admin:') and name.endswith('_changelist'):
+                with self.subTest(route=name):
+                    self.client.get(reverse(name))
+
+    def test_query_budget_helper(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            with query_budget(2):
+                for campaign in WomenSupportCampaign.objects.all()[:5]:
+                    str(campaign.volunteer)
+        with query_budget(1):
+            list(WomenSupportCampaign.objects.select_related('volunteer')[:5])
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], SEARCH_BACKEND='python')
+class SearchTests(SharedReplicaTestCase):
+    """Runs against the Python inverted index; Fts5SearchTests repeats it on SQLite FTS5."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.advocate = Profile.objects.create(username='advocate', role='Advocate', password='!')
+        cls.supporter = Profile.objects.create(username='supporter', role='Supporter', password='!')
+        cls.beneficiary = Profile.objects.create(username='beneficiary', role='Beneficiary', password='!')
+
+    def setUp(self):
+        cache.clear()
+        self.helpline = LegalArticle.objects.create(
+            title='Domestic violence helpline', content='Call 181 any time of day.', author=self.advocate)
+        self.tenancy = LegalArticle.objects.create(
+            title='Tenancy rights', content='<script>alert(1)</script> Your landlord must give notice; '
+                                            'a helpline can explain the steps.', author=self.advocate)
+        self.shelter = WomenSupportArticle.objects.create(
+            title='Finding a shelter', content='Shelters near you and the helpline numbers.', author=self.supporter)
+
+    def titles(self, query, kinds=LEGAL_KINDS + WOMEN_KINDS):
+        return [hit.document.title for hit in search(query, kinds)]
+
+    def test_title_matches_rank_first_and_are_highlighted(self):
+        self.assertEqual(self.titles('helpline')[0], 'Domestic violence helpline')
+        self.assertEqual(search('Helpline', LEGAL_KINDS)[0].title, 'Domestic violence <mark>helpline</mark>')
+        self.assertEqual(self.titles('helpline landlord'), ['Tenancy rights'])
+        self.assertEqual(self.titles('what does the landlord do'), ['Tenancy rights'])
+        self.assertEqual(self.titles('nowhere'), [])
+
+    def test_snippets_escape_the_source_text(self):
+        snippet = search('landlord', LEGAL_KINDS)[0].snippet
+        self.assertIn('&lt;script&gt;', snippet)
+        self.assertIn('<mark>landlord</mark>', snippet)
+
+    def test_index_follows_edits_and_deletes(self):
+        self.tenancy.title = 'Eviction notice'
+        self.tenancy.save()
+        self.assertEqual(self.titles('eviction'), ['Eviction notice'])
+        self.assertEqual(self.titles('tenancy'), [])
+        self.tenancy.delete()
+        self.assertEqual(self.titles('eviction'), [])
+
+    def test_questions_become_searchable_once_answered(self):
+        question = LegalQuestion.objects.create(asked_by=self.beneficiary, question='Can my employer withhold wages?')
+        self.assertEqual(self.titles('wages'), [])
+        question.answer = 'No, wages must be paid within seven days.'
+        question.save()
+        self.assertEqual(self.titles('withhold'), ['Can my employer withhold wages?'])
+        self.assertEqual(search('seven', [SearchKind.LEGAL_QUESTION])[0].url, reverse('legal_questions'))
+
+    def test_rebuild_gives_the_same_results(self):
+        before = self.titles('helpline')
+        self.assertEqual(rebuild_search_index(), 3)
+        self.assertEqual(self.titles('helpline'), before)
+
+    def test_page_shows_women_support_content_to_its_readers_only(self):
+        self.client.force_login(self.advocate)
+        with query_budget(budget_for('search'), 'search'):
+            response = self.client.get(reverse('search'), {'q': 'helpline'})
+        self.assertContains(response, 'Domestic violence <mark>helpline</mark>')
+        self.assertNotContains(response, 'Finding a shelter')
+
+        self.client.force_login(self.beneficiary)
+        response = self.client.get(reverse('search'), {'q': 'helpline', 'kind': SearchKind.WOMEN_ARTICLE})
+        self.assertContains(response, 'Finding a shelter')
+        self.assertNotContains(response, 'Tenancy rights')
+
+
+@skipUnless(connection.vendor == 'sqlite', "FTS5 is SQLite's full-text index")
+@override_settings(SEARCH_BACKEND='fts5')
+class Fts5SearchTests(SearchTests):
+    pass
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], SIMILAR_QUESTIONS_MIN_SCORE=0.3)
+class SimilarQuestionTests(SharedReplicaTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.advocate = Profile.objects.create(username='advocate', role='Advocate', password='!')
+        cls.beneficiary = Profile.objects.create(username='beneficiary', role='Beneficiary', password='!')
+
+    def setUp(self):
+        self.wages = self.answer(LegalQuestion, 'My employer has not paid my wages for two months', 'File a claim.')
+        self.answer(LegalQuestion, 'How do I register a rental agreement?', 'At the sub-registrar office.')
+        LegalQuestion.objects.create(asked_by=self.beneficiary, question='Employer has not paid wages, still waiting')
+        self.shelter = self.answer(WomenSupportQuestion, 'Where can I find an emergency shelter tonight?', 'Call 181.')
+        build_index()  # what warm_up() does on a background thread at server start
+
+    def answer(self, model, question, answer):
+        return model.objects.create(asked_by=self.beneficiary, question=question, answer=answer,
+                                    answered_at=timezone.now())
+
+    def questions(self, text, kinds=(SearchKind.LEGAL_QUESTION, SearchKind.WOMEN_QUESTION)):
+        return [match['question'] for match in suggest([text], kinds)[0]]
+
+    def test_suggests_answered_near_duplicates_only(self):
+        self.assertEqual(self.questions('employer not paid wages'),
+                         ['My employer has not paid my wages for two months'])
+        self.assertEqual(self.questions('best mango recipes'), [])
+        self.assertEqual(self.questions('emergency shelter', [SearchKind.LEGAL_QUESTION]), [])
+
+    def test_new_answers_and_deletions_show_up_without_a_rebuild(self):
+        self.assertEqual(self.questions('unpaid overtime'), [])
+        overtime = self.answer(LegalQuestion, 'Is unpaid overtime legal?', 'No.')
+        self.assertEqual(self.questions('unpaid overtime'), ['Is unpaid overtime legal?'])
+        overtime.delete()
+        self.wages.answer = ''
+        self.wages.save()
+        self.assertEqual(self.questions('unpaid overtime'), [])
+        self.assertEqual(self.questions('employer not paid wages'), [])
+
+    def test_another_process_picks_up_new_answers_from_the_database(self):
+        elsewhere = QuestionIndex()  # e.g. another worker's copy, which no signal reaches
+        elsewhere.refresh()
+        overtime = self.answer(LegalQuestion, 'Is unpaid overtime legal?', 'No.')
+        elsewhere.refresh()
+        self.assertIn(overtime.pk, elsewhere.ids)
+        with self.assertNumQueries(len(QUESTION_SOURCES)):  # nothing new: one MAX() per source
+            elsewhere.refresh()
+
+    def test_delta_segment_scores_like_the_merged_matrix(self):
+        index = QuestionIndex()
+        index.add([(0, 1, 'tenant deposit not returned'), (0, 2, 'landlord kept my deposit')])
+        index.add([(0, 3, 'deposit returned late by landlord'), (0, 2, 'landlord kept the security deposit')])
+        before = index.query(['landlord deposit', 'tenant'], [SearchKind.LEGAL_QUESTION], 5)
+        index._merge()
+        after = index.query(['landlord deposit', 'tenant'], [SearchKind.LEGAL_QUESTION], 5)
+        self.assertEqual([[(pk, round(s, 5)) for _, pk, s in found] for found in before],
+                         [[(pk, round(s, 5)) for _, pk, s in found] for found in after])
+        self.assertEqual(sorted(pk for _, pk, _ in before[0]), [1, 2, 3])
+
+    def test_endpoint_answers_a_batch_per_role(self):
+        self.client.force_login(self.advocate)
+        url = reverse('similar_questions')
+        with query_budget(budget_for('similar_questions'), 'similar_questions'):
+            results = self.client.get(url, {'q': ['wages not paid', 'emergency shelter']}).json()['results']
+        self.assertEqual([[m['id'] for m in found] for found in results], [[self.wages.pk], []])
+
+        self.client.force_login(self.beneficiary)
+        results = self.client.get(url, {'q': 'emergency shelter', 'kind': SearchKind.WOMEN_QUESTION}).json()['results']
+        self.assertEqual([m['answer'] for m in results[0]], ['Call 181.'])
+
+
+class UnreadCounterTests(TestCase):
+    """Profile.unread_notifications must always equal the unread rows, so the clamp at 0 never has to act."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.profiles = [Profile.objects.create(username=f'volunteer{i}', role='Volunteer', password='!') for i in range(3)]
+
+    def assertCounterMatches(self, *expected):
+        counters = list(Profile.objects.filter(id__in=[p.id for p in self.profiles]).order_by('id')
+                        .values_list('unread_notifications', flat=True))
+        actual = [Notification.objects.filter(recipient=p, is_read=False).count() for p in self.profiles]
+        self.assertEqual(counters, actual)
+        self.assertEqual(counters, list(expected))
+        self.assertEqual(sum(counters), Notification.objects.filter(is_read=False).count())
+
+    def test_counter_follows_bulk_notify_and_mark_read(self):
+        first, second, third = self.profiles
+        notify_users([p.id for p in self.profiles], 'Camp tomorrow', batch_size=2)
+        notify_users([first.id, second.id, first.id], 'Bring water')
+        Notification.objects.create(recipient=first, message='Report filed')
+        self.assertCounterMatches(3, 2, 1)
+
+        subset = list(first.notifications.order_by('id').values_list('id', flat=True)[:2])
+        others = list(third.notifications.values_list('id', flat=True))
+        self.assertEqual(mark_notifications_read(first, subset + others), 2)
+        self.assertCounterMatches(1, 2, 1)
+        self.assertEqual(mark_notifications_read(first, subset), 0)
+        self.assertCounterMatches(1, 2, 1)
+
+        self.assertEqual(mark_notifications_read(second), 2)
+        self.assertEqual(mark_notifications_read(second), 0)
+        self.assertCounterMatches(1, 0, 1)
+
+        first.notifications.filter(is_read=False).get().delete()
+        second.notifications.first().delete()
+        self.assertCounterMatches(0, 0, 1)
+
+
+class NotificationStreamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.volunteer = Profile.objects.create(username='volunteer', role='Volunteer', password='!')
+
+    def setUp(self):
+        self.client.force_login(self.volunteer)
+
+    def test_stream_is_off_by_default_and_pages_poll(self):
+        self.assertEqual(self.client.get(reverse('notification_stream')).status_code, 204)
+        page = self.client.get(reverse('notification_inbox')).content.decode()
+        self.assertNotIn('EventSource(', page)
+        self.assertIn(reverse('notification_feed') + '?unread=1', page)
+
+    @override_settings(NOTIFICATION_STREAM_ENABLED=True)
+    def test_stream_is_never_served_through_wsgi(self):
+        self.assertEqual(self.client.get(reverse('notification_stream')).status_code, 204)
+        self.assertIn('EventSource(', self.client.get(reverse('notification_inbox')).content.decode())
+
+
+class FlakyTransport:
+    """Fails the first `failures` sends of each test, then records like InMemoryTransport."""
+    name = 'flaky'
+    failures = 0
+    sent = []
+
+    def send(self, to, body):
+        if FlakyTransport.failures:
+            FlakyTransport.failures -= 1
+            raise ConnectionError('gateway timeout')
+        FlakyTransport.sent.append(to)
+        return f'sid-{len(FlakyTransport.sent)}'
+
+
+@override_settings(SMS_TRANSPORT='accounts.tests.FlakyTransport', SMS_RATE_LIMIT=0, SMS_RETRY_BACKOFF=0,
+                   SMS_MAX_ATTEMPTS=3)
+class SMSDispatcherTests(TestCase):
+    def setUp(self):
+        FlakyTransport.failures, FlakyTransport.sent = 0, []
+        self.dispatcher = SMSDispatcher()  # no sender thread: deliver()/drain() run here
+
+    def queued(self, to='+911'):
+        return SMSMessage.objects.create(to=to, body='Camp tomorrow')
+
+    def test_in_memory_and_file_transports(self):
+        InMemoryTransport.outbox.clear()
+        self.assertTrue(InMemoryTransport().send('+911', 'hi'))
+        self.assertEqual(InMemoryTransport.outbox, [{'to': '+911', 'body': 'hi'}])
+        with tempfile.TemporaryDirectory() as tmp, override_settings(SMS_FILE_PATH=str(Path(tmp) / 'sms.jsonl')):
+            transport = FileTransport()
+            first, second = transport.send('+911', 'one'), transport.send('+922', 'two')
+            lines = [json.loads(line) for line in Path(tmp, 'sms.jsonl').read_text().splitlines()]
+        self.assertEqual([(line['id'], line['to'], line['body']) for line in lines],
+                         [(first, '+911', 'one'), (second, '+922', 'two')])
+
+    def test_submit_records_the_message_and_queues_it_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            sms = self.dispatcher.submit('+911', 'hello')
+        self.assertEqual((sms.status, len(callbacks)), (SMSStatus.QUEUED, 1))
+
+    def test_retries_transient_failures(self):
+        sms = self.queued()
+        FlakyTransport.failures = 2
+        with self.assertLogs('accounts.sms', 'WARNING'):
+            self.assertIs(self.dispatcher.deliver(sms.id), True)
+        sms.refresh_from_db()
+        self.assertEqual((sms.status, sms.attempts, sms.provider_id, sms.transport), (SMSStatus.SENT, 3, 'sid-1', 'flaky'))
+
+    def test_gives_up_after_max_attempts(self):
+        sms = self.queued()
+        FlakyTransport.failures = 5
+        with self.assertLogs('accounts.sms', 'ERROR'):
+            self.assertIs(self.dispatcher.deliver(sms.id), False)
+        sms.refresh_from_db()
+        self.assertEqual((sms.status, sms.attempts, sms.last_error), (SMSStatus.FAILED, 3, 'gateway timeout'))
+
+    @override_settings(SMS_RATE_LIMIT=20)
+    def test_rate_limit_spaces_sends(self):
+        for _ in range(3):
+            self.queued()
+        started = time.monotonic()
+        self.assertEqual(self.dispatcher.drain(), (3, 0))
+        self.assertGreaterEqual(time.monotonic() - started, 2 / 20)
+
+    def test_drain_sends_leftovers_once_and_retakes_stuck_claims(self):
+        leftover, done = self.queued('+911'), self.queued('+922')
+        stuck = SMSMessage.objects.create(to='+933', body='x', status=SMSStatus.SENDING,
+                                          claimed_at=timezone.now() - timedelta(hours=1))
+        SMSMessage.objects.create(to='+944', body='x', status=SMSStatus.SENDING, claimed_at=timezone.now())
+        self.dispatcher.deliver(done.id)
+        self.assertIsNone(self.dispatcher.deliver(done.id))  # already sent: not ours any more
+        self.assertEqual(self.dispatcher.drain(), (2, 0))
+        self.assertEqual(sorted(FlakyTransport.sent), ['+911', '+922', '+933'])
+        self.assertEqual(SMSMessage.objects.get(id=leftover.id).status, SMSStatus.SENT)
+        self.assertEqual(SMSMessage.objects.get(id=stuck.id).status, SMSStatus.SENT)
+        self.assertEqual(self.dispatcher.drain(), (0, 0))
+
+
+class ComposeTests(SimpleTestCase):
+    def test_one_render_is_personalised_and_escaped_per_recipient(self):
+        template = get_email_template('legal/legal_camp_request_email.html')
+        advocates = [Profile(username='<b>Asha</b> & co', email='asha@example.com'),
+                     Profile(username='Ravi', email='ravi@example.com')]
+        camp = LegalAwarenessCamp(title='Tenant <rights>', location='Hall B', proposed_date=timezone.localdate())
+        with mock.patch.object(template, 'render', wraps=template.render) as render, \
+                mock.patch('accounts.compose.get_email_template', return_value=template):
+            rendered = render_for_recipients('legal/legal_camp_request_email.html',
+                                             {'camp': camp, 'approval_link': 'https://sankalp.example/a/1/'},
+                                             advocates, as_name='advocate')
+        render.assert_called_once()
+
+        (_, asha), (_, ravi) = rendered
+        self.assertNotEqual(asha.html, ravi.html)
+        self.assertIn('Dear <strong>&lt;b&gt;Asha&lt;/b&gt; &amp; co</strong>', asha.html)
+        self.assertNotIn('<b>Asha</b>', asha.html)
+        self.assertIn('Dear <strong>Ravi</strong>', ravi.html)
+        self.assertIn('Dear <b>Asha</b> & co,', asha.text)
+        self.assertIn('Tenant &lt;rights&gt;', ravi.html)
+        self.assertNotIn('\x1f', asha.html + asha.text + ravi.html + ravi.text)
+
+
+class RefusingBackend(locmem.EmailBackend):
+    """locmem backend that records each connection it opens and refuses mail for the addresses in `refused`."""
+    refused = set()
+    opened = []
+
+    def open(self):
+        RefusingBackend.opened.append(self)
+        return True
+
+    def send_messages(self, messages):
+        for message in messages:
+            refused = RefusingBackend.refused.intersection(message.to)
+            if refused:
+                raise SMTPRecipientsRefused({to: (550, b'mailbox unavailable') for to in refused})
+        return super().send_messages(messages)
+
+
+@override_settings(OUTBOX_LOCK_TIMEOUT=600, OUTBOX_BACKOFF_SECONDS=60, OUTBOX_MAX_BACKOFF=3600)
+class OutboxTests(TestCase):
+    def setUp(self):
+        RefusingBackend.refused, RefusingBackend.opened = set(), []
+
+    def queued(self, to, **fields):
+        return OutgoingEmail.objects.create(subject='Camp tomorrow', body='Hall B, 10am', from_email='noreply@example.com',
+                                            to=to, backend='accounts.tests.RefusingBackend', **fields)
+
+    def test_stale_claims_are_retaken_only_after_the_lock_timeout(self):
+        now = timezone.now()
+        held = self.queued('held@example.com', status=OutboxStatus.SENDING, lock_id='a' * 32,
+                           locked_at=now - timedelta(seconds=590))
+        stale = self.queued('stale@example.com', status=OutboxStatus.SENDING, lock_id='b' * 32,
+                            locked_at=now - timedelta(seconds=610))
+        self.assertEqual([email.id for email in claim_batch(10)], [stale.id])
+        self.assertEqual(OutgoingEmail.objects.get(id=held.id).lock_id, 'a' * 32)
+
+    def test_claims_never_share_a_row(self):
+        emails = [self.queued(f'v{i}@example.com') for i in range(5)]
+        first, second = claim_batch(3), claim_batch(10)
+        self.assertEqual((len(first), len(second)), (3, 2))
+        self.assertEqual(sorted(email.id for email in first + second), [email.id for email in emails])
+        self.assertEqual(claim_batch(10), [])
+
+    def test_worker_that_loses_the_race_claims_nothing(self):
+        """Another worker takes the rows between this one's SELECT and its UPDATE."""
+        emails = [self.queued('a@example.com'), self.queued('b@example.com')]
+        real_uuid4, rival = uuid.uuid4, []
+
+        def rival_claims_first():
+            if not rival:
+                rival.append(None)
+                rival[:] = claim_batch(10)
+            return real_uuid4()
+
+        with mock.patch('accounts.mailer.uuid.uuid4', side_effect=rival_claims_first):
+            mine = claim_batch(10)
+        self.assertEqual(mine, [])
+        self.assertEqual(sorted(email.id for email in rival), [email.id for email in emails])
+
+    def test_failed_sends_back_off_then_go_dead(self):
+        self.assertEqual([backoff_delay(n).total_seconds() for n in (1, 2, 3, 10)], [60, 120, 240, 3600])
+        RefusingBackend.refused = {'gone@example.com'}
+        gone = self.queued('gone@example.com', max_attempts=2)
+        self.queued('ok@example.com')
+
+        report = process_outbox(workers=1)
+        self.assertEqual((report.sent, report.failed, report.dead), (1, 1, 0))
+        gone.refresh_from_db()
+        self.assertEqual((gone.status, gone.attempts), (OutboxStatus.PENDING, 1))
+        self.assertIn('gone@example.com', gone.last_error)
+        self.assertGreater(gone.next_attempt_at, timezone.now() + timedelta(seconds=50))
+        self.assertEqual(claim_batch(10), [])  # not due until the backoff runs out
+
+        OutgoingEmail.objects.filter(id=gone.id).update(next_attempt_at=timezone.now())
+        report = process_outbox(workers=1)
+        self.assertEqual((report.sent, report.failed, report.dead), (0, 1, 1))
+        gone.refresh_from_db()
+        self.assertEqual((gone.status, gone.attempts), (OutboxStatus.DEAD, 2))
+        OutgoingEmail.objects.filter(id=gone.id).update(next_attempt_at=timezone.now())
+        self.assertEqual(claim_batch(10), [])
+        self.assertEqual([message.to for message in mail.outbox], [['ok@example.com']])
+
+    @override_settings(OUTBOX_MESSAGES_PER_CONNECTION=10)
+    def test_batch_goes_out_over_a_bounded_number_of_connections(self):
+        for i in range(25):
+            self.queued(f'v{i}@example.com')
+        report = process_outbox(workers=4)
+        self.assertEqual((report.sent, report.connections, len(RefusingBackend.opened)), (25, 3, 3))
+        self.assertEqual(len(mail.outbox), 25)
+
+        for i in range(25):
+            self.queued(f'w{i}@example.com')
+        RefusingBackend.opened = []
+        self.assertEqual(process_outbox(workers=1).connections, 1)
+        self.assertEqual(len(RefusingBackend.opened), 1)
+
+    def test_one_refused_recipient_does_not_fail_the_rest(self):
+        RefusingBackend.refused = {'gone@example.com'}
+        emails = [self.queued(to) for to in ('a@example.com', 'gone@example.com', 'b@example.com', 'c@example.com')]
+        report = process_outbox(workers=1)
+        self.assertEqual((report.sent, report.failed, report.connections), (3, 1, 1))
+        self.assertEqual(len(RefusingBackend.opened), 2)  # the session is reopened after the refusal
+        self.assertEqual(
+            [OutgoingEmail.objects.get(id=email.id).status for email in emails],
+            [OutboxStatus.SENT, OutboxStatus.PENDING, OutboxStatus.SENT, OutboxStatus.SENT],
+        )
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['a@example.com', 'b@example.com', 'c@example.com'])
+
+    def test_queue_email_writes_nothing_if_the_transaction_rolls_back(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            queue_email('Camp tomorrow', '<p>Hall B</p>', ['a@example.com', 'b@example.com'])
+            self.assertEqual(OutgoingEmail.objects.count(), 2)
+            raise RuntimeError('view failed after queueing')
+        self.assertFalse(OutgoingEmail.objects.exists())
+
+
+class DigestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.volunteer = Profile.objects.create(username='volunteer', email='v@example.com', role='Volunteer',
+                                               password='!', delivery_mode=DeliveryMode.DAILY)
+        cls.advocate = Profile.objects.create(username='advocate', email='a@example.com', role='Advocate',
+                                              password='!', delivery_mode=DeliveryMode.DAILY)
+
+    def test_approval_requests_skip_the_digest(self):
+        self.client.force_login(self.volunteer)
+        self.client.post(reverse('request_legal_camp'), {
+            'title': 'Tenant rights', 'description': 'Rent law', 'category': 'LawLink',
+            'location': 'Hall', 'proposed_date': timezone.localdate().isoformat(), 'contact_number': '999',
+        })
+        email = OutgoingEmail.objects.get(to='a@example.com')
+        self.assertEqual(email.status, OutboxStatus.PENDING)
+        self.assertIn(reverse('approve_legal_camp', args=[LegalAwarenessCamp.objects.get().pk]), email.html_body)
+
+    def test_digest_keeps_the_text_and_links_of_held_mail(self):
+        queue_email('Camp rescheduled', '<p>Details at <a href="https://sankalp.example/c/7/">https://sankalp.example/c/7/</a></p>',
+                    ['v@example.com'], digestible=True)
+        self.assertEqual(send_digests(DeliveryMode.DAILY), 1)
+        digest = OutgoingEmail.objects.get(status=OutboxStatus.PENDING, to='v@example.com')
+        self.assertIn('Camp rescheduled', digest.html_body)
+        self.assertIn('href="https://sankalp.example/c/7/"', digest.html_body)
+
+
+class SupporterReminderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.volunteer = Profile.objects.create(username='volunteer', role='Volunteer', password='!')
+        cls.supporter = Profile.objects.create(username='supporter', email='s@example.com', role='Supporter',
+                                               password='!')
+        cls.campaign = WomenSupportCampaign.objects.create(
+            title='Self defence', description='Workshop', location='Hall', volunteer=cls.volunteer,
+            supporter=cls.supporter, status='Scheduled', proposed_date=timezone.localdate(),
+            scheduled_date=timezone.localdate() + timedelta(days=1),
+        )
+
+    def test_reminder_is_a_post_sent_once_per_campaign_date(self):
+        self.client.force_login(self.volunteer)
+        url = reverse('send_supporter_reminder', args=[self.campaign.pk])
+        self.assertEqual(self.client.get(url).status_code, 405)
+        self.client.post(url)
+        self.client.post(url)
+        self.assertEqual(OutgoingEmail.objects.filter(to='s@example.com').count(), 1)
+        # the nudge does not count as the daily reminder
+        self.assertEqual(send_campaign_reminders(hours=48), 1)
+        self.assertEqual(ReminderLog.objects.filter(object_id=self.campaign.pk).count(), 2)
+
+    def test_reminder_needs_the_csrf_token(self):
+        client = self.client_class(enforce_csrf_checks=True)
+        client.force_login(self.volunteer)
+        self.assertEqual(client.post(reverse('send_supporter_reminder', args=[self.campaign.pk])).status_code, 403)
+
+
+class CacheInvalidationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_stats_and_fragments_are_dropped_only_once_the_write_commits(self):
+        stats = get_admin_stats()
+        version = fragments.versions(['women_support'])
+        with self.captureOnCommitCallbacks(execute=True):
+            volunteer = Profile.objects.create(username='volunteer', role='Volunteer', password='!')
+            WomenSupportCampaign.objects.create(title='Walk', description='x', location='Hall', volunteer=volunteer,
+                                                proposed_date=timezone.localdate())
+            # still inside the transaction: readers keep seeing the committed state
+            self.assertEqual(get_admin_stats(), stats)
+            self.assertEqual(fragments.versions(['women_support']), version)
+        self.assertEqual(get_admin_stats()['total_volunteers'], stats['total_volunteers'] + 1)
+        self.assertNotEqual(fragments.versions(['women_support']), version)
+
+
+class UpgradeBackfillTests(TestCase):
+    """migrate fills the derived tables that an upgraded database starts without."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.volunteer = Profile.objects.create(username='volunteer', role='Volunteer', password='!')
+        for status in ['Pending', 'Pending', 'Scheduled']:
+            WomenSupportCampaign.objects.create(title='Walk', description='x', location='Hall', status=status,
+                                                volunteer=cls.volunteer, proposed_date=timezone.localdate())
+
+    def test_counters(self):
+        DashboardCounter.objects.all().delete()
+        backfill_counters(verbosity=0)
+        self.assertEqual(counts('women_support'), {'Pending': 2, 'Scheduled': 1})
+        self.assertEqual(counts('women_support', owner=self.volunteer), {'Pending': 2, 'Scheduled': 1})
+
+        DashboardCounter.objects.filter(owner_id=0).update(count=7)
+        backfill_counters(verbosity=0)  # only ever fills an empty table
+        self.assertEqual(counts('women_support'), {'Pending': 7, 'Scheduled': 7})
+
+    def test_campaign_index(self):
+        CampaignIndex.objects.all().delete()
+        backfill_campaign_index(verbosity=0)
+        self.assertEqual(sorted(CampaignIndex.objects.values_list('status', flat=True)),
+                         ['Pending', 'Pending', 'Scheduled'])
+
+    @override_settings(SEARCH_BACKEND='python')
+    def test_search_index(self):
+        LegalQuestion.objects.create(asked_by=self.volunteer, question='Can my landlord keep the deposit?',
+                                     answer='Only for damage.')
+        SearchDocument.objects.all().delete()
+        backfill_search_index(verbosity=0)
+        self.assertEqual([hit.document.title for hit in search('landlord deposit', LEGAL_KINDS)],
+                         ['Can my landlord keep the deposit?'])
+
+
+class SharedDashboardFragmentTests(SharedReplicaTestCase):
+    """/dashboard/ and the apps' own dashboard pages share fragment cache keys, so they must render alike."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.advocate = Profile.objects.create(username='advocate', role='Advocate', password='!')
+        cls.supporter = Profile.objects.create(username='supporter', role='Supporter', password='!')
+        volunteer = Profile.objects.create(username='volunteer', role='Volunteer', password='!')
+        LegalAwarenessCamp.objects.create(title='Tenant camp', description='Rent law', location='Hall',
+                                          proposed_date=timezone.localdate(), requested_by=volunteer)
+        LegalQuestion.objects.create(asked_by=volunteer, question='Is verbal notice enough?', answer='No.',
+                                     answered_at=timezone.now())
+        WomenSupportQuestion.objects.create(asked_by=volunteer, question='Where is the nearest shelter?')
+
+    def test_both_routes_show_the_same_fragments_in_either_order(self):
+        pages = [
+            (self.advocate, 'advocate_dashboard', ['Tenant camp', 'Is verbal notice enough?']),
+            (self.supporter, 'supporter_dashboard', ['Where is the nearest shelter?']),
+        ]
+        for user, page, expected in pages:
+            self.client.force_login(user)
+            for first, second in ((page, 'dashboard'), ('dashboard', page)):
+                with self.subTest(user=user.username, first=first):
+                    cache.clear()
+                    for name in (first, second):
+                        content = self.client.get(reverse(name)).content.decode()
+                        for text in expected:
+                            self.assertIn(text, content, name)
+
+
+class CacheCheckTests(SimpleTestCase):
+    def test_warns_about_per_process_fragment_versions_outside_debug(self):
+        locmem = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        redis = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://cache:6379'}}
+        with override_settings(CACHES=locmem, DEBUG=False):
+            self.assertEqual([m.id for m in report_cache_settings(None)], ['accounts.W003'])
+        with override_settings(CACHES=locmem, DEBUG=True):
+            self.assertEqual(report_cache_settings(None), [])
+        with override_settings(CACHES=redis, DEBUG=False):
+            self.assertEqual(report_cache_settings(None), [])
+
+
+class CampCalendarTests(SharedReplicaTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.volunteer = Profile.objects.create(username='volunteer', role='Volunteer', password='!')
+        cls.beneficiary = Profile.objects.create(username='beneficiary', role='Beneficiary', password='!')
+        supporter = Profile.objects.create(username='supporter', role='Supporter', password='!')
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        LegalAwarenessCamp.objects.create(title='Tenant camp', description='Rent law', location='Town hall',
+                                          proposed_date=tomorrow, scheduled_date=tomorrow, status='Scheduled',
+                                          requested_by=cls.volunteer)
+        WomenSupportCampaign.objects.create(title='Safe walk', description='x', location='Shelter road',
+                                            proposed_date=tomorrow, scheduled_date=tomorrow, status='Scheduled',
+                                            volunteer=cls.volunteer, supporter=supporter)
+
+    def setUp(self):
+        cache.clear()
+
+    def ics(self, user, **headers):
+        return self.client.get(reverse('upcoming_camps_ics', args=[calendar_token(user)]), **headers)
+
+    def test_feed_needs_the_users_token(self):
+        token = calendar_token(self.beneficiary)
+        self.assertEqual(self.client.get(reverse('upcoming_camps_ics', args=[token[:-1] + 'x'])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('upcoming_camps_ics', args=['nobody'])).status_code, 404)
+        self.assertEqual(self.ics(self.beneficiary).status_code, 200)
+
+        self.beneficiary.set_password('new secret')
+        self.beneficiary.save()
+        self.assertEqual(self.client.get(reverse('upcoming_camps_ics', args=[token])).status_code, 404)
+
+    def test_women_support_campaigns_only_for_roles_that_see_them(self):
+        beneficiary_feed = self.ics(self.beneficiary).content.decode()
+        self.assertIn('SUMMARY:Safe walk', beneficiary_feed)
+        volunteer_feed = self.ics(self.volunteer).content.decode()
+        self.assertIn('SUMMARY:Tenant camp', volunteer_feed)
+        self.assertNotIn('Safe walk', volunteer_feed)
+        self.assertNotIn('supporter', volunteer_feed)
+
+    def test_etag_is_per_user(self):
+        first = self.ics(self.beneficiary)
+        self.assertEqual(self.ics(self.beneficiary, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+        self.assertEqual(self.ics(self.volunteer, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
+        self.assertEqual(first['Cache-Control'], 'private, max-age=300')
+
+
+@override_settings(DB_WRITE_RETRIES=3, DB_WRITE_RETRY_BACKOFF=0)
+class RetryOnLockTests(TransactionTestCase):
+    """TransactionTestCase, so the wrapped call runs outside any atomic block like a real request's write."""
+
+    def flaky(self, failures, error='database is locked'):
+        calls = []
+
+        @retry_on_lock
+        def write():
+            calls.append(connection.in_atomic_block)
+            if len(calls) <= failures:
+                raise OperationalError(error)
+            return 'written'
+
+        return write, calls
+
+    def test_retries_a_lock_error(self):
+        write, calls = self.flaky(failures=2)
+        self.assertEqual(write(), 'written')
+        self.assertEqual(len(calls), 3)
+
+    def test_gives_up_after_db_write_retries(self):
+        write, calls = self.flaky(failures=10)
+        with self.assertRaisesMessage(OperationalError, 'database is locked'):
+            write()
+        self.assertEqual(len(calls), 1 + 3)
+
+    def test_other_errors_are_not_retried(self):
+        write, calls = self.flaky(failures=1, error='no such table: accounts_profile')
+        with self.assertRaises(OperationalError):
+            write()
+        self.assertEqual(len(calls), 1)
+
+    def test_no_retry_inside_an_outer_atomic_block(self):
+        write, calls = self.flaky(failures=1)
+        with self.assertRaises(OperationalError), transaction.atomic():
+            write()
+        self.assertEqual(calls, [True])
+
+
+class PaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i, role in enumerate(['Donor', 'Admin', 'Volunteer', 'Donor', 'Admin', 'Volunteer', 'Donor']):
+            Profile.objects.create(username=f'user{i}', role=role, password='!')
+        cls.recipient = Profile.objects.get(username='user0')
+        same_instant = timezone.now()
+        Notification.objects.bulk_create([
+            Notification(recipient=cls.recipient, message=str(i), created_at=same_instant - timedelta(hours=i % 2))
+            for i in range(5)
+        ])
+
+    def walk(self, queryset, **options):
+        """Every row, following next_query from page to page."""
+        seen, query = [], ''
+        while True:
+            page = paginate(RequestFactory().get(f'/list/?{query}'), queryset, **options)
+            seen += list(page)
+            if not page.next_cursor:
+                return seen
+            query = page.next_query
+
+    def test_role_username_cursor_round_trip(self):
+        rows = self.walk(Profile.objects.all(), page_size=3, fields=('role', 'username'), descending=False)
+        self.assertEqual([(p.role, p.username) for p in rows],
+                         list(Profile.objects.order_by('role', 'username').values_list('role', 'username')))
+
+    def test_created_at_id_cursor_round_trip_through_ties(self):
+        rows = self.walk(Notification.objects.all(), page_size=2)
+        self.assertEqual([n.pk for n in rows],
+                         list(Notification.objects.order_by('-created_at', '-id').values_list('pk', flat=True)))
+        self.assertEqual(len(rows), 5)
+
+    def test_links_keep_filter_params(self):
+        request = RequestFactory().get('/list/', {'role': 'Donor', 'q': 'user'})
+        page = paginate(request, Profile.objects.filter(role='Donor'), page_size=2, fields=('role', 'username'),
+                        descending=False)
+        self.assertEqual(page.first_query, 'role=Donor&q=user')
+        self.assertIn('role=Donor&q=user&cursor=', page.next_query)
+        self.assertTrue(page.has_other_pages)
+
+        following = paginate(RequestFactory().get(f'/list/?{page.next_query}'), Profile.objects.filter(role='Donor'),
+                             page_size=2, fields=('role', 'username'), descending=False)
+        self.assertEqual(following.first_query, 'role=Donor&q=user')
+        self.assertEqual([p.username for p in following], ['user6'])
+
+    def test_malformed_cursor_falls_back_to_the_first_page(self):
+        first = [n.pk for n in paginate(RequestFactory().get('/list/'), Notification.objects.all(), page_size=2)]
+        for cursor in ['not-base64!', encode_cursor(['2024-01-01T00:00:00']), encode_cursor(['yesterday', 3]), '']:
+            with self.subTest(cursor=cursor):
+                page = paginate(RequestFactory().get('/list/', {'cursor': cursor}), Notification.objects.all(),
+                                page_size=2)
+                self.assertEqual([n.pk for n in page], first)
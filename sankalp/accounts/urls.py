@@ -17,6 +17,11 @@ urlpatterns = [
 
     # 🧭 Dashboards
     path('dashboard/', views.DashboardView.as_view(), name='dashboard'),
+    path('camps/upcoming/', views.UpcomingCampsView.as_view(), name='upcoming_camps'),
+    path('search/', views.SearchView.as_view(), name='search'),
+    path('questions/similar/', views.SimilarQuestionsView.as_view(), name='similar_questions'),
+    path('camps/upcoming/<str:token>.ics', views.UpcomingCampsCalendarView.as_view(), name='upcoming_camps_ics'),
+    path('dashboard/section/<slug:section>/', views.DashboardSectionView.as_view(), name='dashboard_section'),
     path('admin/dashboard/', views.DashboardView.as_view(), name='admin_dashboard'),
     path('volunteer/dashboard/', views.DashboardView.as_view(), name='volunteer_dashboard'),
     path('donor/dashboard/', views.DashboardView.as_view(), name='donor_dashboard'),
@@ -24,6 +29,14 @@ urlpatterns = [
     path('advocate/dashboard/', views.DashboardView.as_view(), name='advocate_dashboard'),
     path('supporter/dashboard/', views.DashboardView.as_view(), name='supporter_dashboard'),
 
+    # 🔔 Notifications
+    path('notifications/', views.NotificationInboxView.as_view(), name='notification_inbox'),
+    path('notifications/feed/', views.NotificationFeedView.as_view(), name='notification_feed'),
+    path('notifications/stream/', views.NotificationStreamView.as_view(), name='notification_stream'),
+    path('notifications/preferences/', views.NotificationPreferencesView.as_view(), name='notification_preferences'),
+    path('notifications/read/', views.MarkNotificationsReadView.as_view(), name='mark_notifications_read'),
+    path('notifications/read-all/', views.MarkNotificationsReadView.as_view(mark_all=True), name='mark_all_notifications_read'),
+
     # 👑 Admin - User Management
     path('manage/users/', views.AdminUserManagementView.as_view(), name='admin_user_management'),
     path('manage/users/edit/<int:pk>/', views.AdminUserEditView.as_view(), name='admin_user_edit'),
@@ -1,38 +1,34 @@
-from twilio.rest import Client
-from decouple import config
-from twilio.rest import Client
-from decouple import config
+import logging
+from datetime import timedelta
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives 
-from django.template.loader import render_to_string
+from django.db import connection, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from django.utils.html import strip_tags
 
 
 
 
 def send_phone_sms(phone_num, message):
     """
-    Sends an SMS using Twilio.
-    In demo mode, all messages go to a static number for safety.
+    Queue an SMS on the shared dispatcher (see accounts/sms.py) and return
+    its SMSMessage record. In demo mode (SMS_DEMO_NUMBER set), all messages
+    go to that static number for safety.
     """
     try:
-        account_sid = config('ACCOUNT_SID')
-        auth_token = config('AUTH_TOKEN')
-        from_num = config('FROM_NUM')
-
-        # ✅ Always use this static dummy number for testing
-        demo_num = '+919061525199'
-
-        client = Client(account_sid, auth_token)
-        client.messages.create(
-            from_=from_num,
-            body=message,
-            to=demo_num  # 👈 Replaced dynamic number with demo number
-        )
-        print(f"✅ SMS sent (Demo Mode) to {demo_num}")
-    except Exception as e:
-        print(f"❌ Failed to send SMS: {e}")
+        to = settings.SMS_DEMO_NUMBER or phone_num
+        return dispatcher.submit(to, message)
+    except Exception:
+        logger.exception("Failed to queue SMS to %s", phone_num)
+
+from accounts.models import Profile, Notification, OutgoingEmail, OutboxStatus, DeliveryMode  # add at top where other imports are
+from accounts.events import get_broker, notification_payload, publish_on_commit
+from accounts.sms import dispatcher
+from accounts.compose import RenderedEmail, compose
+from accounts.retry import retry_on_lock
 
-from accounts.models import Profile, Notification  # add at top where other imports are
+logger = logging.getLogger(__name__)
 
 def create_notification(profile_or_profile_id, message):
     """
@@ -42,26 +38,150 @@ def create_notification(profile_or_profile_id, message):
       create_notification(profile_id, "Please review")
     """
     try:
-        if isinstance(profile_or_profile_id, int):
-            profile = Profile.objects.get(id=profile_or_profile_id)
-        else:
-            profile = profile_or_profile_id
-        Notification.objects.create(recipient=profile, message=message)
-        # optionally return the created object if needed
-    except Exception as e:
-        # fail silently for now (log in console) so UI flow won't break
-        print(f"⚠️ create_notification failed: {e}")
+        profile_id = getattr(profile_or_profile_id, 'pk', profile_or_profile_id)
+        ids = notify_users([profile_id], message)
+        return ids[0] if ids else None
+    except Exception:
+        # never break the UI flow over a notification
+        logger.exception("create_notification failed")
 
 
-def sending_email(subject,template,context,recipient):
+@retry_on_lock
+def notify_users(profile_ids, message, batch_size=500):
+    """
+    Create the same notification for every profile id using bulk INSERTs
+    (one per `batch_size` rows) and return the ids of the new rows.
+    """
+    profile_ids = list(dict.fromkeys(pk for pk in profile_ids if pk is not None))
+    if not profile_ids:
+        return []
+
+    stamp = timezone.now()
+    created = []
+    with transaction.atomic():
+        for start in range(0, len(profile_ids), batch_size):
+            batch = profile_ids[start:start + batch_size]
+            created += Notification.objects.bulk_create([
+                Notification(recipient_id=pk, message=message, created_at=stamp) for pk in batch
+            ])
+            Profile.objects.filter(id__in=batch).update(unread_notifications=F('unread_notifications') + 1)
+
+        # Push to any open notification streams (only profiles with a live connection).
+        live = set(get_broker().subscribed_ids())
+        for notification in created:
+            if notification.recipient_id in live:
+                publish_on_commit(notification.recipient_id, 'notification', notification_payload(notification))
+
+    if connection.features.can_return_rows_from_bulk_insert:
+        return [n.pk for n in created]
+    # MySQL cannot return ids from a bulk INSERT; the shared timestamp finds them again.
+    return list(Notification.objects.filter(
+        recipient_id__in=profile_ids, created_at=stamp, message=message,
+    ).values_list('id', flat=True))
+
+
+@retry_on_lock
+def mark_notifications_read(profile, ids=None):
+    """
+    Mark the profile's unread notifications as read with a single UPDATE —
+    all of them, or only `ids` — and lower the badge counter to match.
+    Returns how many rows changed.
+    """
+    with transaction.atomic():
+        unread = Notification.objects.filter(recipient=profile, is_read=False)
+        if ids is not None:
+            unread = unread.filter(id__in=ids)
+        updated = unread.update(is_read=True)
+        if updated:
+            Profile.objects.filter(pk=profile.pk).update(
+                unread_notifications=Greatest(F('unread_notifications') - updated, 0)
+            )
+            publish_on_commit(profile.pk, 'read', {'updated': updated})
+    return updated
+
+
+def prune_read_notifications(days, chunk_size=1000):
+    """
+    Delete read notifications older than `days` days, `chunk_size` rows per
+    DELETE so the table is never locked for long. Returns rows removed.
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+    old_read = Notification.objects.filter(is_read=True, created_at__lt=cutoff).order_by()
+    removed = 0
+    while True:
+        ids = list(old_read.values_list('id', flat=True)[:chunk_size])
+        if not ids:
+            return removed
+        removed += Notification.objects.filter(id__in=ids).delete()[0]
 
-    sender = settings.EMAIL_HOST_USER
 
-    email_obj=EmailMultiAlternatives(subject,from_email=sender,to=[recipient])
+def notify_role(role, message, exclude=None):
+    """
+    Notify every profile with `role` (e.g. RoleChoices.VOLUNTEER) in bulk.
+    `exclude` is an optional profile or id to leave out. Returns the new ids.
+    """
+    profiles = Profile.objects.filter(role=role)
+    if exclude is not None:
+        profiles = profiles.exclude(pk=getattr(exclude, 'pk', exclude))
+    return notify_users(list(profiles.values_list('id', flat=True)), message)
 
-    content = render_to_string(template,context)
 
-    email_obj.attach_alternative(content,'text/html')
+def queue_email(subject, html_message, recipient_list, plain_message=None, from_email=None, backend='',
+                digestible=False):
+    """
+    Store one outbox row per recipient and return them.
+    Nothing is sent here — `python manage.py process_outbox` drains the queue,
+    sending every row for the same backend over one SMTP session.
+    """
+    if plain_message is None:
+        plain_message = strip_tags(html_message) if html_message else ''
+    rendered = RenderedEmail(html_message or '', plain_message)
+    return queue_rendered_emails(
+        subject, [(recipient, rendered) for recipient in recipient_list],
+        from_email=from_email, backend=backend, digestible=digestible,
+    )
+
+
+def queue_rendered_emails(subject, rendered, from_email=None, backend='', digestible=False):
+    """
+    Queue personalised emails in one bulk INSERT.
+    `rendered` is [(email address, RenderedEmail), ...], e.g. built with
+    accounts.compose.render_for_recipients.
+
+    With `digestible=True`, mail for users who chose hourly or daily digests
+    is held back and folded into their next summary (accounts/digest.py)
+    instead of being sent on its own. Leave it False for anything urgent or
+    anything the recipient has to act on (approve/reject links).
+    """
+    rendered = [(recipient, email) for recipient, email in rendered if recipient]
+    held_for = {}
+    if digestible and rendered:
+        held_for = dict(
+            Profile.objects.filter(email__in={recipient for recipient, _ in rendered})
+            .exclude(delivery_mode=DeliveryMode.IMMEDIATE)
+            .values_list('email', 'id')
+        )
+
+    sender = from_email or settings.DEFAULT_FROM_EMAIL
+    emails = [
+        OutgoingEmail(
+            subject=subject,
+            body=email.text,
+            html_body=email.html,
+            from_email=sender,
+            to=recipient,
+            backend=backend,
+            max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+            recipient_id=held_for.get(recipient),
+            status=OutboxStatus.HELD if recipient in held_for else OutboxStatus.PENDING,
+        )
+        for recipient, email in rendered
+    ]
+    return OutgoingEmail.objects.bulk_create(emails)
+
+
+def sending_email(subject,template,context,recipient):
 
-    email_obj.send()
+    rendered = compose(template,context)
 
+    queue_rendered_emails(subject, [(recipient, rendered)], from_email=settings.EMAIL_HOST_USER)
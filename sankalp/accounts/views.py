@@ -1,46 +1,40 @@
 from django.views import View
 from django.shortcuts import render, redirect, get_object_or_404
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.mail import send_mail
 from django.conf import settings
 from django.utils.crypto import get_random_string
 from django.urls import reverse
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
-from .forms import ProfileRegistrationForm
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from .forms import ProfileRegistrationForm, DeliveryPreferenceForm, CampaignFilterForm
 from education.models import EducationRequest
 from medical.models import MedicalCampRequest
-from legal.models import LegalAwarenessCamp, LegalQuestion
-from women_support.models import WomenSupportCampaign, WomenSupportArticle, WomenSupportQuestion
-from accounts.models import Profile, Notification
-import threading
-from datetime import timedelta
+from women_support.models import WomenSupportCampaign
+from accounts.models import CampaignIndex, Profile, Notification
+from accounts.utility import queue_email, mark_notifications_read
+from accounts.pagination import paginate
+from accounts.events import get_broker
+from accounts.stats import get_admin_stats
+from accounts.counters import lazy_counts
+from accounts.dashboard import Section, advocate_context, allowed, sections_for, supporter_context
+from accounts.camp_calendar import calendar_token, calendar_user, domains_for, get_feed, to_ics
+from accounts.search_index import kinds_for, search
+from accounts.similar_questions import SOURCES as QUESTION_KINDS, suggest
+import asyncio
+import json
+from datetime import datetime, time, timedelta
 from django.utils.timezone import now
+from django.utils import timezone
 from twilio.rest import Client
 
 
-# 🌿 Threaded Email Sender
-class EmailThread(threading.Thread):
-    def __init__(self, subject, plain_message, from_email, recipient_list, html_message):
-        self.subject = subject
-        self.plain_message = plain_message
-        self.from_email = from_email
-        self.recipient_list = recipient_list
-        self.html_message = html_message
-        threading.Thread.__init__(self)
-
-    def run(self):
-        send_mail(
-            subject=self.subject,
-            message=self.plain_message,
-            from_email=self.from_email,
-            recipient_list=self.recipient_list,
-            html_message=self.html_message,
-        )
-
-
 # 🌿 Auth & Static Views
 class HomeView(View):
     def get(self, request):
@@ -120,13 +114,12 @@ class LoginView(View):
                 })
                 plain_message = strip_tags(html_message)
 
-                EmailThread(
+                queue_email(
                     subject='Sankalp Password Reset',
-                    plain_message=plain_message,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[email],
                     html_message=html_message,
-                ).start()
+                    recipient_list=[email],
+                    plain_message=plain_message,
+                )
 
                 messages.success(request, "📧 Password reset link sent to your email.")
                 return render(request, 'accounts/login.html')
@@ -170,13 +163,12 @@ class ResetPasswordView(View):
         try:
             html_message = render_to_string('accounts/password_changed_email.html', {'user': user})
             plain_message = strip_tags(html_message)
-            EmailThread(
+            queue_email(
                 subject='Sankalp Password Changed',
-                plain_message=plain_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[user.email],
                 html_message=html_message,
-            ).start()
+                recipient_list=[user.email],
+                plain_message=plain_message,
+            )
         except Exception:
             pass
 
@@ -198,86 +190,264 @@ class DashboardView(LoginRequiredMixin, View):
 
         # ✅ Admin Dashboard
         if role == 'Admin':
-            context = {
-                'total_requests': EducationRequest.objects.count(),
-                'pending_requests': EducationRequest.objects.filter(status='Pending').count(),
-                'forwarded_requests': EducationRequest.objects.filter(status='Forwarded').count(),
-                'approved_requests': EducationRequest.objects.filter(status='Approved').count(),
-                'rejected_requests': EducationRequest.objects.filter(status='Rejected').count(),
-                'total_volunteers': Profile.objects.filter(role='Volunteer').count(),
-                'total_donors': Profile.objects.filter(role='Donor').count(),
-                'total_beneficiaries': Profile.objects.filter(role='Beneficiary').count(),
-            }
+            context = get_admin_stats()
             return render(request, 'accounts/admin_dashboard.html', context)
 
         # ✅ Volunteer Dashboard
         elif role == 'Volunteer':
             volunteer = request.user
-            notifications = Notification.objects.filter(recipient=volunteer).order_by('-created_at')
+            notifications = Notification.objects.filter(recipient=volunteer).order_by('-created_at')[:10]
+            tomorrow = timezone.localdate() + timedelta(days=1)
             return render(request, 'accounts/volunteer_dashboard.html', {
-                'pending_requests': EducationRequest.objects.filter(status='Pending'),
-                'forwarded_requests': EducationRequest.objects.filter(forwarded_to__role='Donor', status='Forwarded'),
-                'approved_requests': EducationRequest.objects.filter(status='Approved'),
+                'tomorrow': tomorrow,
+                'upcoming_campaigns': WomenSupportCampaign.objects.for_listing().filter(
+                    volunteer=volunteer, status='Scheduled', scheduled_date=tomorrow,
+                ),
+                'sections': sections_for(volunteer, ['volunteer_pending', 'volunteer_forwarded', 'volunteer_approved']),
+                'request_counts': lazy_counts('education'),
                 'notifications': notifications,
-                'unread_count': notifications.filter(is_read=False).count(),
+                'unread_count': volunteer.unread_notifications,
             })
 
         # ✅ Donor Dashboard
         elif role == 'Donor':
             donor = request.user
-            notifications = Notification.objects.filter(recipient=donor).order_by('-created_at')
+            notifications = Notification.objects.filter(recipient=donor).order_by('-created_at')[:10]
             return render(request, 'accounts/donor_dashboard.html', {
-                'forwarded_requests': EducationRequest.objects.filter(forwarded_to=donor, status='Forwarded'),
-                'approved_requests': EducationRequest.objects.filter(forwarded_to=donor, status='Approved'),
-                'rejected_requests': EducationRequest.objects.filter(forwarded_to=donor, status='Rejected'),
+                'sections': sections_for(donor, ['donor_forwarded', 'donor_approved', 'donor_rejected']),
+                'request_counts': lazy_counts('education', owner=donor),
                 'notifications': notifications,
-                'unread_count': notifications.filter(is_read=False).count(),
+                'unread_count': donor.unread_notifications,
             })
 
         # ✅ Beneficiary Dashboard
         elif role == 'Beneficiary':
             return render(request, 'accounts/beneficiary_dashboard.html', {
-                'education_requests': EducationRequest.objects.filter(beneficiary=request.user).order_by('-created_at'),
-                'medical_camps': MedicalCampRequest.objects.filter(approval_status__in=['Approved', 'Scheduled']).order_by('-scheduled_date', '-created_at'),
-                'women_camps': WomenSupportCampaign.objects.filter(status__in=['Approved', 'Scheduled']).order_by('-scheduled_date', '-created_at'),
+                'education_requests': EducationRequest.objects.for_listing().filter(beneficiary=request.user).order_by('-created_at'),
             })
 
         # ✅ Advocate Dashboard
         elif role == 'Advocate':
-            camps_by_status = {
-                'Pending': LegalAwarenessCamp.objects.filter(status='Pending'),
-                'Approved': LegalAwarenessCamp.objects.filter(status='Approved'),
-                'Rejected': LegalAwarenessCamp.objects.filter(status='Rejected'),
-            }
-            questions = LegalQuestion.objects.all().order_by('-created_at')
-            return render(request, 'accounts/advocate_dashboard.html', {
-                'camps_by_status': camps_by_status,
-                'questions': questions,
-            })
+            return render(request, 'accounts/advocate_dashboard.html', advocate_context(user))
 
         # ✅ Supporter Dashboard
         elif role == 'Supporter':
-            context = {
-                'pending_campaigns': WomenSupportCampaign.objects.filter(status='Pending'),
-                'approved_campaigns': WomenSupportCampaign.objects.filter(status='Approved'),
-                'rejected_campaigns': WomenSupportCampaign.objects.filter(status='Rejected'),
-                'scheduled_campaigns': WomenSupportCampaign.objects.filter(status='Scheduled'),
-                'articles': WomenSupportArticle.objects.filter(author=request.user),
-                'questions': WomenSupportQuestion.objects.all().order_by('-created_at'),
-            }
-            return render(request, 'accounts/supporter_dashboard.html', context)
+            return render(request, 'accounts/supporter_dashboard.html', supporter_context(user))
     # 🔹 Fallback for undefined or missing role
         messages.error(request, "⚠️ Dashboard not available for your role. Contact admin.")
         return redirect('home')  # or any safe page
 
 
-# 🌈 Admin — Manage Users
+# ⬇️ Dashboard "Load more" — next page of one section's rows
+class DashboardSectionView(LoginRequiredMixin, View):
+    def get(self, request, section):
+        if not allowed(section, request.user):
+            return HttpResponse(status=404)
+        return render(request, f'accounts/dashboard_rows/{section}.html', {
+            'section': Section(section, request.user, cursor=request.GET.get('cursor')),
+        })
+
+
+# 📅 Upcoming camps — one feed across medical, legal and women support, with conditional GET
+def _camp_feed(request, user):
+    if not hasattr(request, '_camp_feed'):
+        request._camp_feed = get_feed(domains_for(user))
+    return request._camp_feed
+
+
+def _calendar_user(request, token):
+    if not hasattr(request, '_calendar_user'):
+        request._calendar_user = calendar_user(token)
+    return request._calendar_user
+
+
+def _camp_page_last_modified(request, *args, **kwargs):
+    return _camp_feed(request, request.user)['last_modified']
+
+
+def _camp_page_etag(request, *args, **kwargs):
+    # The HTML page carries the user's name and calendar link, so its ETag is per user.
+    return f"{_camp_feed(request, request.user)['etag']}-{calendar_token(request.user)}"
+
+
+def _camp_ics_last_modified(request, token):
+    user = _calendar_user(request, token)
+    return _camp_feed(request, user)['last_modified'] if user else None
+
+
+def _camp_ics_etag(request, token):
+    user = _calendar_user(request, token)
+    return f"{_camp_feed(request, user)['etag']}-{user.pk}" if user else None
+
+
+class UpcomingCampsView(LoginRequiredMixin, View):
+    @method_decorator(condition(etag_func=_camp_page_etag, last_modified_func=_camp_page_last_modified))
+    def get(self, request):
+        return render(request, 'accounts/upcoming_camps.html', {
+            'camps': _camp_feed(request, request.user)['camps'],
+            'calendar_token': calendar_token(request.user),
+        })
+
+
+class UpcomingCampsCalendarView(View):
+    """.ics feed for calendar apps, which poll without a session: the URL carries the user's calendar_token."""
+
+    @method_decorator(condition(etag_func=_camp_ics_etag, last_modified_func=_camp_ics_last_modified))
+    def get(self, request, token):
+        user = _calendar_user(request, token)
+        if user is None:
+            raise Http404
+        response = HttpResponse(to_ics(_camp_feed(request, user)['camps']), content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = 'inline; filename="sankalp-camps.ics"'
+        response['Cache-Control'] = 'private, max-age=300'
+        return response
+
+
+# 🔎 Search — legal and women-support articles and answered questions
+class SearchView(LoginRequiredMixin, View):
+    def get(self, request):
+        query = request.GET.get('q', '').strip()
+        allowed_kinds = kinds_for(request.user)
+        kind = request.GET.get('kind', '')
+        kinds = [kind] if kind in allowed_kinds else allowed_kinds
+        results = search(query, kinds, limit=settings.SEARCH_RESULTS_LIMIT) if query else []
+        return render(request, 'accounts/search.html', {
+            'query': query,
+            'kind': kind if kind in allowed_kinds else '',
+            'kind_choices': [(k, k.label) for k in allowed_kinds],
+            'results': results,
+        })
+
+
+# 💡 Asked before? — answered questions similar to each draft: ?kind=<kind>&q=<draft>&q=<draft>…
+class SimilarQuestionsView(LoginRequiredMixin, View):
+    max_batch = 4
+
+    def get(self, request):
+        texts = [q.strip() for q in request.GET.getlist('q')[:self.max_batch] if q.strip()]
+        allowed_kinds = [kind for kind in kinds_for(request.user) if kind in QUESTION_KINDS]
+        kind = request.GET.get('kind', '')
+        kinds = [kind] if kind in allowed_kinds else allowed_kinds
+        return JsonResponse({'results': suggest(texts, kinds) if texts else []})
+
+
+# 🔔 Notifications — Inbox (keyset-paginated on created_at, id)
+class NotificationInboxView(LoginRequiredMixin, View):
+    page_size = 20
+
+    def get_page(self, request):
+        notifications = Notification.objects.filter(recipient=request.user)
+        unread_only = request.GET.get('unread') == '1'
+        if unread_only:
+            notifications = notifications.filter(is_read=False)
+        return paginate(request, notifications, self.page_size), unread_only
+
+    def get(self, request):
+        notifications, unread_only = self.get_page(request)
+        return render(request, 'accounts/notifications.html', {
+            'notifications': notifications,
+            'unread_only': unread_only,
+        })
+
+
+class NotificationFeedView(NotificationInboxView):
+    """JSON version of the inbox: ?cursor=<next_cursor>&unread=1"""
+
+    def get(self, request):
+        notifications, unread_only = self.get_page(request)
+        return JsonResponse({
+            'results': [
+                {'id': n.id, 'message': n.message, 'is_read': n.is_read, 'created_at': n.created_at.isoformat()}
+                for n in notifications
+            ],
+            'next_cursor': notifications.next_cursor,
+            'unread_count': request.user.unread_notifications,
+        })
+
+
+# 🔔 Notifications — Live Stream (Server-Sent Events, ASGI only)
+class NotificationStreamView(View):
+    """
+    Holds the connection open and pushes `notification`, `read` and `status`
+    events for the logged-in profile. Idle connections cost one asyncio
+    task each, so one ASGI worker can hold thousands of them.
+
+    Under WSGI the handler would drain the endless generator before sending
+    anything, so unless NOTIFICATION_STREAM_ENABLED is set and the request
+    came through ASGI this answers 204: EventSource stops reconnecting and
+    base.html polls the JSON feed instead.
+    """
+
+    async def get(self, request):
+        if not settings.NOTIFICATION_STREAM_ENABLED or not isinstance(request, ASGIRequest):
+            return HttpResponse(status=204)
+        user = await request.auser()
+        if not user.is_authenticated:
+            return HttpResponse(status=401)
+
+        response = StreamingHttpResponse(self.stream(user.pk), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # stop nginx from buffering the stream
+        return response
+
+    async def stream(self, profile_id):
+        broker = get_broker()
+        subscription = broker.subscribe(profile_id)
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(subscription.get(), timeout=settings.SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+
+
+# 🔔 Notifications — Email Delivery Preference (immediate / hourly / daily digest)
+class NotificationPreferencesView(LoginRequiredMixin, View):
+    def get(self, request):
+        form = DeliveryPreferenceForm(instance=request.user)
+        return render(request, 'accounts/notification_preferences.html', {'form': form})
+
+    def post(self, request):
+        form = DeliveryPreferenceForm(request.POST, instance=request.user)
+        if form.is_valid():
+            form.save()
+            messages.success(request, "✅ Notification preferences saved.")
+            return redirect('notification_inbox')
+        return render(request, 'accounts/notification_preferences.html', {'form': form})
+
+
+# 🔔 Notifications — Mark as Read
+class MarkNotificationsReadView(LoginRequiredMixin, View):
+    """POST `ids` to mark those notifications read, or hit the read-all URL for every one."""
+    mark_all = False
+
+    def post(self, request):
+        ids = None if self.mark_all else [pk for pk in request.POST.getlist('ids') if pk.isdigit()]
+        updated = mark_notifications_read(request.user, ids)
+
+        if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+            request.user.refresh_from_db(fields=['unread_notifications'])
+            return JsonResponse({'updated': updated, 'unread_count': request.user.unread_notifications})
+        next_url = request.POST.get('next')
+        if next_url and url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+            return redirect(next_url)
+        return redirect('dashboard')
+
+
+# 🌈 Admin — Manage Users (keyset-paginated on role, username)
 class AdminUserManagementView(LoginRequiredMixin, View):
+    page_size = 50
+
     def get(self, request):
         if request.user.role != 'Admin':
             messages.error(request, "Access denied.")
             return redirect('dashboard')
-        users = Profile.objects.all().order_by('role', 'username')
+        users = paginate(request, Profile.objects.all(), self.page_size, fields=('role', 'username'), descending=False)
         return render(request, 'accounts/admin_users.html', {'users': users})
 
 
@@ -307,16 +477,45 @@ class AdminUserDeleteView(LoginRequiredMixin, View):
         return redirect('admin_user_management')
 
 
-# 🌈 Admin — Manage & Schedule Campaigns
+def start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+# 🌈 Admin — Manage & Schedule Campaigns (one paged list over CampaignIndex)
 class AdminCampaignManagementView(LoginRequiredMixin, View):
+    page_size = 50
+
     def get(self, request):
         if request.user.role != 'Admin':
             messages.error(request, "Access denied.")
             return redirect('dashboard')
 
-        context = {
-            'education_campaigns': EducationRequest.objects.all(),
-            'medical_campaigns': MedicalCampRequest.objects.all(),
-            'legal_campaigns': LegalAwarenessCamp.objects.all(),
-             'women_support_campaigns': WomenSupportCampaign.objects.all(),        }
-        return render(request, 'accounts/admin_campaigns.html', context)
+        form = CampaignFilterForm(request.GET)
+        filters = form.cleaned_data if form.is_valid() else {}
+        campaigns = CampaignIndex.objects.all()
+        if filters.get('domain'):
+            campaigns = campaigns.filter(domain=filters['domain'])
+        if filters.get('status'):
+            campaigns = campaigns.filter(status=filters['status'])
+
+        # Date range applies to whichever date the list is sorted by; bounds stay
+        # plain comparisons on the column so the (date, id) index is used.
+        date_from, date_to = filters.get('date_from'), filters.get('date_to')
+        if filters.get('sort') == 'scheduled':
+            fields = ('scheduled_date', 'id')
+            campaigns = campaigns.filter(scheduled_date__isnull=False)
+            if date_from:
+                campaigns = campaigns.filter(scheduled_date__gte=date_from)
+            if date_to:
+                campaigns = campaigns.filter(scheduled_date__lte=date_to)
+        else:
+            fields = ('created_at', 'id')
+            if date_from:
+                campaigns = campaigns.filter(created_at__gte=start_of_day(date_from))
+            if date_to:
+                campaigns = campaigns.filter(created_at__lt=start_of_day(date_to + timedelta(days=1)))
+
+        return render(request, 'accounts/admin_campaigns.html', {
+            'form': form,
+            'campaigns': paginate(request, campaigns, self.page_size, fields=fields),
+        })
@@ -3,6 +3,15 @@ from django.utils import timezone
 from accounts.models import Profile
 from django.conf import settings  # ✅ to access env secrets later
 
+class EducationRequestQuerySet(models.QuerySet):
+    def for_listing(self):
+        """Rows for request tables: people joined in, the internal notes left out."""
+        return self.select_related('beneficiary', 'volunteer', 'forwarded_to').defer('volunteer_notes', 'admin_notes')
+
+    def for_detail(self):
+        return self.select_related('beneficiary', 'volunteer', 'forwarded_to')
+
+
 class EducationRequest(models.Model):
     beneficiary = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='education_requests')
     full_name = models.CharField(max_length=100)
@@ -31,5 +40,19 @@ class EducationRequest(models.Model):
     volunteer_notes = models.TextField(null=True, blank=True)
     admin_notes = models.TextField(null=True, blank=True)
 
+    objects = EducationRequestQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # volunteer/admin lists by status, newest first
+            models.Index(fields=['status', 'created_at'], name='edu_status_created_idx'),
+            # donor dashboard: forwarded_to = me AND status = ...
+            models.Index(fields=['forwarded_to', 'status'], name='edu_donor_status_idx'),
+            # beneficiary dashboard / education info: my requests, newest first
+            models.Index(fields=['beneficiary', 'created_at'], name='edu_beneficiary_created_idx'),
+            # admin list of every request, paged on (created_at, id)
+            models.Index(fields=['created_at'], name='edu_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.full_name} ({self.status})"
@@ -1,4 +1,3 @@
-import threading
 from django.shortcuts import render, redirect, get_object_or_404 
 from django.views import View
 from django.contrib import messages
@@ -6,13 +5,10 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.utils import timezone
 from .forms import EducationRequestForm
 from .models import EducationRequest
-from accounts.models import Profile
-from accounts.utility import send_phone_sms, create_notification  # ✅ Twilio + notification
-
-# 🌸 Utility: Send notification/SMS asynchronously
-def run_in_thread(func, *args, **kwargs):
-    threading.Thread(target=func, args=args, kwargs=kwargs).start()
-
+from accounts.models import Profile, RoleChoices
+from accounts.utility import send_phone_sms, notify_role, notify_users  # ✅ Twilio + notification
+from accounts.events import publish_status_change
+from accounts.pagination import paginate
 
 # 🎓 Beneficiary – Submit Education Request
 class EducationRequestView(LoginRequiredMixin, View):
@@ -37,12 +33,10 @@ class EducationRequestView(LoginRequiredMixin, View):
             edu_req.created_at = timezone.now()
             edu_req.save()
 
-            # ✅ Notify all volunteers asynchronously
-            volunteers = Profile.objects.filter(role='Volunteer')
-            for v in volunteers:
-                run_in_thread(create_notification, v,
-                    f"🎓 New education support request submitted by {request.user.get_full_name() or request.user.username}."
-                )
+            # ✅ Notify all volunteers in one bulk insert
+            notify_role(RoleChoices.VOLUNTEER,
+                f"🎓 New education support request submitted by {request.user.get_full_name() or request.user.username}."
+            )
 
             messages.success(request, "🎓 Education support request submitted successfully!")
             return redirect('education_info')
@@ -57,7 +51,7 @@ class EducationInfoView(LoginRequiredMixin, View):
             messages.error(request, "Access denied.")
             return redirect('dashboard')
 
-        edu_req = EducationRequest.objects.filter(beneficiary=request.user).last()
+        edu_req = EducationRequest.objects.for_detail().filter(beneficiary=request.user).last()
         return render(request, 'education/education_info.html', {'education_request': edu_req})
 
 
@@ -68,9 +62,13 @@ class VolunteerEducationRequestsView(LoginRequiredMixin, View):
             messages.error(request, "Access denied.")
             return redirect('dashboard')
 
-        all_requests = EducationRequest.objects.exclude(status__in=['Approved', 'Rejected']).order_by('-created_at')
+        all_requests = (
+            EducationRequest.objects.for_listing().filter(status__in=['Pending', 'Forwarded']).order_by('-created_at')
+        )
         donors = Profile.objects.filter(role='Donor')
-        forwarded_requests = EducationRequest.objects.filter(status='Forwarded').order_by('-forwarded_at')
+        forwarded_requests = (
+            EducationRequest.objects.for_listing().filter(status='Forwarded').order_by('-forwarded_at')
+        )
 
         return render(request, 'education/volunteer_requests.html', {
             'requests': all_requests,
@@ -88,7 +86,7 @@ class VolunteerForwardRequestView(LoginRequiredMixin, View):
 
         donor_id = request.POST.get('donor_id')
         donor_profile = get_object_or_404(Profile, id=donor_id)
-        edu_req = get_object_or_404(EducationRequest, pk=pk)
+        edu_req = get_object_or_404(EducationRequest.objects.for_detail(), pk=pk)
 
         if edu_req.status != 'Pending':
             messages.warning(request, "This request has already been processed.")
@@ -100,17 +98,16 @@ class VolunteerForwardRequestView(LoginRequiredMixin, View):
         edu_req.forwarded_at = timezone.now()
         edu_req.status = 'Forwarded'
         edu_req.save()
+        publish_status_change(edu_req.beneficiary_id, 'education', edu_req, edu_req.status)
 
-        # ✅ Notify admin asynchronously
-        admins = Profile.objects.filter(role='Admin')
-        for admin in admins:
-            run_in_thread(create_notification, admin,
-                f"📨 Volunteer {request.user.username} forwarded an education request to donor {donor_profile.username}."
-            )
+        # ✅ Notify admins in one bulk insert
+        notify_role(RoleChoices.ADMIN,
+            f"📨 Volunteer {request.user.username} forwarded an education request to donor {donor_profile.username}."
+        )
 
-        # ✅ SMS: Only Donor gets a message asynchronously
-        run_in_thread(send_phone_sms,
-            '9061525199',  # dummy number
+        # ✅ SMS: Only Donor gets a message (queued on the SMS dispatcher)
+        send_phone_sms(
+            donor_profile.contact,
             f"🎓 A new education support request has been forwarded to you by Volunteer {request.user.username}. "
             "Please check your Sankalp dashboard to view details."
         )
@@ -127,25 +124,23 @@ class ApproveStudentRequestView(LoginRequiredMixin, View):
             return redirect('dashboard')
 
         donor_profile = request.user
-        edu_req = get_object_or_404(EducationRequest, id=request_id, forwarded_to=donor_profile)
+        edu_req = get_object_or_404(EducationRequest.objects.for_detail(), id=request_id, forwarded_to=donor_profile)
         edu_req.status = 'Approved'
         edu_req.decision_at = timezone.now()
         edu_req.save()
+        publish_status_change(edu_req.beneficiary_id, 'education', edu_req, edu_req.status)
 
-        # ✅ Notify admin and volunteer asynchronously
-        admins = Profile.objects.filter(role='Admin')
-        for admin in admins:
-            run_in_thread(create_notification, admin,
-                f"✅ Donor {donor_profile.username} approved a student request."
-            )
-        if edu_req.volunteer:
-            run_in_thread(create_notification, edu_req.volunteer,
-                f"✅ Donor {donor_profile.username} approved the request you forwarded."
-            )
+        # ✅ Notify admins and volunteer with bulk inserts
+        notify_role(RoleChoices.ADMIN,
+            f"✅ Donor {donor_profile.username} approved a student request."
+        )
+        notify_users([edu_req.volunteer_id],
+            f"✅ Donor {donor_profile.username} approved the request you forwarded."
+        )
 
-        # ✅ SMS to Student asynchronously
-        run_in_thread(send_phone_sms,
-            '9061525199',
+        # ✅ SMS to Student (queued on the SMS dispatcher)
+        send_phone_sms(
+            edu_req.beneficiary.contact,
             f"✅ Congratulations {edu_req.beneficiary.get_full_name() or edu_req.beneficiary.username}! "
             f"Your education support request has been approved by Donor {donor_profile.username}."
         )
@@ -162,25 +157,23 @@ class RejectStudentRequestView(LoginRequiredMixin, View):
             return redirect('dashboard')
 
         donor_profile = request.user
-        edu_req = get_object_or_404(EducationRequest, id=request_id, forwarded_to=donor_profile)
+        edu_req = get_object_or_404(EducationRequest.objects.for_detail(), id=request_id, forwarded_to=donor_profile)
         edu_req.status = 'Rejected'
         edu_req.decision_at = timezone.now()
         edu_req.save()
+        publish_status_change(edu_req.beneficiary_id, 'education', edu_req, edu_req.status)
 
-        # ✅ Notify admin and volunteer asynchronously
-        admins = Profile.objects.filter(role='Admin')
-        for admin in admins:
-            run_in_thread(create_notification, admin,
-                f"❌ Donor {donor_profile.username} rejected a student request."
-            )
-        if edu_req.volunteer:
-            run_in_thread(create_notification, edu_req.volunteer,
-                f"❌ Donor {donor_profile.username} rejected the request you forwarded."
-            )
+        # ✅ Notify admins and volunteer with bulk inserts
+        notify_role(RoleChoices.ADMIN,
+            f"❌ Donor {donor_profile.username} rejected a student request."
+        )
+        notify_users([edu_req.volunteer_id],
+            f"❌ Donor {donor_profile.username} rejected the request you forwarded."
+        )
 
-        # ✅ SMS to Student asynchronously
-        run_in_thread(send_phone_sms,
-            '9061525199',
+        # ✅ SMS to Student (queued on the SMS dispatcher)
+        send_phone_sms(
+            edu_req.beneficiary.contact,
             f"❌ Dear {edu_req.beneficiary.get_full_name() or edu_req.beneficiary.username}, "
             f"your education support request was not approved by Donor {donor_profile.username}. "
             "Don’t lose hope — your request will remain active for other sponsors."
@@ -197,7 +190,7 @@ class EducationDetailView(LoginRequiredMixin, View):
             messages.error(request, "Access denied.")
             return redirect('dashboard')
 
-        edu_req = EducationRequest.objects.filter(beneficiary=request.user).last()
+        edu_req = EducationRequest.objects.for_detail().filter(beneficiary=request.user).last()
         if not edu_req:
             messages.warning(request, "No education requests found. Please submit one first.")
             return redirect('education_request')
@@ -205,12 +198,14 @@ class EducationDetailView(LoginRequiredMixin, View):
         return render(request, 'education/education_details.html', {'education_request': edu_req})
 
 
-# 🧩 Admin – View All Education Requests
+# 🧩 Admin – View All Education Requests (keyset-paginated on created_at, id)
 class AdminEducationRequestsView(LoginRequiredMixin, View):
+    page_size = 50
+
     def get(self, request):
         if request.user.role != 'Admin':
             messages.error(request, "Access denied.")
             return redirect('dashboard')
 
-        requests = EducationRequest.objects.all().order_by('-created_at')
+        requests = paginate(request, EducationRequest.objects.for_listing(), self.page_size)
         return render(request, 'education/admin_education_requests.html', {'requests': requests})
@@ -2,6 +2,31 @@ from django.db import models
 from django.conf import settings
 
 
+class LegalAwarenessCampQuerySet(models.QuerySet):
+    def for_listing(self):
+        """Rows for camp lists: requester and advocate joined in, the description left out."""
+        return self.select_related('requested_by', 'assigned_advocate').defer('description')
+
+    def for_detail(self):
+        return self.select_related('requested_by', 'assigned_advocate')
+
+
+class LegalArticleQuerySet(models.QuerySet):
+    def for_listing(self):
+        return self.select_related('author')
+
+    def for_detail(self):
+        return self.select_related('author')
+
+
+class LegalQuestionQuerySet(models.QuerySet):
+    def for_listing(self):
+        return self.select_related('asked_by', 'answered_by')
+
+    def for_detail(self):
+        return self.select_related('asked_by', 'answered_by')
+
+
 class LegalAwarenessCamp(models.Model):
     CATEGORY_CHOICES = [
         ('SheRights', 'Women’s Rights'),
@@ -54,6 +79,8 @@ class LegalAwarenessCamp(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = LegalAwarenessCampQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.title} ({self.category})"
 
@@ -61,6 +88,9 @@ class LegalAwarenessCamp(models.Model):
         ordering = ['-created_at']
         verbose_name = "Legal Awareness Camp"
         verbose_name_plural = "Legal Awareness Camps"
+        indexes = [
+            models.Index(fields=['status', 'scheduled_date']),
+        ]
 
 
 class LegalArticle(models.Model):
@@ -69,6 +99,14 @@ class LegalArticle(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
 
+    objects = LegalArticleQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # article list, paged on (created_at, id)
+            models.Index(fields=['created_at'], name='legal_article_created_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -84,5 +122,15 @@ class LegalQuestion(models.Model):
     answered_at = models.DateTimeField(null=True, blank=True)
     is_answered = models.BooleanField(default=False)  # ✅ add this
 
+    objects = LegalQuestionQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Q&A list, paged on (created_at, id)
+            models.Index(fields=['created_at'], name='legal_question_created_idx'),
+            # similar-question index: questions answered since its last sync
+            models.Index(fields=['answered_at'], name='legal_question_answered_idx'),
+        ]
+
     def __str__(self):
         return f"Q: {self.question[:50]}..."
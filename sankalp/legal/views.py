@@ -3,26 +3,19 @@ from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views import View
 from django.views.generic import FormView
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
 from django.urls import reverse
 from django.conf import settings
 from .forms import LegalAwarenessCampForm, LegalArticleForm, LegalQuestionForm
 from .models import LegalAwarenessCamp, LegalQuestion, LegalArticle
 from education.models import Profile
-import threading
+from accounts.utility import queue_email, queue_rendered_emails
+from accounts.compose import compose, render_for_recipients
+from accounts.events import publish_status_change
+from accounts.dashboard import advocate_context
+from accounts.pagination import paginate
 from django.utils import timezone
 
 
-# 🧵 Utility: Send Email in Background
-def send_email_async(subject, html_message, recipient_list):
-    def _send():
-        msg = EmailMultiAlternatives(subject, "", settings.DEFAULT_FROM_EMAIL, recipient_list)
-        msg.attach_alternative(html_message, "text/html")
-        msg.send(fail_silently=True)
-    threading.Thread(target=_send).start()
-
-
 # 🌿 Volunteer: Request Legal Awareness Camp
 class LegalCampRequestView(LoginRequiredMixin, FormView):
     template_name = 'legal/request_legal_camp.html'
@@ -40,16 +33,16 @@ class LegalCampRequestView(LoginRequiredMixin, FormView):
         camp.requested_by = self.request.user
         camp.save()
 
-        advocates = Profile.objects.filter(role='Advocate').exclude(email__isnull=True)
-        for advocate in advocates:
-            approval_link = self.request.build_absolute_uri(reverse('approve_legal_camp', args=[camp.id]))
-            subject = f"🧾 New Legal Camp Request: {camp.title}"
-            html_message = render_to_string('legal/legal_camp_request_email.html', {
-                'advocate': advocate,
-                'camp': camp,
-                'approval_link': approval_link,
-            })
-            send_email_async(subject, html_message, [advocate.email])
+        advocates = Profile.objects.filter(role='Advocate').exclude(email__isnull=True).exclude(email='')
+        approval_link = self.request.build_absolute_uri(reverse('approve_legal_camp', args=[camp.id]))
+        subject = f"🧾 New Legal Camp Request: {camp.title}"
+        # Render once, then fill in each advocate's name
+        rendered = render_for_recipients('legal/legal_camp_request_email.html', {
+            'camp': camp,
+            'approval_link': approval_link,
+        }, advocates.only('id', 'username', 'email'), as_name='advocate')
+        # Carries the approval link, so it is never held back for a digest
+        queue_rendered_emails(subject, [(advocate.email, email) for advocate, email in rendered])
 
         messages.success(self.request, "✅ Legal awareness camp request submitted successfully.")
         return super().form_valid(form)
@@ -65,18 +58,18 @@ class LegalInfoView(LoginRequiredMixin, View):
         questions = None
 
         if role == 'Volunteer':
-            camps = LegalAwarenessCamp.objects.filter(requested_by=request.user)
+            camps = LegalAwarenessCamp.objects.for_listing().filter(requested_by=request.user)
             title = "📋 My Legal Awareness Camp Requests"
 
         elif role == 'Beneficiary':
-            camps = LegalAwarenessCamp.objects.filter(status='Approved')
+            camps = LegalAwarenessCamp.objects.for_listing().filter(status='Approved')
             title = "⚖️ Approved Legal Awareness Camps"
             # 👇 Add these for beneficiaries
-            articles = LegalArticle.objects.all().order_by('-created_at')
-            questions = LegalQuestion.objects.filter(asked_by=request.user).order_by('-created_at')
+            articles = LegalArticle.objects.for_listing().order_by('-created_at')
+            questions = LegalQuestion.objects.for_listing().filter(asked_by=request.user).order_by('-created_at')
 
         elif role == 'Advocate':
-            camps = LegalAwarenessCamp.objects.all().order_by('-proposed_date')
+            camps = LegalAwarenessCamp.objects.for_listing().order_by('-proposed_date')
             title = "🧾 All Legal Awareness Camps"
 
         else:
@@ -108,24 +101,7 @@ class AdvocateDashboardView(LoginRequiredMixin, View):
             messages.error(request, "Access denied: Only advocates can view this page.")
             return redirect('home')
 
-        pending_camps = LegalAwarenessCamp.objects.filter(status='Pending').select_related('requested_by')
-        approved_camps = LegalAwarenessCamp.objects.filter(status='Approved').select_related('requested_by')
-        rejected_camps = LegalAwarenessCamp.objects.filter(status='Rejected').select_related('requested_by')
-
-        # Added
-        articles = LegalArticle.objects.filter(author=request.user).order_by('-created_at')
-        questions = LegalQuestion.objects.filter(answer__isnull=True).order_by('-created_at')
-
-        article_form = LegalArticleForm()
-
-        return render(request, 'accounts/advocate_dashboard.html', {
-            'pending_camps': pending_camps,
-            'approved_camps': approved_camps,
-            'rejected_camps': rejected_camps,
-            'articles': articles,
-            'questions': questions,
-            'article_form': article_form,
-        })
+        return render(request, 'accounts/advocate_dashboard.html', advocate_context(request.user))
 
     def post(self, request):
         if request.user.role != 'Advocate':
@@ -151,7 +127,7 @@ class UpdateCampStatusView(LoginRequiredMixin, View):
             messages.error(request, "Access denied.")
             return redirect('home')
 
-        camp = get_object_or_404(LegalAwarenessCamp, id=camp_id)
+        camp = get_object_or_404(LegalAwarenessCamp.objects.for_detail(), id=camp_id)
         status = request.POST.get('status')
 
         if camp.status != 'Pending':
@@ -164,14 +140,15 @@ class UpdateCampStatusView(LoginRequiredMixin, View):
             if not camp.assigned_advocate:
                 camp.assigned_advocate = request.user
             camp.save()
+            publish_status_change(camp.requested_by_id, 'legal', camp, status)
 
             subject = f"⚖️ Legal Camp {status}: {camp.title}"
-            html_message = render_to_string('legal/legal_camp_status_update_mail.html', {
+            rendered = compose('legal/legal_camp_status_update_mail.html', {
                 'camp': camp,
                 'status': status,
                 'advocate': request.user,
             })
-            send_email_async(subject, html_message, [camp.requested_by.email])
+            queue_rendered_emails(subject, [(camp.requested_by.email, rendered)], digestible=True)
 
             messages.success(request, f"✅ '{camp.title}' marked as {status}. Advocate assigned.")
         else:
@@ -186,13 +163,13 @@ class ApproveLegalCampView(View):
     template_name = 'legal/approve_from_email.html'
 
     def get(self, request, camp_id):
-        camp = get_object_or_404(LegalAwarenessCamp, id=camp_id)
+        camp = get_object_or_404(LegalAwarenessCamp.objects.for_detail(), id=camp_id)
         if camp.status == 'Approved':
             return render(request, self.template_name, {'camp': camp, 'already_approved': True})
         return render(request, self.template_name, {'camp': camp, 'already_approved': False})
 
     def post(self, request, camp_id):
-        camp = get_object_or_404(LegalAwarenessCamp, id=camp_id)
+        camp = get_object_or_404(LegalAwarenessCamp.objects.for_detail(), id=camp_id)
 
         if camp.status != 'Approved':
             camp.status = 'Approved'
@@ -207,28 +184,33 @@ class ApproveLegalCampView(View):
                     camp.assigned_advocate = first_advocate
 
             camp.save()
+            publish_status_change(camp.requested_by_id, 'legal', camp, camp.status)
 
             subject = f"✅ Legal Camp Approved: {camp.title}"
-            html_message = render_to_string('legal/legal_camp_status_update_mail.html', {
+            rendered = compose('legal/legal_camp_status_update_mail.html', {
                 'camp': camp,
                 'status': 'Approved',
                 'advocate': camp.assigned_advocate or 'Email Approval',
             })
-            send_email_async(subject, html_message, [camp.requested_by.email])
+            queue_rendered_emails(subject, [(camp.requested_by.email, rendered)], digestible=True)
 
         return render(request, self.template_name, {'camp': camp, 'approved_now': True})
 
 # 📰 Article List (Visible to all)
 class LegalArticleListView(LoginRequiredMixin, View):
+    page_size = 20
+
     def get(self, request):
-        articles = LegalArticle.objects.all().order_by('-created_at')
+        articles = paginate(request, LegalArticle.objects.for_listing(), self.page_size)
         return render(request, 'legal/articles.html', {'articles': articles})
 
 
 # 💬 Q&A Section
 class LegalQuestionView(LoginRequiredMixin, View):
+    page_size = 25
+
     def get(self, request):
-        questions = LegalQuestion.objects.all().order_by('-created_at')
+        questions = paginate(request, LegalQuestion.objects.for_listing(), self.page_size)
         form = LegalQuestionForm()
         return render(request, 'legal/questions.html', {'questions': questions, 'form': form})
 
@@ -243,7 +225,7 @@ class LegalQuestionView(LoginRequiredMixin, View):
 
 class AnswerLegalQuestionView(LoginRequiredMixin, View):
     def post(self, request, question_id):
-        question = get_object_or_404(LegalQuestion, pk=question_id)
+        question = get_object_or_404(LegalQuestion.objects.for_detail(), pk=question_id)
 
         if question.is_answered:
             messages.warning(request, "This question is already answered.")
@@ -259,7 +241,7 @@ class AnswerLegalQuestionView(LoginRequiredMixin, View):
         # send email to questioner
         subject = "Your Legal Question Has Been Answered"
         message = f"Hi {question.asked_by.username},\n\nYour question:\n{question.question}\n\nAnswer:\n{answer}\n\nBest regards,\nNyayaSakhi Team"
-        question.asked_by.email_user(subject, message)
+        queue_email(subject, None, [question.asked_by.email], plain_message=message)
 
         messages.success(request, "Answer sent successfully!")
         return redirect('advocate_dashboard')
@@ -267,7 +249,7 @@ class AnswerLegalQuestionView(LoginRequiredMixin, View):
 
 class EditLegalArticleView(LoginRequiredMixin, View):
     def post(self, request, pk):
-        article = get_object_or_404(LegalArticle, pk=pk, created_by=request.user)
+        article = get_object_or_404(LegalArticle.objects.for_detail(), pk=pk, created_by=request.user)
         title = request.POST.get('title')
         content = request.POST.get('content')
 
@@ -282,7 +264,7 @@ class EditLegalArticleView(LoginRequiredMixin, View):
 
 class DeleteLegalArticleView(LoginRequiredMixin, View):
     def post(self, request, pk):
-        article = get_object_or_404(LegalArticle, pk=pk, author=request.user)
+        article = get_object_or_404(LegalArticle.objects.for_detail(), pk=pk, author=request.user)
         article.delete()
         messages.success(request, "Article deleted successfully.")
         return redirect('legal_articles')
@@ -290,5 +272,5 @@ class DeleteLegalArticleView(LoginRequiredMixin, View):
 
 class LegalArticleDetailView(View):
     def get(self, request, pk):
-        article = get_object_or_404(LegalArticle, pk=pk)
+        article = get_object_or_404(LegalArticle.objects.for_detail(), pk=pk)
         return render(request, 'legal/article_details.html', {'article': article})
@@ -3,5 +3,9 @@ from django.contrib import admin
 from . import models
 # Register your models here.
 
-admin.site.register(models.MedicalCampRequest)
+@admin.register(models.MedicalCampRequest)
+class MedicalCampRequestAdmin(admin.ModelAdmin):
+    list_select_related = ('hospital',)
+
+
 admin.site.register(models.Hospital)
\ No newline at end of file
@@ -11,6 +11,15 @@ class Hospital(models.Model):
         return self.name
 
 
+class MedicalCampRequestQuerySet(models.QuerySet):
+    def for_listing(self):
+        """Rows for camp tables: hospital and volunteer joined in, the description left out."""
+        return self.select_related('hospital', 'volunteer').defer('description')
+
+    def for_detail(self):
+        return self.select_related('hospital', 'volunteer')
+
+
 class MedicalCampRequest(models.Model):
     volunteer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     hospital = models.ForeignKey(Hospital, on_delete=models.CASCADE)
@@ -28,5 +37,12 @@ class MedicalCampRequest(models.Model):
     # ✅ Unique token for hospital approval link (safe to migrate)
     approval_token = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
 
+    objects = MedicalCampRequestQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['approval_status', 'scheduled_date']),
+        ]
+
     def __str__(self):
         return f"{self.hospital.name} - {self.date}"
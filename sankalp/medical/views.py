@@ -1,25 +1,15 @@
-import threading
 from django.shortcuts import render, redirect, get_object_or_404
 from django.views import View
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.mail import EmailMessage
-from django.conf import settings
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 from django.urls import reverse
 
 from .models import MedicalCampRequest, Hospital
 from .forms import MedicalCampForm
-
-
-# 🔹 Helper for background email sending
-def send_async_email(email):
-    """Send email in a background thread to avoid blocking the response."""
-    try:
-        email.send(fail_silently=True)
-    except Exception as e:
-        print("Email sending error:", e)
+from accounts.utility import queue_email
+from accounts.events import publish_status_change
 
 
 # 🔹 Volunteer creates a camp request
@@ -55,9 +45,7 @@ class MedicalCampRequestView(LoginRequiredMixin, View):
             text_content = strip_tags(html_content)
 
             if hospital.email:
-                email = EmailMessage(subject, html_content, settings.DEFAULT_FROM_EMAIL, [hospital.email])
-                email.content_subtype = "html"
-                threading.Thread(target=send_async_email, args=(email,)).start()
+                queue_email(subject, html_content, [hospital.email], plain_message=text_content)
 
             messages.success(request, "✅ Your medical camp request has been sent to the hospital.")
             return redirect('volunteer_medical_list')
@@ -69,7 +57,7 @@ class MedicalCampRequestView(LoginRequiredMixin, View):
 # 🔹 Hospital approves or rejects via email link
 class HospitalApproveRequestView(View):
     def get(self, request, token):
-        camp_request = get_object_or_404(MedicalCampRequest, approval_token=token)
+        camp_request = get_object_or_404(MedicalCampRequest.objects.for_detail(), approval_token=token)
         status = request.GET.get('status')
 
         if camp_request.approval_status in ['Scheduled', 'Rejected']:
@@ -92,6 +80,7 @@ class HospitalApproveRequestView(View):
             })
 
         camp_request.save()
+        publish_status_change(camp_request.volunteer_id, 'medical', camp_request, camp_request.approval_status)
 
         # Notify volunteer
         subject = f"Update from {camp_request.hospital.name} – Medical Camp Request"
@@ -101,9 +90,7 @@ class HospitalApproveRequestView(View):
         })
         volunteer_email = camp_request.volunteer.email
         if volunteer_email:
-            email = EmailMessage(subject, html_content, settings.DEFAULT_FROM_EMAIL, [volunteer_email])
-            email.content_subtype = "html"
-            threading.Thread(target=lambda e: e.send(fail_silently=True), args=(email,)).start()
+            queue_email(subject, html_content, [volunteer_email], digestible=True)
 
         return render(request, 'medical/email_response.html', {'message': message})
 
@@ -113,10 +100,10 @@ class VolunteerMedicalCampListView(LoginRequiredMixin, View):
     def get(self, request):
         # If admin → show all camps
         if request.user.role == 'Admin':
-            camps = MedicalCampRequest.objects.all().order_by('-created_at')
+            camps = MedicalCampRequest.objects.for_listing().order_by('-created_at')
         else:
             # Volunteer → show only their own requests
-            camps = MedicalCampRequest.objects.filter(volunteer=request.user).order_by('-created_at')
+            camps = MedicalCampRequest.objects.for_listing().filter(volunteer=request.user).order_by('-created_at')
         
         return render(request, 'medical/volunteer_camp_list.html', {'camps': camps})
 
@@ -131,7 +118,7 @@ class MedicalCampInfoView(LoginRequiredMixin, View):
             messages.error(request, "Access restricted to beneficiaries only.")
             return redirect('medical_camp_request')
 
-        camps = MedicalCampRequest.objects.filter(
+        camps = MedicalCampRequest.objects.for_listing().filter(
             approval_status__in=['Approved', 'Scheduled']
         ).order_by('-created_at')
         return render(request, 'medical/info.html', {'camps': camps})
@@ -140,6 +127,6 @@ class MedicalCampInfoView(LoginRequiredMixin, View):
 # 🔹 Detailed view for a single medical camp
 class MedicalCampDetailView(LoginRequiredMixin, View):
     def get(self, request, pk):
-        camp = get_object_or_404(MedicalCampRequest, pk=pk)
+        camp = get_object_or_404(MedicalCampRequest.objects.for_detail(), pk=pk)
         return render(request, 'medical/camp_detail.html', {'camp': camp})
 
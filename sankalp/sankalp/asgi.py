@@ -2,6 +2,9 @@
 ASGI config for sankalp project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. ``uvicorn sankalp.asgi:application``) so the
+live notification stream at /notifications/stream/ can hold many idle
+connections per worker.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -14,3 +17,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sankalp.settings')
 
 application = get_asgi_application()
+
+# Build the "asked before?" index now, in the background, rather than during a request.
+from accounts.similar_questions import warm_up  # noqa: E402
+
+warm_up()
@@ -0,0 +1,109 @@
+"""
+Query budgets per view name (the url name, or 'namespace:name'), checked by
+sankalp.querycount.QueryBudgetMiddleware. Every named route in
+sankalp/urls.py needs an entry here or under its namespace; accounts.tests
+fails when one is missing and opens every route to check it stays inside.
+
+Budgets count every statement of the request, session and user lookups
+included. Pages get their measured count plus a little headroom, so a new
+per-row query shows up straight away; views that write (approve, forward,
+create …) get WRITE_BUDGET because they also fan out notifications,
+counters and emails.
+"""
+
+WRITE_BUDGET = 30
+
+BUDGETS = {
+    # accounts
+    'home': 5,
+    'about': 5,
+    'contact': 5,
+    'register': 10,
+    'login': 10,
+    'logout': 6,
+    'reset_password': 6,
+    'dashboard': 8,
+    'admin_dashboard': 8,
+    'volunteer_dashboard': 10,
+    'donor_dashboard': 10,
+    'beneficiary_dashboard': 6,
+    'advocate_dashboard': 8,  # same page as the Advocate 'dashboard'
+    'supporter_dashboard': 10,
+    'dashboard_section': 6,
+    'upcoming_camps': 6,
+    'upcoming_camps_ics': 6,
+    'search': 8,
+    'similar_questions': 6,
+    'notification_inbox': 6,
+    'notification_feed': 6,
+    'notification_stream': 6,
+    'notification_preferences': 6,
+    'mark_notifications_read': 8,
+    'mark_all_notifications_read': 8,
+    'admin_user_management': 6,
+    'admin_user_edit': WRITE_BUDGET,
+    'admin_user_delete': WRITE_BUDGET,
+    'admin_campaign_management': 6,
+
+    # education
+    'education_request': WRITE_BUDGET,
+    'education_info': 6,
+    'education_details': 6,
+    'volunteer_education_requests': 8,
+    'admin_education_requests': 6,
+    'volunteer_forward_request': WRITE_BUDGET,
+    'approve_student_request': WRITE_BUDGET,
+    'reject_student_request': WRITE_BUDGET,
+
+    # medical
+    'medical_camp_request': WRITE_BUDGET,
+    'volunteer_medical_list': 8,
+    'medical_info': 6,
+    'medical_camp_detail': 6,
+    'hospital_approve_request': WRITE_BUDGET,
+
+    # legal
+    'request_legal_camp': WRITE_BUDGET,
+    'legal_info': 8,
+    'advocate_list': 6,
+    'update_camp_status': WRITE_BUDGET,
+    'approve_legal_camp': WRITE_BUDGET,
+    'legal_articles': 6,
+    'legal_article_detail': 6,
+    'legal_questions': WRITE_BUDGET,
+    'answer_legal_question': WRITE_BUDGET,
+    'edit_legal_article': WRITE_BUDGET,
+    'delete_legal_article': WRITE_BUDGET,
+
+    # women_support
+    'women_support_info': 8,
+    'request_campaign': WRITE_BUDGET,
+    'approve_campaign': WRITE_BUDGET,
+    'schedule_women_campaign': WRITE_BUDGET,
+    'women_support_articles': 6,
+    'create_article': WRITE_BUDGET,
+    'edit_article': WRITE_BUDGET,
+    'delete_article': WRITE_BUDGET,
+    'view_article': 6,
+    'women_support_questions': 6,
+    'women_ask_question': WRITE_BUDGET,
+    'reply_question': WRITE_BUDGET,
+    'approve_women_campaign': WRITE_BUDGET,
+    'reject_women_campaign': WRITE_BUDGET,
+    'campaign_handled': WRITE_BUDGET,
+    'send_supporter_reminder': WRITE_BUDGET,
+    'view_campaign': 6,
+}
+
+# Routes we do not write ourselves, e.g. the Django admin.
+NAMESPACE_BUDGETS = {
+    'admin': 15,
+}
+
+
+def budget_for(view_name):
+    """The query budget for `view_name`, or None when none is declared."""
+    if view_name in BUDGETS:
+        return BUDGETS[view_name]
+    namespace, _, _ = view_name.rpartition(':')
+    return NAMESPACE_BUDGETS.get(namespace)
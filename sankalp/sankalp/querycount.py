@@ -0,0 +1,134 @@
+"""
+Query budgets: count the SQL each view runs, how long it spends in the
+database and which SELECTs it repeats with different parameters (the
+signature of an N+1 loop such as `{{ edu.beneficiary.username }}` over an
+un-joined queryset).
+
+QueryBudgetMiddleware checks every request against the budget declared for
+its view name in sankalp.query_budgets. settings.QUERY_BUDGET_MODE decides
+what happens when a view goes over:
+
+* 'off'   — nothing is recorded
+* 'log'   — a warning is printed and the response carries X-Query-Count /
+            Server-Timing headers
+* 'raise' — QueryBudgetExceeded is raised (tests and local development)
+
+In tests, `with query_budget(5): ...` applies the same checks to any block.
+"""
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+from sankalp.query_budgets import budget_for
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryRecorder:
+    """Records every statement run on any database connection while active."""
+
+    def __init__(self):
+        self.queries = []  # (sql, params, seconds)
+        self._stack = None
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        seen = set()
+        for conn in connections.all():
+            # Aliases can share a connection object (e.g. a mirrored replica in tests).
+            if id(conn) not in seen:
+                seen.add(id(conn))
+                self._stack.enter_context(conn.execute_wrapper(self._record))
+        return self
+
+    def __exit__(self, *exc):
+        self._stack.close()
+
+    def _record(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, params, time.perf_counter() - started))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def db_time(self):
+        return sum(seconds for _, _, seconds in self.queries)
+
+    def repeated(self, limit):
+        """SELECTs run more than `limit` times, with how often: the N+1 suspects."""
+        counts = Counter(sql for sql, _, _ in self.queries if sql.lstrip().upper().startswith('SELECT'))
+        return [(sql, n) for sql, n in counts.most_common() if n > limit]
+
+
+class QueryReport:
+    def __init__(self, label, budget, recorder, elapsed):
+        self.label = label
+        self.budget = budget
+        self.recorder = recorder
+        self.elapsed = elapsed
+
+    def problems(self):
+        problems = []
+        if self.budget is not None and self.recorder.count > self.budget:
+            problems.append(f"{self.recorder.count} queries, budget is {self.budget}")
+        for sql, n in self.recorder.repeated(settings.QUERY_REPEAT_LIMIT):
+            problems.append(f"same statement run {n} times: {sql[:200]}")
+        return problems
+
+    def __str__(self):
+        return (f"{self.label}: {self.recorder.count} queries, "
+                f"{self.recorder.db_time * 1000:.1f} ms in the database, {self.elapsed * 1000:.1f} ms total")
+
+
+def enforce(report, mode):
+    problems = report.problems()
+    if not problems:
+        return
+    message = f"{report} — " + "; ".join(problems)
+    if mode == 'raise':
+        raise QueryBudgetExceeded(message)
+    print(f"⚠️ Query budget: {message}")
+
+
+@contextmanager
+def query_budget(budget, label='block'):
+    """Fail if the block runs more than `budget` queries or repeats a statement (test helper)."""
+    started = time.perf_counter()
+    with QueryRecorder() as recorder:
+        yield recorder
+    enforce(QueryReport(label, budget, recorder, time.perf_counter() - started), 'raise')
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = settings.QUERY_BUDGET_MODE
+        if mode == 'off':
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = request.resolver_match
+        view_name = match.view_name if match else ''
+        report = QueryReport(f"{request.method} {request.path} ({view_name or 'unresolved'})",
+                             budget_for(view_name), recorder, elapsed)
+
+        response['X-Query-Count'] = str(recorder.count)
+        response['Server-Timing'] = f"db;dur={recorder.db_time * 1000:.1f}, total;dur={elapsed * 1000:.1f}"
+        enforce(report, mode)
+        return response
@@ -0,0 +1,117 @@
+"""
+Read-replica routing.
+
+ReplicaRoutingMiddleware marks GET/HEAD requests for the url names in
+settings.REPLICA_READ_VIEWS, and ReplicaRouter sends their reads to the
+'replica' alias. Everything else — writes, other views, management
+commands, sessions — stays on 'default'.
+
+A client that writes (any unsafe request, or a GET that happened to save
+something) gets a short-lived cookie pinning it to the primary for
+REPLICA_PIN_SECONDS, so it reads its own writes while the replica catches
+up. A read after a write inside the same request also goes to the primary.
+
+Whatever is cached beyond the request (dashboard fragments, the admin
+stats, the camp feed) is built inside primary_reads(), so a lagging
+replica never ends up in the cache for the whole TTL.
+
+Without a 'replica' alias in DATABASES both classes are no-ops.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+REPLICA = 'replica'
+PIN_COOKIE = 'sankalp_primary'
+SAFE_METHODS = ('GET', 'HEAD')
+
+# Apps whose rows must never be read stale (session lookups, migration state).
+PRIMARY_ONLY_APPS = {'sessions', 'contenttypes', 'migrations'}
+
+
+class _Route:
+    """Per-request routing state."""
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.replica = False
+        self.wrote = False
+
+
+_route = ContextVar('sankalp_db_route', default=None)
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+@contextmanager
+def primary_reads():
+    """Send the reads inside the block to 'default', e.g. while building something to cache."""
+    route = _route.get()
+    if route is None or not route.replica:
+        yield
+        return
+    route.replica = False
+    try:
+        yield
+    finally:
+        route.replica = True
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        route = _route.get()
+        if route is None or not route.replica or route.wrote:
+            return None
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return None
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        route = _route.get()
+        if route is not None and model._meta.app_label not in PRIMARY_ONLY_APPS:
+            route.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema from the primary by replication (or sync_replica).
+        return db != REPLICA
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        route = _Route(pinned=PIN_COOKIE in request.COOKIES)
+        token = _route.set(route)
+        try:
+            response = self.get_response(request)
+        finally:
+            _route.reset(token)
+
+        if route.wrote or request.method not in SAFE_METHODS:
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        route = _route.get()
+        match = request.resolver_match
+        if (
+            route is not None
+            and not route.pinned
+            and request.method in SAFE_METHODS
+            and match is not None
+            and match.url_name in settings.REPLICA_READ_VIEWS
+            and replica_configured()
+        ):
+            route.replica = True
+        return None
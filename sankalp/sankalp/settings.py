@@ -58,10 +58,12 @@ AUTHENTICATION_BACKENDS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'sankalp.querycount.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'sankalp.routers.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -78,6 +80,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'accounts.context_processors.notifications',
             ],
         },
     },
@@ -89,12 +92,133 @@ WSGI_APPLICATION = 'sankalp.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE picks the backend: sqlite (default, single file), mysql or postgres.
+# Persistent connections (DB_CONN_MAX_AGE seconds, 0 = close after each request) are
+# health-checked before reuse. Postgres can use psycopg's connection pool instead,
+# sized per worker process with DB_POOL_MIN_SIZE / DB_POOL_MAX_SIZE.
+# accounts.checks reports the effective settings at startup (`manage.py check`).
+DB_ENGINE = config('DB_ENGINE', default='sqlite')
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=60, cast=int)
+DB_CONN_HEALTH_CHECKS = config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool)
+DB_POOL_MIN_SIZE = config('DB_POOL_MIN_SIZE', default=0, cast=int)  # 0 = no pool
+DB_POOL_MAX_SIZE = config('DB_POOL_MAX_SIZE', default=10, cast=int)
+DB_POOL_TIMEOUT = config('DB_POOL_TIMEOUT', default=10, cast=int)
+
+if DB_ENGINE == 'mysql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.mysql',
+            'NAME': config('DB_NAME', default='sankalp'),
+            'USER': config('DB_USER', default='sankalp'),
+            'PASSWORD': config('DB_PASSWORD', default=''),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default='3306'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
+            'OPTIONS': {
+                'charset': 'utf8mb4',
+                'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
+            },
+        }
+    }
+elif DB_ENGINE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('DB_NAME', default='sankalp'),
+            'USER': config('DB_USER', default='sankalp'),
+            'PASSWORD': config('DB_PASSWORD', default=''),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default='5432'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
+            'OPTIONS': {},
+        }
+    }
+    if DB_POOL_MIN_SIZE:
+        # The pool keeps connections itself; Django requires CONN_MAX_AGE = 0 alongside it.
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': DB_POOL_MIN_SIZE,
+            'max_size': DB_POOL_MAX_SIZE,
+            'timeout': DB_POOL_TIMEOUT,
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+        }
     }
-}
+
+# SQLite high-concurrency profile (opt-in): WAL so readers never block the writer,
+# synchronous=NORMAL, memory-mapped reads, a busy timeout, and transactions that take
+# the write lock up front (BEGIN IMMEDIATE) instead of failing when they upgrade.
+# Compare with `python manage.py sqlite_benchmark`.
+SQLITE_HIGH_CONCURRENCY = config('SQLITE_HIGH_CONCURRENCY', default=False, cast=bool)
+SQLITE_BUSY_TIMEOUT = config('SQLITE_BUSY_TIMEOUT', default=5.0, cast=float)  # seconds
+SQLITE_MMAP_SIZE = config('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024, cast=int)
+SQLITE_PRAGMAS = [
+    'journal_mode=WAL',
+    'synchronous=NORMAL',
+    f'mmap_size={SQLITE_MMAP_SIZE}',
+    f'busy_timeout={int(SQLITE_BUSY_TIMEOUT * 1000)}',
+]
+
+if DB_ENGINE == 'sqlite' and SQLITE_HIGH_CONCURRENCY:
+    DATABASES['default']['OPTIONS'] = {
+        'timeout': SQLITE_BUSY_TIMEOUT,
+        'transaction_mode': 'IMMEDIATE',
+        'init_command': ';'.join(f'PRAGMA {pragma}' for pragma in SQLITE_PRAGMAS),
+    }
+
+# Short writes that still lose a lock race are re-run (accounts.retry.retry_on_lock)
+DB_WRITE_RETRIES = config('DB_WRITE_RETRIES', default=3, cast=int)
+DB_WRITE_RETRY_BACKOFF = config('DB_WRITE_RETRY_BACKOFF', default=0.05, cast=float)  # seconds, doubled per retry
+
+# Read replica: DB_REPLICA is the replica's host (mysql/postgres) or, on SQLite, a second
+# database file standing in for one (refresh it with `manage.py sync_replica`).
+# sankalp.routers sends GET requests for REPLICA_READ_VIEWS to it; anyone who just wrote
+# reads from the primary for REPLICA_PIN_SECONDS. Tests mirror it onto the test database.
+DB_REPLICA = config('DB_REPLICA', default='')
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=10, cast=int)
+
+if DB_REPLICA:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'OPTIONS': dict(DATABASES['default'].get('OPTIONS', {})),
+        'TEST': {'MIRROR': 'default'},
+    }
+    if DB_ENGINE in ('mysql', 'postgres'):
+        DATABASES['replica']['HOST'] = DB_REPLICA
+        DATABASES['replica']['PORT'] = config('DB_REPLICA_PORT', default=DATABASES['default']['PORT'])
+    else:
+        DATABASES['replica']['NAME'] = DB_REPLICA
+
+DATABASE_ROUTERS = ['sankalp.routers.ReplicaRouter']
+
+REPLICA_READ_VIEWS = [
+    'dashboard',
+    'admin_dashboard',
+    'volunteer_dashboard',
+    'donor_dashboard',
+    'beneficiary_dashboard',
+    'advocate_dashboard',
+    'supporter_dashboard',
+    'dashboard_section',
+    'admin_campaign_management',
+    'admin_education_requests',
+    'upcoming_camps',
+    'upcoming_camps_ics',
+    'education_info',
+    'legal_info',
+    'legal_articles',
+    'search',
+    'similar_questions',
+    'medical_info',
+    'women_support_info',
+    'women_support_articles',
+]
 
 
 # Password validation
@@ -156,10 +280,91 @@ EMAIL_PORT = 587
 EMAIL_HOST_USER = config('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
 
+# Outbox worker (python manage.py process_outbox)
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+OUTBOX_BACKOFF_SECONDS = config('OUTBOX_BACKOFF_SECONDS', default=60, cast=int)
+OUTBOX_MAX_BACKOFF = config('OUTBOX_MAX_BACKOFF', default=3600, cast=int)
+OUTBOX_LOCK_TIMEOUT = config('OUTBOX_LOCK_TIMEOUT', default=600, cast=int)
+OUTBOX_MESSAGES_PER_CONNECTION = config('OUTBOX_MESSAGES_PER_CONNECTION', default=200, cast=int)
+
+
+# SMS dispatcher (accounts/sms.py). Transports: TwilioTransport, InMemoryTransport, FileTransport
+SMS_TRANSPORT = config('SMS_TRANSPORT', default='accounts.sms.TwilioTransport')
+SMS_FILE_PATH = config('SMS_FILE_PATH', default=str(BASE_DIR / 'sms_outbox.jsonl'))
+SMS_RATE_LIMIT = config('SMS_RATE_LIMIT', default=1.0, cast=float)  # messages per second, 0 = unlimited
+SMS_QUEUE_SIZE = config('SMS_QUEUE_SIZE', default=1000, cast=int)
+SMS_MAX_ATTEMPTS = config('SMS_MAX_ATTEMPTS', default=3, cast=int)
+SMS_RETRY_BACKOFF = config('SMS_RETRY_BACKOFF', default=2.0, cast=float)
+SMS_CLAIM_TIMEOUT = config('SMS_CLAIM_TIMEOUT', default=600, cast=int)  # seconds before a stuck Sending row is retried
+SMS_DEMO_NUMBER = config('SMS_DEMO_NUMBER', default='+919061525199')  # blank = send to the real number
+
+# Background workers (SMS dispatcher, outbox) report failures through the 'accounts' logger
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {'console': {'class': 'logging.StreamHandler'}},
+    'loggers': {'accounts': {'handlers': ['console'], 'level': config('LOG_LEVEL', default='INFO')}},
+}
+
+# Live notification stream (accounts.events). Only turn it on when serving through sankalp.asgi:
+# under WSGI a stream holds a worker for good, so the view answers 204 and pages poll the JSON
+# feed every NOTIFICATION_POLL_SECONDS instead. Use PollingBroker when running several ASGI workers.
+NOTIFICATION_STREAM_ENABLED = config('NOTIFICATION_STREAM_ENABLED', default=False, cast=bool)
+NOTIFICATION_POLL_SECONDS = config('NOTIFICATION_POLL_SECONDS', default=60, cast=int)
+NOTIFICATION_BROKER = config('NOTIFICATION_BROKER', default='accounts.events.InProcessBroker')
+SSE_HEARTBEAT_SECONDS = config('SSE_HEARTBEAT_SECONDS', default=15, cast=int)
+
+# Read notifications older than this are pruned by accounts.cron.prune_notifications_cron
+NOTIFICATION_RETENTION_DAYS = config('NOTIFICATION_RETENTION_DAYS', default=90, cast=int)
+
+# Cache backend; locmem by default. Several workers need a shared one (CACHE_BACKEND + CACHE_LOCATION),
+# otherwise a save retires dashboard fragments in one worker only (check accounts.W003).
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='sankalp'),
+    }
+}
+
+# Admin dashboard counts (accounts.stats) are cached this long; saves that change them invalidate early
+DASHBOARD_STATS_TTL = config('DASHBOARD_STATS_TTL', default=60, cast=int)
+
+# Shared dashboard sections ({% cached_fragment %}) live this long unless a model change retires them first
+FRAGMENT_CACHE_TTL = config('FRAGMENT_CACHE_TTL', default=600, cast=int)
+
+# Upcoming camps page and .ics feed (accounts.camp_calendar) list at most this many camps
+UPCOMING_CAMPS_LIMIT = config('UPCOMING_CAMPS_LIMIT', default=200, cast=int)
+
+# Article / Q&A search (accounts.search_index): 'auto' uses SQLite FTS5 when available and the
+# Python inverted index otherwise; 'fts5' or 'python' force one. Rebuild the index after switching.
+SEARCH_BACKEND = config('SEARCH_BACKEND', default='auto')
+SEARCH_RESULTS_LIMIT = config('SEARCH_RESULTS_LIMIT', default=20, cast=int)
+
+# "Asked before?" suggestions on the question forms (accounts.similar_questions): at most
+# SIMILAR_QUESTIONS_LIMIT answered questions per draft, with at least this cosine similarity
+SIMILAR_QUESTIONS_LIMIT = config('SIMILAR_QUESTIONS_LIMIT', default=5, cast=int)
+SIMILAR_QUESTIONS_MIN_SCORE = config('SIMILAR_QUESTIONS_MIN_SCORE', default=0.3, cast=float)
+
+# Per-view query budgets (sankalp.query_budgets), checked by sankalp.querycount:
+# 'off', 'log' (print a warning) or 'raise'. A statement run more than QUERY_REPEAT_LIMIT
+# times in one request is reported as a likely N+1 loop.
+QUERY_BUDGET_MODE = config('QUERY_BUDGET_MODE', default='log' if DEBUG else 'off')
+QUERY_REPEAT_LIMIT = config('QUERY_REPEAT_LIMIT', default=3, cast=int)
+
+# Campaigns starting within this many hours get a reminder (accounts.reminders)
+CAMPAIGN_REMINDER_HOURS = config('CAMPAIGN_REMINDER_HOURS', default=24, cast=int)
 
 CRONJOBS = [
     ('0 9 * * *', 'women_support.cron.send_campaign_reminders_cron'),  
     # runs daily at 9 AM
+    ('30 2 * * *', 'accounts.cron.prune_notifications_cron'),
+    # runs daily at 2:30 AM
+    ('0 * * * *', 'accounts.cron.send_hourly_digests_cron'),
+    # runs every hour
+    ('0 8 * * *', 'accounts.cron.send_daily_digests_cron'),
+    # runs daily at 8 AM
+    ('*/5 * * * *', 'accounts.cron.send_queued_sms_cron'),
+    # runs every 5 minutes
 ]
 ALLOWED_HOSTS = ['sruthi123.pythonanywhere.com', '127.0.0.1', 'localhost']
 
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sankalp.settings')
 
 application = get_wsgi_application()
+
+# Build the "asked before?" index now, in the background, rather than during a request.
+from accounts.similar_questions import warm_up  # noqa: E402
+
+warm_up()
@@ -0,0 +1,7 @@
+from accounts.reminders import send_campaign_reminders
+
+
+def send_campaign_reminders_cron():
+    """Daily at 9 AM (settings.CRONJOBS): remind everyone involved in campaigns due in the next day."""
+    sent = send_campaign_reminders()
+    print(f"🔔 Campaign reminders sent for {sent} campaign(s).")
@@ -4,6 +4,31 @@ from django.conf import settings
 from django.db import models
 from django.conf import settings
 
+class WomenSupportCampaignQuerySet(models.QuerySet):
+    def for_listing(self):
+        """Rows for campaign lists: volunteer and supporter joined in, the description left out."""
+        return self.select_related('volunteer', 'supporter').defer('description')
+
+    def for_detail(self):
+        return self.select_related('volunteer', 'supporter', 'approved_by')
+
+
+class WomenSupportArticleQuerySet(models.QuerySet):
+    def for_listing(self):
+        return self.select_related('author')
+
+    def for_detail(self):
+        return self.select_related('author')
+
+
+class WomenSupportQuestionQuerySet(models.QuerySet):
+    def for_listing(self):
+        return self.select_related('asked_by', 'answered_by')
+
+    def for_detail(self):
+        return self.select_related('asked_by', 'answered_by')
+
+
 # 🌸 1️⃣ Women Awareness Campaign (same as Legal Camp Request)
 class WomenSupportCampaign(models.Model):
     STATUS_CHOICES = [
@@ -42,6 +67,14 @@ class WomenSupportCampaign(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = WomenSupportCampaignQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # reminder engine: WHERE status = 'Scheduled' AND scheduled_date BETWEEN ...
+            models.Index(fields=['status', 'scheduled_date']),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -57,6 +90,14 @@ class WomenSupportArticle(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = WomenSupportArticleQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # article list, paged on (created_at, id)
+            models.Index(fields=['created_at'], name='ws_article_created_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -86,5 +127,18 @@ class WomenSupportQuestion(models.Model):
     # ✅ New field
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Pending')
 
+    objects = WomenSupportQuestionQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # supporter Q&A list: ORDER BY created_at DESC
+            models.Index(fields=['created_at'], name='ws_question_created_idx'),
+            # beneficiary info page: answered questions, newest first (partial index)
+            models.Index(fields=['created_at'], condition=models.Q(answer__isnull=False),
+                         name='ws_question_answered_idx'),
+            # similar-question index: questions answered since its last sync
+            models.Index(fields=['answered_at'], name='ws_question_answered_at_idx'),
+        ]
+
     def __str__(self):
       return self.question[:50]
@@ -29,6 +29,7 @@ urlpatterns = [
     path('campaign/<int:pk>/approve/', views.ApproveWomenCampaignView.as_view(), name='approve_women_campaign'),
     path('campaign/<int:pk>/reject/', views.RejectWomenCampaignView.as_view(), name='reject_women_campaign'),
     path('campaign/<int:pk>/handled/', views.CampaignHandledView.as_view(), name='campaign_handled'),
+    path('campaign/<int:pk>/remind/', views.SendSupporterReminderView.as_view(), name='send_supporter_reminder'),
     path('campaign/<int:pk>/', views.ViewCampaignDetailView.as_view(), name='view_campaign'),
 ]
 
@@ -1,4 +1,3 @@
-import threading
 from datetime import timedelta
 from django.utils.timezone import now
 from django.utils import timezone
@@ -7,10 +6,14 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.views import View
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from accounts.utility import queue_rendered_emails
+from accounts.compose import compose, render_for_recipients
+from accounts.dashboard import supporter_context
+from accounts.events import publish_status_change
+from accounts.pagination import paginate
+from accounts.reminders import send_reminder_now, women_support_reminder
 from .models import WomenSupportCampaign, WomenSupportArticle, WomenSupportQuestion
 from .forms import (
     CampaignRequestForm,
@@ -20,18 +23,26 @@ from .forms import (
     WomenSupportAnswerForm
 )
 
-# 🌸 Utility — Send Email in a Background Thread
-def send_async_email(subject, html_template, context, recipient_list):
-    def send_email_task():
-        html_content = render_to_string(html_template, context)
-        for recipient in recipient_list:
-            msg = EmailMultiAlternatives(subject, '', settings.DEFAULT_FROM_EMAIL, [recipient])
-            msg.attach_alternative(html_content, "text/html")
-            try:
-                msg.send()
-            except Exception as e:
-                print(f"❌ Email sending failed to {recipient}: {e}")
-    threading.Thread(target=send_email_task).start()
+# 🌸 Utility — Queue Email for the Outbox Worker
+def send_async_email(subject, html_template, context, recipient_list, digestible=False):
+    try:
+        rendered = compose(html_template, context)
+        queue_rendered_emails(subject, [(recipient, rendered) for recipient in recipient_list], digestible=digestible)
+    except Exception as e:
+        print(f"❌ Email queueing failed for {recipient_list}: {e}")
+
+
+# 🌸 Utility — One status email per campaign event, rendered once for all recipients
+def send_campaign_status_email(subject, campaign, recipients, **extra):
+    try:
+        rendered = render_for_recipients(
+            'women_support/campaign_status_email.html',
+            {'campaign': campaign, 'status': campaign.status, **extra},
+            [r for r in recipients if r and r.email],
+        )
+        queue_rendered_emails(subject, [(r.email, email) for r, email in rendered], digestible=True)
+    except Exception as e:
+        print(f"❌ Campaign status email failed for '{campaign.title}': {e}")
 
 
 # 🌸 1️⃣ Common Info
@@ -41,16 +52,16 @@ class WomenSupportInfoView(LoginRequiredMixin, View):
         articles, questions = None, None
 
         if role == 'Volunteer':
-            campaigns = WomenSupportCampaign.objects.filter(volunteer=request.user)
+            campaigns = WomenSupportCampaign.objects.for_listing().filter(volunteer=request.user)
             title = "My Requested Campaigns"
         elif role == 'Supporter':
-            campaigns = WomenSupportCampaign.objects.filter(supporter=request.user)
+            campaigns = WomenSupportCampaign.objects.for_listing().filter(supporter=request.user)
             title = "Campaigns You Manage"
         elif role == 'Beneficiary':
-            campaigns = WomenSupportCampaign.objects.filter(status__in=['Approved', 'Scheduled'])
+            campaigns = WomenSupportCampaign.objects.for_listing().filter(status__in=['Approved', 'Scheduled'])
             title = "Upcoming Women Support Campaigns"
-            articles = WomenSupportArticle.objects.all().order_by('-id')[:5]
-            questions = WomenSupportQuestion.objects.filter(answer__isnull=False).order_by('-created_at')[:5]
+            articles = WomenSupportArticle.objects.for_listing().order_by('-id')[:5]
+            questions = WomenSupportQuestion.objects.for_listing().filter(answer__isnull=False).order_by('-created_at')[:5]
         else:
             messages.error(request, "Access denied.")
             return redirect('dashboard')
@@ -93,6 +104,7 @@ class CampaignRequestView(LoginRequiredMixin, View):
                 'domain': domain,
             }
             recipient_list = [campaign.supporter.email]
+            # Carries the approve/reject links, so it is never held back for a digest
             send_async_email(subject, 'women_support/new_campaign_request.html', context, recipient_list)
 
             messages.success(request, "✅ Your campaign request has been submitted to the selected supporter.")
@@ -107,14 +119,14 @@ class CampaignApprovalView(LoginRequiredMixin, View):
         if request.user.role != 'Supporter':
             messages.error(request, "Access denied.")
             return redirect('dashboard')
-        campaign = get_object_or_404(WomenSupportCampaign, pk=pk)
+        campaign = get_object_or_404(WomenSupportCampaign.objects.for_detail(), pk=pk)
         return render(request, 'women_support/approve_campaign.html', {
             'form': CampaignApprovalForm(instance=campaign),
             'campaign': campaign
         })
 
     def post(self, request, pk):
-        campaign = get_object_or_404(WomenSupportCampaign, pk=pk)
+        campaign = get_object_or_404(WomenSupportCampaign.objects.for_detail(), pk=pk)
         if campaign.status == 'Approved' and campaign.supporter and campaign.supporter != request.user:
             messages.info(request, f"⚠️ '{campaign.title}' is already approved by {campaign.supporter.username}.")
             return redirect('supporter_dashboard')
@@ -124,15 +136,15 @@ class CampaignApprovalView(LoginRequiredMixin, View):
             updated = form.save(commit=False)
             updated.supporter = request.user
             updated.save()
+            publish_status_change(updated.volunteer_id, 'women_support', updated, updated.status)
 
-            context = {'title': updated.title, 'volunteer_name': updated.volunteer.username}
             if updated.status == 'Approved':
                 subject = f"✅ Your Campaign '{updated.title}' Has Been Approved!"
-                send_async_email(subject, 'women_support/campaign_approved.html', context, [updated.volunteer.email])
+                send_campaign_status_email(subject, updated, [updated.volunteer])
             elif updated.status == 'Rejected':
                 subject = f"❌ Your Campaign '{updated.title}' Was Rejected"
-                context['reason'] = request.POST.get('reason', 'Not specified')
-                send_async_email(subject, 'women_support/campaign_rejected.html', context, [updated.volunteer.email])
+                send_campaign_status_email(subject, updated, [updated.volunteer],
+                                           reason=request.POST.get('reason', 'Not specified'))
 
             messages.success(request, f"✅ '{updated.title}' updated successfully.")
             return redirect('supporter_dashboard')
@@ -145,19 +157,13 @@ class SupporterDashboardView(LoginRequiredMixin, View):
         if request.user.role != 'Supporter':
             messages.error(request, "Access denied.")
             return redirect('dashboard')
-        context = {
-            'pending_campaigns': WomenSupportCampaign.objects.filter(status='Pending'),
-            'approved_campaigns': WomenSupportCampaign.objects.filter(status='Approved'),
-            'rejected_campaigns': WomenSupportCampaign.objects.filter(status='Rejected'),
-            'scheduled_campaigns': WomenSupportCampaign.objects.filter(status='Scheduled'),
-        }
-        return render(request, 'accounts/supporter_dashboard.html', context)
+        return render(request, 'accounts/supporter_dashboard.html', supporter_context(request.user))
 
 
 # 🌸 5️⃣ Admin — Schedule campaign
 class ScheduleWomenCampaignView(LoginRequiredMixin, View):
     def post(self, request, campaign_id):
-        campaign = get_object_or_404(WomenSupportCampaign, id=campaign_id)
+        campaign = get_object_or_404(WomenSupportCampaign.objects.for_detail(), id=campaign_id)
         scheduled_date = request.POST.get('scheduled_date')
         scheduled_time = request.POST.get('scheduled_time')
 
@@ -166,18 +172,10 @@ class ScheduleWomenCampaignView(LoginRequiredMixin, View):
             campaign.scheduled_time = scheduled_time
             campaign.status = 'Scheduled'
             campaign.save()
+            publish_status_change(campaign.volunteer_id, 'women_support', campaign, campaign.status)
 
             subject = f"📅 Campaign Scheduled: {campaign.title}"
-            context = {
-                'campaign': campaign,
-                'date': scheduled_date,
-                'time': scheduled_time,
-            }
-            recipients = [campaign.volunteer.email]
-            if campaign.supporter and campaign.supporter.email:
-                recipients.append(campaign.supporter.email)
-
-            send_async_email(subject, 'women_support/campaign_scheduled_email.html', context, recipients)
+            send_campaign_status_email(subject, campaign, [campaign.volunteer, campaign.supporter])
 
             messages.success(request, f"📅 '{campaign.title}' scheduled for {scheduled_date} at {scheduled_time}.")
         else:
@@ -188,15 +186,18 @@ class ScheduleWomenCampaignView(LoginRequiredMixin, View):
 
 # 🌸 6️⃣ Articles (Create, View, Edit, Delete)
 class WomenSupportArticleView(LoginRequiredMixin, View):
+    page_size = 20
+
     def get(self, request):
         role = request.user.role
         if role == 'Supporter':
-            articles = WomenSupportArticle.objects.filter(author=request.user)
+            articles = WomenSupportArticle.objects.for_listing().filter(author=request.user)
         elif role == 'Beneficiary':
-            articles = WomenSupportArticle.objects.all()
+            articles = WomenSupportArticle.objects.for_listing()
         else:
             messages.warning(request, "Only supporters and beneficiaries can view articles.")
             return redirect('dashboard')
+        articles = paginate(request, articles, self.page_size)
         return render(request, 'women_support/articles.html', {'articles': articles})
 
 
@@ -223,11 +224,11 @@ class WomenSupportArticleCreateView(LoginRequiredMixin, View):
 
 class WomenSupportArticleEditView(LoginRequiredMixin, View):
     def get(self, request, pk):
-        article = get_object_or_404(WomenSupportArticle, pk=pk, author=request.user)
+        article = get_object_or_404(WomenSupportArticle.objects.for_detail(), pk=pk, author=request.user)
         return render(request, 'women_support/article_form.html', {'form': WomenSupportArticleForm(instance=article)})
 
     def post(self, request, pk):
-        article = get_object_or_404(WomenSupportArticle, pk=pk, author=request.user)
+        article = get_object_or_404(WomenSupportArticle.objects.for_detail(), pk=pk, author=request.user)
         form = WomenSupportArticleForm(request.POST, instance=article)
         if form.is_valid():
             form.save()
@@ -238,7 +239,7 @@ class WomenSupportArticleEditView(LoginRequiredMixin, View):
 
 class WomenSupportArticleDeleteView(LoginRequiredMixin, View):
     def post(self, request, pk):
-        article = get_object_or_404(WomenSupportArticle, pk=pk, author=request.user)
+        article = get_object_or_404(WomenSupportArticle.objects.for_detail(), pk=pk, author=request.user)
         article.delete()
         messages.success(request, "🗑️ Article deleted successfully.")
         return redirect('women_support_articles')
@@ -246,20 +247,23 @@ class WomenSupportArticleDeleteView(LoginRequiredMixin, View):
 
 class ViewArticleView(LoginRequiredMixin, View):
     def get(self, request, pk):
-        article = get_object_or_404(WomenSupportArticle, pk=pk)
+        article = get_object_or_404(WomenSupportArticle.objects.for_detail(), pk=pk)
         return render(request, 'women_support/article_detail.html', {'article': article})
 
 
 # 🌸 7️⃣ Beneficiary Q&A (Ask / Answer)
 class WomenSupportQuestionView(LoginRequiredMixin, View):
+    page_size = 25
+
     def get(self, request):
         if request.user.role == 'Beneficiary':
-            questions = WomenSupportQuestion.objects.filter(answer__isnull=False)
+            questions = WomenSupportQuestion.objects.for_listing().filter(answer__isnull=False)
         elif request.user.role == 'Supporter':
-            questions = WomenSupportQuestion.objects.all().order_by('-created_at')
+            questions = WomenSupportQuestion.objects.for_listing()
         else:
             messages.error(request, "Access denied.")
             return redirect('dashboard')
+        questions = paginate(request, questions, self.page_size)
         return render(request, 'women_support/questions.html', {'questions': questions})
 
 
@@ -283,12 +287,12 @@ class WomenAskQuestionView(LoginRequiredMixin, View):
 
 class WomenSupportAnswerView(LoginRequiredMixin, View):
     def get(self, request, pk):
-        question = get_object_or_404(WomenSupportQuestion, pk=pk)
+        question = get_object_or_404(WomenSupportQuestion.objects.for_detail(), pk=pk)
         form = WomenSupportAnswerForm(instance=question)
         return render(request, 'women_support/reply_question.html', {'question': question, 'form': form})
 
     def post(self, request, pk):
-        question = get_object_or_404(WomenSupportQuestion, pk=pk)
+        question = get_object_or_404(WomenSupportQuestion.objects.for_detail(), pk=pk)
         form = WomenSupportAnswerForm(request.POST, instance=question)
 
         if form.is_valid():
@@ -313,12 +317,13 @@ class WomenSupportAnswerView(LoginRequiredMixin, View):
 # 🌸 8️⃣ Approve / Reject via Email Link (no login required)
 class ApproveWomenCampaignView(View):
     def get(self, request, pk):
-        camp = get_object_or_404(WomenSupportCampaign, pk=pk)
+        camp = get_object_or_404(WomenSupportCampaign.objects.for_detail(), pk=pk)
         if camp.status == "Pending":
             camp.status = "Approved"
             if request.user.is_authenticated:
                 camp.supporter = request.user
             camp.save()
+            publish_status_change(camp.volunteer_id, 'women_support', camp, camp.status)
             messages.success(request, "✅ Campaign approved successfully.")
         else:
             messages.info(request, f"⚠️ Campaign is already {camp.status}.")
@@ -327,10 +332,11 @@ class ApproveWomenCampaignView(View):
 
 class RejectWomenCampaignView(View):
     def get(self, request, pk):
-        camp = get_object_or_404(WomenSupportCampaign, pk=pk)
+        camp = get_object_or_404(WomenSupportCampaign.objects.for_detail(), pk=pk)
         if camp.status == "Pending":
             camp.status = "Rejected"
             camp.save()
+            publish_status_change(camp.volunteer_id, 'women_support', camp, camp.status)
             messages.warning(request, "❌ Campaign rejected.")
         else:
             messages.info(request, f"⚠️ Campaign is already {camp.status.lower()}.")
@@ -339,12 +345,32 @@ class RejectWomenCampaignView(View):
 
 class CampaignHandledView(View):
     def get(self, request, pk):
-        camp = get_object_or_404(WomenSupportCampaign, pk=pk)
+        camp = get_object_or_404(WomenSupportCampaign.objects.for_detail(), pk=pk)
         return render(request, 'women_support/campaign_handled.html', {'camp': camp})
 
 
 # 🌸 9️⃣ View campaign details
 class ViewCampaignDetailView(LoginRequiredMixin, View):
     def get(self, request, pk):
-        campaign = get_object_or_404(WomenSupportCampaign, pk=pk)
+        campaign = get_object_or_404(WomenSupportCampaign.objects.for_detail(), pk=pk)
         return render(request, 'women_support/view_campaign.html', {'campaign': campaign})
+
+
+# 🔔 🔟 Volunteer nudges the supporter about a campaign coming up
+class SendSupporterReminderView(LoginRequiredMixin, View):
+    def post(self, request, pk):
+        campaign = get_object_or_404(
+            WomenSupportCampaign.objects.for_detail(),
+            pk=pk, volunteer=request.user, status='Scheduled',
+        )
+        if not campaign.supporter:
+            messages.warning(request, "⚠️ No supporter is assigned to this campaign yet.")
+            return redirect('dashboard')
+
+        reminder = women_support_reminder(campaign)
+        reminder.recipients = [campaign.supporter]
+        if send_reminder_now(reminder) is None:
+            messages.info(request, f"ℹ️ {campaign.supporter.username} has already been reminded about this campaign.")
+        else:
+            messages.success(request, f"📱 Reminder sent to {campaign.supporter.username}.")
+        return redirect('dashboard')